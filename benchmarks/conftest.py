@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    Benchmarks for pyudev.
+
+    These benchmarks use pytest-benchmark_, and only read from the device
+    database of the running system, so they run on any Linux system with
+    udev.  Run them with ``make benchmark``.
+
+    .. _pytest-benchmark: https://pypi.python.org/pypi/pytest-benchmark
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+import pyudev
+
+
+@pytest.fixture(scope='session')
+def context():
+    """
+    Return a useable :class:`pyudev.Context` object.
+    """
+    try:
+        return pyudev.Context()
+    except ImportError:
+        pytest.skip('udev not available')
+
+
+@pytest.fixture(scope='session')
+def sys_paths(context):
+    """
+    Return the ``sysfs`` paths of all devices.
+    """
+    return context.list_devices().sys_paths()
+
+
+@pytest.fixture
+def devices(context, sys_paths):
+    """
+    Return fresh :class:`pyudev.Device` objects for all devices.
+
+    The objects are created anew for each benchmark, so that data cached by
+    libudev or pyudev does not leak from one benchmark into another.
+    """
+    return [pyudev.Device.from_sys_path(context, sys_path)
+            for sys_path in sys_paths]
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import pyudev
+
+
+ATTRIBUTES = ['uevent', 'driver', 'subsystem', 'size', 'removable',
+              'vendor', 'device', 'modalias', 'dev', 'power']
+
+
+def test_device_from_sys_path(benchmark, context, sys_paths):
+    def create_devices():
+        for sys_path in sys_paths:
+            pyudev.Device.from_sys_path(context, sys_path)
+    benchmark(create_devices)
+
+
+def test_property_iteration(benchmark, devices):
+    benchmark(lambda: [dict(device) for device in devices])
+
+
+def test_property_access(benchmark, devices):
+    def get_properties():
+        for device in devices:
+            device.get('SUBSYSTEM')
+            device.get('DEVNAME')
+            device.get('ID_MODEL')
+    benchmark(get_properties)
+
+
+def test_general_attributes(benchmark, devices):
+    def get_attributes():
+        for device in devices:
+            device.sys_name
+            device.subsystem
+            device.driver
+            device.device_node
+    benchmark(get_attributes)
+
+
+def test_tags(benchmark, devices):
+    benchmark(lambda: [list(device.tags) for device in devices])
+
+
+def test_attribute_access(benchmark, devices):
+    def get_attributes():
+        for device in devices:
+            attributes = device.attributes
+            for name in ATTRIBUTES:
+                attributes.get(name)
+    benchmark(get_attributes)
+
+
+def test_attribute_access_cached(benchmark, devices):
+    for device in devices:
+        device.attributes.prefetch(ATTRIBUTES)
+
+    def get_attributes():
+        for device in devices:
+            attributes = device.attributes
+            for name in ATTRIBUTES:
+                attributes.get(name)
+    benchmark(get_attributes)
+
+
+def test_attribute_names(benchmark, devices):
+    benchmark(lambda: [list(device.attributes) for device in devices])
+
+
+def test_read_attributes(benchmark, devices):
+    benchmark(pyudev.read_attributes, devices, ATTRIBUTES)
+
+
+def test_snapshot(benchmark, devices):
+    benchmark(lambda: [device.snapshot() for device in devices])
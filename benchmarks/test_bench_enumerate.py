@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import pytest
+
+from pyudev import DeviceTree, Enumerator
+
+
+with_engines = pytest.mark.parametrize('engine', Enumerator.ENGINES)
+
+
+@with_engines
+def test_enumerate_devices(benchmark, context, engine):
+    devices = benchmark(lambda: list(Enumerator(context, engine=engine)))
+    assert devices
+
+
+@with_engines
+def test_enumerate_sys_paths(benchmark, context, engine):
+    sys_paths = benchmark(
+        lambda: Enumerator(context, engine=engine).sys_paths())
+    assert sys_paths
+
+
+@with_engines
+def test_enumerate_subsystem(benchmark, context, engine):
+    benchmark(lambda: list(
+        Enumerator(context, engine=engine).match_subsystem('block')))
+
+
+@with_engines
+def test_enumerate_property(benchmark, context, engine):
+    benchmark(lambda: Enumerator(context, engine=engine).match_property(
+        'DEVTYPE', 'disk').sys_paths())
+
+
+def test_device_tree(benchmark, context):
+    tree = benchmark(DeviceTree, context)
+    assert len(tree)
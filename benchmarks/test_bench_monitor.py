@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    Benchmarks for event ingestion.
+
+    Real device events require privileges and real hardware, so these
+    benchmarks feed a :class:`~pyudev.Monitor` from a synthetic event source:
+    the monitor polls one end of a socket pair instead of its netlink
+    socket, and every byte written to the other end is received as an event
+    for a fixed device.  This measures the overhead of pyudev between the
+    socket and the callback, but not the parsing of events in libudev.
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import errno
+import socket
+import struct
+from functools import partial
+from threading import Event
+
+import pytest
+
+import pyudev
+
+
+EVENT_COUNT = 1000
+
+
+class SyntheticEventSource(object):
+    """
+    Turn a :class:`~pyudev.Monitor` into a monitor, which receives
+    ``device`` for every byte written to the socket pair.
+    """
+
+    def __init__(self, monitor, device):
+        self.monitor = monitor
+        self.device = device
+        self.source, self.sink = socket.socketpair()
+        self.source.setblocking(False)
+        # let the monitor poll and receive from our socket pair
+        monitor.fileno = self.source.fileno
+        monitor._receive_device = self._receive_device
+
+    def _receive_device(self):
+        try:
+            self.source.recv(1)
+        except socket.error as error:
+            if error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return None
+            raise
+        return self.device
+
+    def emit(self, count):
+        """
+        Emit ``count`` events at once.
+        """
+        self.sink.sendall(b'\x01' * count)
+
+    def close(self):
+        self.source.close()
+        self.sink.close()
+
+
+@pytest.fixture
+def event_source(request, context):
+    monitor = pyudev.Monitor.from_netlink(context)
+    device = next(iter(context.list_devices()))
+    source = SyntheticEventSource(monitor, device)
+    request.addfinalizer(source.close)
+    return source
+
+
+def _drain_with_poll(monitor):
+    return sum(1 for _ in iter(partial(monitor.poll, timeout=0), None))
+
+
+def _drain_with_poll_many(monitor):
+    return sum(len(devices) for devices in
+               iter(partial(monitor.poll_many, timeout=0), []))
+
+
+@pytest.mark.parametrize('drain', [_drain_with_poll, _drain_with_poll_many],
+                         ids=['poll', 'poll_many'])
+def test_monitor_ingestion(benchmark, event_source, drain):
+    monitor = event_source.monitor
+
+    def setup():
+        event_source.emit(EVENT_COUNT)
+
+    received = benchmark.pedantic(drain, args=(monitor,), setup=setup,
+                                  rounds=50)
+    assert received == EVENT_COUNT
+
+
+def test_observer_ingestion(benchmark, event_source):
+    state = {}
+
+    def callback(device):
+        state['count'] += 1
+        if state['count'] == EVENT_COUNT:
+            state['done'].set()
+
+    observer = pyudev.MonitorObserver(event_source.monitor, callback=callback)
+    observer.start()
+
+    def setup():
+        state['count'] = 0
+        state['done'] = Event()
+
+    def ingest():
+        event_source.emit(EVENT_COUNT)
+        state['done'].wait(10)
+
+    try:
+        benchmark.pedantic(ingest, setup=setup, rounds=50)
+    finally:
+        observer.stop()
+    assert state['count'] == EVENT_COUNT
+
+
+def test_netlink_event_parsing(benchmark):
+    netlink = pytest.importorskip('pyudev.netlink')
+    properties = (b'ACTION=change\x00DEVPATH=/devices/virtual/mem/null\x00'
+                  b'SUBSYSTEM=mem\x00MAJOR=1\x00MINOR=3\x00'
+                  b'DEVNAME=/dev/null\x00SEQNUM=4711\x00')
+    message = (netlink.HEADER_PREFIX + netlink.HEADER_MAGIC +
+               struct.pack(str('=III16x'), netlink.HEADER.size,
+                           netlink.HEADER.size, len(properties)) +
+               properties)
+
+    def parse():
+        event = netlink._parse_message('udev', message, '/sys')
+        return event.action, event.subsystem, event.sequence_number
+
+    assert benchmark(parse) == ('change', 'mem', 4711)
@@ -46,3 +46,4 @@
 from pyudev.device import *
 from pyudev.core import *
 from pyudev.monitor import *
+from pyudev.hwdb import *
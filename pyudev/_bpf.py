@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev._bpf
+    ===========
+
+    Compiling and attaching classic BPF socket filters for device events.
+
+    .. moduleauthor::  mulhern  <amulhern@redhat.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import socket
+import struct
+from ctypes import (Structure, POINTER, addressof, c_ubyte, c_uint32,
+                    c_ushort, cast, sizeof, string_at)
+
+from pyudev._util import ensure_byte_string
+
+
+# socket options from <asm-generic/socket.h>
+SO_ATTACH_FILTER = 26
+SO_DETACH_FILTER = 27
+
+# instruction classes and modes from <linux/filter.h>
+BPF_LD = 0x00
+BPF_ALU = 0x04
+BPF_JMP = 0x05
+BPF_RET = 0x06
+BPF_W = 0x00
+BPF_H = 0x08
+BPF_B = 0x10
+BPF_ABS = 0x20
+BPF_AND = 0x50
+BPF_JA = 0x00
+BPF_JEQ = 0x10
+BPF_K = 0x00
+
+#: The maximum number of instructions of a socket filter
+BPF_MAXINSNS = 4096
+
+#: Return values of a filter, to accept the whole message or drop it
+ACCEPT = 0xffffffff
+REJECT = 0
+
+# offsets of the fields of struct udev_monitor_netlink_header
+OFFSET_MAGIC = 8
+OFFSET_SUBSYSTEM_HASH = 24
+OFFSET_DEVTYPE_HASH = 28
+OFFSET_TAG_BLOOM_HI = 32
+OFFSET_TAG_BLOOM_LO = 36
+
+#: The magic number in the header of events sent by udev
+UDEV_MONITOR_MAGIC = 0xfeedcafe
+
+# the prefix of events sent by udev, as big-endian words like BPF loads them
+UDEV_PREFIX_WORDS = struct.unpack(str('!II'), b'libudev\x00')
+
+_WORD = struct.Struct(str('=I'))
+
+
+def string_hash32(value):
+    """
+    Hash ``value`` like ``util_string_hash32()`` in libudev.
+
+    ``value`` is a byte or unicode string.  libudev hashes subsystems, device
+    types and tags with MurmurHash2 with a seed of ``0``, reading the data in
+    the native byte order.
+
+    Return the hash as integer.
+    """
+    data = ensure_byte_string(value)
+    mask = 0xffffffff
+    m = 0x5bd1e995
+    length = len(data)
+    h = length
+    end = length - length % 4
+    for offset in range(0, end, 4):
+        k = _WORD.unpack_from(data, offset)[0]
+        k = (k * m) & mask
+        k ^= k >> 24
+        k = (k * m) & mask
+        h = ((h * m) & mask) ^ k
+    tail = bytearray(data[end:])
+    if tail:
+        if len(tail) == 3:
+            h ^= tail[2] << 16
+        if len(tail) >= 2:
+            h ^= tail[1] << 8
+        h ^= tail[0]
+        h = (h * m) & mask
+    h ^= h >> 13
+    h = (h * m) & mask
+    h ^= h >> 15
+    return h
+
+
+def string_bloom64(value):
+    """
+    Get the bits of ``value`` in a tag bloom filter like
+    ``util_string_bloom64()`` in libudev.
+
+    ``value`` is a byte or unicode string.
+
+    Return the bits as 64 bit integer.
+    """
+    h = string_hash32(value)
+    bits = 0
+    for shift in (0, 6, 12, 18):
+        bits |= 1 << ((h >> shift) & 63)
+    return bits
+
+
+class Label(object):
+    """
+    A jump target in a :class:`Program`.
+    """
+
+
+class Program(object):
+    """
+    A classic BPF program under construction.
+
+    Instructions are added with the methods of this class.  Jumps refer to
+    :class:`Label` objects, which are placed with :meth:`place()`.  Jumps
+    always go forward in classic BPF, so labels must be placed after all
+    jumps to them.
+    """
+
+    def __init__(self):
+        self._instructions = []
+        self._labels = {}
+
+    def place(self, label):
+        """
+        Place ``label`` before the next instruction.
+        """
+        self._labels[label] = len(self._instructions)
+
+    def load_word(self, offset):
+        self._instructions.append((BPF_LD | BPF_W | BPF_ABS, None, None,
+                                   offset))
+
+    def load_half(self, offset):
+        self._instructions.append((BPF_LD | BPF_H | BPF_ABS, None, None,
+                                   offset))
+
+    def load_byte(self, offset):
+        self._instructions.append((BPF_LD | BPF_B | BPF_ABS, None, None,
+                                   offset))
+
+    def and_(self, value):
+        self._instructions.append((BPF_ALU | BPF_AND | BPF_K, None, None,
+                                   value))
+
+    def jump_equal(self, value, if_true=None, if_false=None):
+        """
+        Jump to ``if_true`` if the accumulator is ``value``, and to
+        ``if_false`` otherwise.  ``None`` continues with the next instruction.
+        """
+        self._instructions.append((BPF_JMP | BPF_JEQ | BPF_K, if_true,
+                                   if_false, value))
+
+    def jump(self, label):
+        self._instructions.append((BPF_JMP | BPF_JA, None, None, label))
+
+    def ret(self, value):
+        self._instructions.append((BPF_RET | BPF_K, None, None, value))
+
+    def _offset(self, index, label):
+        if label is None:
+            return 0
+        offset = self._labels[label] - index - 1
+        if offset < 0:
+            raise ValueError('Backward jump in filter program')
+        return offset
+
+    def assemble(self):
+        """
+        Resolve all jumps.
+
+        Return a list of ``(code, jt, jf, k)`` tuples, one for each
+        instruction in the format of ``struct sock_filter``.  Raise
+        :exc:`~exceptions.ValueError`, if the program is too long.
+        """
+        if len(self._instructions) > BPF_MAXINSNS:
+            raise ValueError('Filter program too long: {0} instructions'
+                             .format(len(self._instructions)))
+        instructions = []
+        for index, (code, jt, jf, k) in enumerate(self._instructions):
+            if code == BPF_JMP | BPF_JA:
+                k = self._offset(index, k)
+            jt = self._offset(index, jt)
+            jf = self._offset(index, jf)
+            if jt > 255 or jf > 255:
+                raise ValueError('Too many predicates in filter program')
+            instructions.append((code, jt, jf, k))
+        return instructions
+
+
+def _compile_prefix(program, prefix, if_false):
+    """
+    Compile a comparison of the start of a message with ``prefix``.
+
+    ``prefix`` is a byte string.  Jump to ``if_false``, if the message does
+    not start with ``prefix``, and continue otherwise.
+    """
+    offset = 0
+    while offset < len(prefix):
+        chunk = prefix[offset:offset + 4]
+        if len(chunk) == 4:
+            program.load_word(offset)
+            value = struct.unpack(str('!I'), chunk)[0]
+        elif len(chunk) >= 2:
+            chunk = chunk[:2]
+            program.load_half(offset)
+            value = struct.unpack(str('!H'), chunk)[0]
+        else:
+            program.load_byte(offset)
+            value = bytearray(chunk)[0]
+        program.jump_equal(value, if_false=if_false)
+        offset += len(chunk)
+
+
+def compile_filter(actions=(), subsystems=(), tags=()):
+    """
+    Compile a socket filter for device events.
+
+    ``actions`` is a sequence of action names.  ``subsystems`` is a sequence
+    of ``(subsystem, device_type)`` pairs, where ``device_type`` may be
+    ``None``.  ``tags`` is a sequence of tag names.  All names are byte or
+    unicode strings.  An event passes, if it matches any of the given
+    values of each non-empty sequence.
+
+    Events sent by udev carry hashes of the subsystem and device type, and a
+    bloom filter of the tags in their header, so subsystems and tags are
+    checked for these events, just like libudev does.  The action is not
+    part of this header, so actions are not checked for these events.
+    Events sent by the kernel start with ``action@devpath``, so actions are
+    checked for these events.  Everything else is in the variable properties
+    of events, which classic BPF cannot search.
+
+    Return a list of ``(code, jt, jf, k)`` tuples, one for each instruction.
+    """
+    program = Program()
+    accept = Label()
+    reject = Label()
+    kernel = Label()
+
+    # events sent by udev
+    program.load_word(0)
+    program.jump_equal(UDEV_PREFIX_WORDS[0], if_false=kernel)
+    program.load_word(4)
+    program.jump_equal(UDEV_PREFIX_WORDS[1], if_false=kernel)
+    program.load_word(OFFSET_MAGIC)
+    # pass events with an unknown header, like libudev does
+    program.jump_equal(UDEV_MONITOR_MAGIC, if_false=accept)
+    if tags:
+        tags_matched = Label()
+        for tag in tags:
+            next_tag = Label()
+            bits = string_bloom64(tag)
+            high, low = bits >> 32, bits & 0xffffffff
+            program.load_word(OFFSET_TAG_BLOOM_HI)
+            program.and_(high)
+            program.jump_equal(high, if_false=next_tag)
+            program.load_word(OFFSET_TAG_BLOOM_LO)
+            program.and_(low)
+            program.jump_equal(low, if_true=tags_matched)
+            program.place(next_tag)
+        program.jump(reject)
+        program.place(tags_matched)
+    if subsystems:
+        for subsystem, device_type in subsystems:
+            next_subsystem = Label()
+            program.load_word(OFFSET_SUBSYSTEM_HASH)
+            if device_type is None:
+                program.jump_equal(string_hash32(subsystem), if_true=accept)
+            else:
+                program.jump_equal(string_hash32(subsystem),
+                                   if_false=next_subsystem)
+                program.load_word(OFFSET_DEVTYPE_HASH)
+                program.jump_equal(string_hash32(device_type),
+                                   if_true=accept)
+            program.place(next_subsystem)
+        program.jump(reject)
+    program.jump(accept)
+
+    # events sent by the kernel
+    program.place(kernel)
+    if actions:
+        for action in actions:
+            next_action = Label()
+            _compile_prefix(program, ensure_byte_string(action) + b'@',
+                            next_action)
+            program.jump(accept)
+            program.place(next_action)
+        program.jump(reject)
+
+    program.place(accept)
+    program.ret(ACCEPT)
+    program.place(reject)
+    program.ret(REJECT)
+    return program.assemble()
+
+
+class _SockFilter(Structure):
+    """
+    A single BPF instruction (``struct sock_filter``).
+    """
+    _fields_ = [('code', c_ushort), ('jt', c_ubyte), ('jf', c_ubyte),
+                ('k', c_uint32)]
+
+
+class _SockFprog(Structure):
+    """
+    A BPF program (``struct sock_fprog``).
+    """
+    _fields_ = [('len', c_ushort), ('filter', POINTER(_SockFilter))]
+
+
+def _netlink_socket(fileno):
+    """
+    Get a socket object for the netlink socket ``fileno``.
+
+    The socket object has its own file descriptor, which the caller must
+    close, but refers to the same socket.
+    """
+    return socket.fromfd(fileno, socket.AF_NETLINK, socket.SOCK_RAW)
+
+
+def attach_filter(fileno, instructions):
+    """
+    Attach a filter program to the socket ``fileno``.
+
+    ``instructions`` is a list of ``(code, jt, jf, k)`` tuples as returned
+    by :func:`compile_filter()`.  The filter replaces any filter previously
+    attached to the socket.
+
+    Raise :exc:`~exceptions.EnvironmentError`, if the filter could not be
+    attached.
+    """
+    array = (_SockFilter * len(instructions))(*instructions)
+    program = _SockFprog(len(instructions),
+                         cast(array, POINTER(_SockFilter)))
+    sock = _netlink_socket(fileno)
+    try:
+        # the kernel copies the instructions, so ``array`` need not outlive
+        # this call
+        sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER,
+                        string_at(addressof(program), sizeof(program)))
+    finally:
+        sock.close()
+
+
+def detach_filter(fileno):
+    """
+    Detach the filter from the socket ``fileno``.
+
+    Raise :exc:`~exceptions.EnvironmentError`, if the filter could not be
+    detached, e.g. because no filter is attached.
+    """
+    sock = _netlink_socket(fileno)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_DETACH_FILTER, 0)
+    finally:
+        sock.close()
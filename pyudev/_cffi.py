@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev._cffi
+    ============
+
+    cffi backend for libudev.
+
+    The C declarations are generated from the ctypes signatures in
+    :data:`pyudev._libudev.SIGNATURES`, so both backends always wrap the same
+    functions.  :mod:`cffi` must be available when importing this module.
+
+    .. moduleauthor::  mulhern  <amulhern@redhat.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+from ctypes import (CDLL, Structure,
+                    c_char, c_char_p, c_int, c_uint, c_ulonglong)
+
+import cffi
+
+
+C_TYPES = {
+    None: 'void',
+    c_char: 'char',
+    c_char_p: 'const char *',
+    c_int: 'int',
+    c_uint: 'unsigned int',
+    c_ulonglong: 'unsigned long long',
+}
+
+
+def _is_structure_pointer(ctype):
+    """
+    Whether ``ctype`` is a ctypes pointer to a :class:`ctypes.Structure`.
+    """
+    target = getattr(ctype, '_type_', None)
+    return isinstance(target, type) and issubclass(target, Structure)
+
+
+def _to_c_type(ctype):
+    """
+    Get the C declaration of the given ``ctype`` as string.
+    """
+    if _is_structure_pointer(ctype):
+        return 'struct {0} *'.format(ctype._type_.__name__)
+    return C_TYPES[ctype]
+
+
+def _make_cdef(signatures):
+    """
+    Generate C declarations for all functions in ``signatures``.
+
+    ``signatures`` is a dictionary like :data:`pyudev._libudev.SIGNATURES`.
+
+    Return the declarations as string.
+    """
+    structs = set()
+    functions = []
+    for namespace, members in sorted(signatures.items()):
+        for funcname, (argtypes, restype) in sorted(members.items()):
+            for ctype in list(argtypes) + [restype]:
+                if _is_structure_pointer(ctype):
+                    structs.add(ctype._type_.__name__)
+            functions.append('{0} {1}_{2}({3});'.format(
+                _to_c_type(restype), namespace, funcname,
+                ', '.join(_to_c_type(t) for t in argtypes) or 'void'))
+    declarations = ['struct {0};'.format(s) for s in sorted(structs)]
+    return '\n'.join(declarations + functions)
+
+
+def _convert_argument(argument, ctype):
+    """
+    Get the statements, which convert the ``argument`` of the given ``ctype``
+    for cffi, as list of source lines.
+    """
+    statements = []
+    if _is_structure_pointer(ctype):
+        statements.append('{0} = getattr({0}, "_as_parameter_", {0})')
+    if _is_structure_pointer(ctype) or ctype is c_char_p:
+        statements.append('if {0} is None: {0} = NULL')
+    return [s.format(argument) for s in statements]
+
+
+def _wrap_function(ffi, name, function, argtypes, restype, errorchecker):
+    """
+    Wrap the cffi ``function`` called ``name`` to behave like a ctypes
+    function with the given ``argtypes``, ``restype`` and ``errorchecker``.
+
+    Objects given as structure pointers are converted through their
+    ``_as_parameter_`` attribute, ``None`` is given as ``NULL`` pointer, and
+    strings are returned as byte strings or ``None``.
+
+    The wrapper is generated from source for the given signature, so that it
+    only converts the arguments and the result which need conversion.  If
+    nothing needs to be converted, ``function`` is returned unchanged.
+    """
+    arguments = ['arg{0}'.format(index) for index in range(len(argtypes))]
+    statements = []
+    for argument, ctype in zip(arguments, argtypes):
+        statements.extend(_convert_argument(argument, ctype))
+    returns_string = restype is c_char_p
+    if not (statements or returns_string or errorchecker):
+        return function
+    statements.append('result = function({0})'.format(', '.join(arguments)))
+    if returns_string:
+        statements.append('result = string(result) if result else None')
+    if errorchecker:
+        statements.append('result = errorchecker(result, {0}, ({1}))'.format(
+            name, ''.join(a + ', ' for a in arguments)))
+    statements.append('return result')
+    source = 'def {0}({1}):\n{2}\n'.format(
+        name, ', '.join(arguments),
+        '\n'.join('    ' + statement for statement in statements))
+    namespace = dict(function=function, errorchecker=errorchecker,
+                     string=ffi.string, NULL=ffi.NULL)
+    exec(source, namespace)
+    wrapper = namespace[name]
+    wrapper.get_errno = lambda: ffi.errno
+    return wrapper
+
+
+class CffiLibrary(object):
+    """
+    A library loaded through :mod:`cffi` in ABI mode, which can be used in
+    place of a :class:`ctypes.CDLL` object.
+
+    Functions with a signature are called through :mod:`cffi`.  All other
+    functions are looked up in a plain :class:`ctypes.CDLL` object, so that
+    checking for the availability of a function with :func:`hasattr` works
+    for any function.
+    """
+
+    def __init__(self, name, signatures, error_checkers):
+        """
+        Load the library ``name``.
+
+        ``signatures`` and ``error_checkers`` are dictionaries like
+        :data:`pyudev._libudev.SIGNATURES` and
+        :data:`pyudev._libudev.ERROR_CHECKERS`.
+
+        Raise :exc:`~exceptions.OSError`, if the library could not be loaded.
+        """
+        self._name = name
+        self._ffi = cffi.FFI()
+        self._ffi.cdef(_make_cdef(signatures))
+        self._lib = self._ffi.dlopen(name)
+        self._fallback = CDLL(name)
+        self._signatures = dict(
+            ('{0}_{1}'.format(namespace, funcname), signature)
+            for namespace, members in signatures.items()
+            for funcname, signature in members.items())
+        self._error_checkers = error_checkers
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        signature = self._signatures.get(name)
+        if signature is None:
+            function = getattr(self._fallback, name)
+        else:
+            try:
+                function = getattr(self._lib, name)
+            except (AttributeError, NotImplementedError):
+                raise AttributeError(name)
+            argtypes, restype = signature
+            function = _wrap_function(self._ffi, name, function, argtypes,
+                                      restype, self._error_checkers.get(name))
+        setattr(self, name, function)
+        return function
+
+    def list_entry_pairs(self, entry):
+        """
+        Get all ``(name, value)`` pairs of the list starting at ``entry`` as
+        tuple.
+
+        The list functions are called directly through cffi, bypassing the
+        argument conversion of the wrapped functions.
+        """
+        ffi = self._ffi
+        get_name = self._lib.udev_list_entry_get_name
+        get_value = self._lib.udev_list_entry_get_value
+        get_next = self._lib.udev_list_entry_get_next
+        pairs = []
+        while entry:
+            name = get_name(entry)
+            value = get_value(entry)
+            pairs.append((ffi.string(name) if name else None,
+                          ffi.string(value) if value else None))
+            entry = get_next(entry)
+        return tuple(pairs)
@@ -78,14 +78,15 @@ def check_negative_errorcode(result, func, *args):
 
 def check_errno_on_nonzero_return(result, func, *args):
     """Error checker to check the system ``errno`` as returned by
-    :func:`ctypes.get_errno()`.
+    :func:`ctypes.get_errno()`, or by the ``get_errno()`` method of ``func``, if
+    any.
 
     If ``result`` is not ``0``, an exception according to this errno is raised.
     Otherwise nothing happens.
 
     """
     if result != 0:
-        errno = get_errno()
+        errno = getattr(func, 'get_errno', get_errno)()
         if errno != 0:
             raise exception_from_errno(errno)
     return result
@@ -93,14 +94,15 @@ def check_errno_on_nonzero_return(result, func, *args):
 
 def check_errno_on_null_pointer_return(result, func, *args):
     """Error checker to check the system ``errno`` as returned by
-    :func:`ctypes.get_errno()`.
+    :func:`ctypes.get_errno()`, or by the ``get_errno()`` method of ``func``, if
+    any.
 
     If ``result`` is a null pointer, an exception according to this errno is
     raised.  Otherwise nothing happens.
 
     """
     if not result:
-        errno = get_errno()
+        errno = getattr(func, 'get_errno', get_errno)()
         if errno != 0:
             raise exception_from_errno(errno)
     return result
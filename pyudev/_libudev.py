@@ -30,6 +30,9 @@
 from __future__ import (print_function, division, unicode_literals,
                         absolute_import)
 
+import os
+from functools import partial
+from threading import Lock
 from ctypes import (CDLL, Structure, POINTER,
                     c_char, c_char_p, c_int, c_uint, c_ulonglong)
 from ctypes.util import find_library
@@ -202,20 +205,106 @@ class udev_hwdb(Structure):
 )
 
 
-def load_udev_library():
+#: Functions of libudev together with the udev release which introduced them,
+#: from the newest to the oldest release
+FUNCTION_VERSIONS = [
+    ('udev_device_has_current_tag', 247),
+    ('udev_queue_flush', 215),
+    ('udev_device_set_sysattr_value', 199),
+    ('udev_hwdb_new', 196),
+    ('udev_device_new_from_device_id', 189),
+    ('udev_device_has_tag', 172),
+    ('udev_device_get_sysattr_list_entry', 167),
+    ('udev_device_get_is_initialized', 165),
+    ('udev_device_get_tags_list_entry', 154),
+    ('udev_device_new_from_environment', 152),
+]
+
+
+def guess_udev_version(libudev):
     """
-    Load the ``udev`` library and return a :class:`ctypes.CDLL` object for
-    it.  The library has errno handling enabled.
+    Guess the udev version from the functions available in ``libudev``.
 
-    Important functions are given proper signatures and return types to
-    support type checking and argument conversion.
+    ``libudev`` is a :class:`ctypes.CDLL` object for the udev library.
+
+    Return the oldest udev release providing all functions available in
+    ``libudev`` as integer.  This is a lower bound of the real version.
+    Return ``None``, if ``libudev`` is older than any release in
+    :data:`FUNCTION_VERSIONS`.
+    """
+    for funcname, version in FUNCTION_VERSIONS:
+        if version < 183 and not hasattr(libudev, 'udev_get_sys_path'):
+            # udev 183 removed udev_get_sys_path() and friends
+            return 183
+        if hasattr(libudev, funcname):
+            return version
+    return None
+
+
+#: The environment variable to override the udev library to load.  If set,
+#: its value is given to :class:`ctypes.CDLL` as is, so it can either be a
+#: soname (e.g. ``libudev.so.1``) or a path to the library.
+LIBRARY_VARIABLE = 'PYUDEV_UDEV_LIBRARY'
+
+#: The environment variable to select the backend to load the udev library
+#: with.  Its value must be one of the keys of :data:`BACKENDS`.  If unset,
+#: the ``ctypes`` backend is used.
+BACKEND_VARIABLE = 'PYUDEV_BACKEND'
+
+
+_libudev = None
+_libudev_lock = Lock()
+
+
+def _find_udev_library():
+    """
+    Find the name of the ``udev`` library.
+
+    Return the value of :data:`LIBRARY_VARIABLE`, if set, or the name of the
+    library as found by :func:`ctypes.util.find_library()` otherwise.
 
     Raise :exc:`~exceptions.ImportError`, if the udev library was not found.
     """
+    udev_library_name = os.environ.get(LIBRARY_VARIABLE)
+    if udev_library_name:
+        return udev_library_name
     udev_library_name = find_library('udev')
     if not udev_library_name:
         raise ImportError('No library named udev')
-    libudev = CDLL(udev_library_name, use_errno=True)
+    return udev_library_name
+
+
+def _list_entry_pairs(libudev, entry):
+    """
+    Get all ``(name, value)`` pairs of the list starting at ``entry`` as
+    tuple.
+
+    ``libudev`` is the library to call the list functions of.
+    """
+    get_name = libudev.udev_list_entry_get_name
+    get_value = libudev.udev_list_entry_get_value
+    get_next = libudev.udev_list_entry_get_next
+    pairs = []
+    while entry:
+        pairs.append((get_name(entry), get_value(entry)))
+        entry = get_next(entry)
+    return tuple(pairs)
+
+
+def _load_ctypes_backend(udev_library_name):
+    """
+    Load the ``udev`` library ``udev_library_name`` and return a
+    :class:`ctypes.CDLL` object for it, with all signatures and error
+    checkers applied.
+
+    Raise :exc:`~exceptions.ImportError`, if the udev library could not be
+    loaded.
+    """
+    try:
+        libudev = CDLL(udev_library_name, use_errno=True)
+    except OSError as error:
+        raise ImportError('Could not load {0!r}: {1}'.format(
+            udev_library_name, error))
     # context function signature
     for namespace, members in SIGNATURES.items():
         for funcname in members:
@@ -228,4 +317,76 @@ def load_udev_library():
                 errorchecker = ERROR_CHECKERS.get(fullname)
                 if errorchecker:
                     func.errcheck = errorchecker
+    libudev.list_entry_pairs = partial(_list_entry_pairs, libudev)
     return libudev
+
+
+def _load_cffi_backend(udev_library_name):
+    """
+    Load the ``udev`` library ``udev_library_name`` through :mod:`cffi`, and
+    return a :class:`pyudev._cffi.CffiLibrary` object for it.
+
+    Raise :exc:`~exceptions.ImportError`, if :mod:`cffi` is not available, or
+    if the udev library could not be loaded.
+    """
+    from pyudev._cffi import CffiLibrary
+    try:
+        return CffiLibrary(udev_library_name, SIGNATURES, ERROR_CHECKERS)
+    except OSError as error:
+        raise ImportError('Could not load {0!r}: {1}'.format(
+            udev_library_name, error))
+
+
+#: The backends to load the udev library with, mapping the name of each
+#: backend to a function, which loads the library.
+BACKENDS = {
+    'ctypes': _load_ctypes_backend,
+    'cffi': _load_cffi_backend,
+}
+
+
+def _load_udev_library():
+    """
+    Load the ``udev`` library with the backend given by
+    :data:`BACKEND_VARIABLE`.
+
+    Raise :exc:`~exceptions.ImportError`, if the udev library was not found,
+    or if the backend is unknown or not available.
+    """
+    backend = os.environ.get(BACKEND_VARIABLE) or 'ctypes'
+    load_backend = BACKENDS.get(backend)
+    if load_backend is None:
+        raise ImportError('Unknown backend {0!r}, must be one of {1}'.format(
+            backend, ', '.join(sorted(BACKENDS))))
+    return load_backend(_find_udev_library())
+
+
+def load_udev_library():
+    """
+    Load the ``udev`` library and return a :class:`ctypes.CDLL` object for
+    it.  The library has errno handling enabled.
+
+    Important functions are given proper signatures and return types to
+    support type checking and argument conversion.
+
+    The library is only loaded once per process, subsequent calls return the
+    same object.  This function is thread-safe.
+
+    If :data:`LIBRARY_VARIABLE` is set in the environment, load the library
+    given by this variable, instead of searching for it with
+    :func:`ctypes.util.find_library()`.
+
+    The library is loaded with :mod:`ctypes`, unless another backend is
+    selected with :data:`BACKEND_VARIABLE`.  All backends return an object
+    with the same interface as :class:`ctypes.CDLL`, with an additional
+    ``list_entry_pairs(entry)`` method, which returns all ``(name, value)``
+    pairs of a udev list as tuple.
+
+    Raise :exc:`~exceptions.ImportError`, if the udev library was not found.
+    """
+    global _libudev # pylint: disable=global-statement
+    if _libudev is None:
+        with _libudev_lock:
+            if _libudev is None:
+                _libudev = _load_udev_library()
+    return _libudev
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev._sysfs
+    =============
+
+    Scanning ``sysfs`` for devices without libudev.
+
+    .. moduleauthor::  mulhern  <amulhern@redhat.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import os
+
+
+def _list_links(directory):
+    """
+    List the symbolic links and directories in ``directory``.
+
+    Use :func:`os.scandir` if available, to skip regular files without
+    further system calls.
+
+    Return a list of the names of all entries as unicode strings, or an empty
+    list, if ``directory`` does not exist.
+    """
+    try:
+        if hasattr(os, 'scandir'):
+            return [entry.name for entry in os.scandir(directory)
+                    if not entry.name.startswith('.') and
+                    (entry.is_symlink() or entry.is_dir())]
+        return [name for name in os.listdir(directory)
+                if not name.startswith('.')]
+    except EnvironmentError:
+        return []
+
+
+def _subsystem_directories(sys_mount):
+    """
+    Get all directories in ``sysfs``, which contain links to the devices of a
+    subsystem.
+
+    ``sys_mount`` is the ``sysfs`` mount point as unicode string.
+
+    Yield ``(subsystem, directory)`` pairs, both as unicode strings.
+    """
+    bus_path = os.path.join(sys_mount, 'bus')
+    for bus in _list_links(bus_path):
+        yield bus, os.path.join(bus_path, bus, 'devices')
+    class_path = os.path.join(sys_mount, 'class')
+    classes = _list_links(class_path)
+    for subsystem in classes:
+        yield subsystem, os.path.join(class_path, subsystem)
+    if 'block' not in classes:
+        # kernels with CONFIG_SYSFS_DEPRECATED have no block class
+        yield 'block', os.path.join(sys_mount, 'block')
+
+
+def scan_devices(sys_mount, match_subsystem=None, match_sys_name=None):
+    """
+    Scan ``sysfs`` for devices.
+
+    ``sys_mount`` is the ``sysfs`` mount point as unicode string.
+    ``match_subsystem`` and ``match_sys_name`` are callables, which get the
+    subsystem or the device name of a device as unicode string, and return
+    ``True``, if the device is to be included.  If ``None``, all devices are
+    included.  Both are evaluated before resolving the path of a device, so
+    that the devices of excluded subsystems are not even listed.
+
+    Return a sorted list of the ``sysfs`` paths of all devices as unicode
+    strings.
+    """
+    sys_paths = set()
+    for subsystem, directory in _subsystem_directories(sys_mount):
+        if match_subsystem is not None and not match_subsystem(subsystem):
+            continue
+        for name in _list_links(directory):
+            if (match_sys_name is not None and
+                    not match_sys_name(name.replace('!', '/'))):
+                continue
+            link = os.path.join(directory, name)
+            try:
+                target = os.readlink(link)
+            except EnvironmentError:
+                # not a link, so not a device
+                continue
+            sys_paths.add(os.path.normpath(os.path.join(directory, target)))
+    return sorted(sys_paths)
@@ -32,6 +32,7 @@
 import os
 import sys
 import stat
+import time
 
 
 if sys.version_info[0] == 2:
@@ -40,6 +41,10 @@
     text_type = str
 
 
+# a clock, which is not affected by changes to the system time, if available
+monotonic = getattr(time, 'monotonic', time.time)
+
+
 def ensure_byte_string(value):
     """
     Return the given ``value`` as bytestring.
@@ -104,15 +109,14 @@ def udev_list_iterate(libudev, entry):
     """
     Iteration helper for udev list entry objects.
 
-    Yield a tuple ``(name, value)``.  ``name`` and ``value`` are bytestrings
-    containing the name and the value of the list entry.  The exact contents
-    depend on the list iterated over.
+    Return an iterator over tuples ``(name, value)``.  ``name`` and ``value``
+    are bytestrings containing the name and the value of the list entry.  The
+    exact contents depend on the list iterated over.
+
+    The whole list is read at once with the ``list_entry_pairs()`` helper of
+    the library (see :func:`pyudev._libudev.load_udev_library()`).
     """
-    while entry:
-        name = libudev.udev_list_entry_get_name(entry)
-        value = libudev.udev_list_entry_get_value(entry)
-        yield (name, value)
-        entry = libudev.udev_list_entry_get_next(entry)
+    return iter(libudev.list_entry_pairs(entry))
 
 
 # for the sake of readability
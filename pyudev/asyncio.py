@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.asyncio
+    ==============
+
+    asyncio integration.
+
+    :class:`MonitorObserver` integrates device monitoring into an
+    :mod:`asyncio` event loop by reading the monitor in a reader callback of
+    the loop, and handing out devices as futures.
+
+    :mod:`asyncio` must be available when importing this module.
+
+    .. moduleauthor::  mulhern  <amulhern@redhat.com>
+    .. versionadded:: 0.17
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+from collections import deque
+
+import asyncio
+
+
+class MonitorObserver(object):
+    """
+    An observer for device events integrating into an :mod:`asyncio` event
+    loop.
+
+    This class registers the :meth:`~pyudev.Monitor.fileno()` of a monitor
+    as reader of the event loop, and queues received devices until they are
+    retrieved with :meth:`next_event()`, or with ``async for``:
+
+    >>> from pyudev import Context, Monitor
+    >>> from pyudev.asyncio import MonitorObserver
+    >>> context = Context()
+    >>> monitor = Monitor.from_netlink(context)
+    >>> monitor.filter_by(subsystem='input')
+    >>> observer = MonitorObserver(monitor)
+    >>> async def print_events():
+    ...     async for device in observer:
+    ...         print('{0.action} on {0.device_path}'.format(device))
+
+    The queue of received devices is bounded by ``maxsize``.  If it is full,
+    the observer stops reading the monitor until devices are retrieved from
+    the queue again, so that pending events accumulate in the receive buffer
+    of the monitor socket instead of in memory.
+
+    .. warning::
+
+       If the receive buffer of the monitor socket overflows, the kernel
+       drops events.  Increase the buffer with
+       :meth:`~pyudev.Monitor.set_receive_buffer_size()` if the consumer
+       cannot keep up with bursts of events.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, monitor, maxsize=1000, loop=None):
+        """
+        Create a new observer for the given ``monitor``.
+
+        ``monitor`` is the :class:`~pyudev.Monitor` to observe.  ``maxsize``
+        is the maximum number of devices to queue as integer.  If ``0`` or
+        ``None`` the queue is unbounded.  ``loop`` is the event loop to
+        integrate into, and defaults to the loop returned by
+        :func:`asyncio.get_event_loop()`.
+
+        The observer is enabled immediately.
+        """
+        self.monitor = monitor
+        self.maxsize = maxsize
+        self._loop = loop if loop is not None else asyncio.get_event_loop()
+        self._devices = deque()
+        self._waiters = deque()
+        self._enabled = False
+        self._reading = False
+        self.start()
+
+    @property
+    def enabled(self):
+        """
+        Whether this observer is enabled or not.
+
+        If ``True`` (the default), this observer is enabled, and reads
+        events.  Otherwise it is disabled and does not read any events.
+        """
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        if value:
+            self.start()
+        else:
+            self.stop()
+
+    def start(self):
+        """
+        Enable this observer.
+
+        Do nothing, if the observer is already enabled.
+        """
+        if self._enabled:
+            return
+        self.monitor.start()
+        self._enabled = True
+        self._update_reader()
+
+    def stop(self):
+        """
+        Disable this observer.
+
+        Devices already queued can still be retrieved.  Do nothing, if the
+        observer is already disabled.
+        """
+        if not self._enabled:
+            return
+        self._enabled = False
+        self._update_reader()
+
+    def _is_full(self):
+        return bool(self.maxsize) and len(self._devices) >= self.maxsize
+
+    def _update_reader(self):
+        """
+        Add or remove the monitor as reader of the event loop, depending on
+        whether this observer is enabled and the queue has room.
+        """
+        reading = self._enabled and not self._is_full()
+        if reading and not self._reading:
+            self._loop.add_reader(self.monitor.fileno(),
+                                  self._process_udev_event)
+        elif not reading and self._reading:
+            self._loop.remove_reader(self.monitor.fileno())
+        self._reading = reading
+
+    def _process_udev_event(self):
+        max_count = None
+        if self.maxsize:
+            max_count = self.maxsize - len(self._devices)
+        for device in self.monitor.poll_many(timeout=0, max_count=max_count):
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(device)
+                    break
+            else:
+                self._devices.append(device)
+        self._update_reader()
+
+    def next_event(self, timeout=None):
+        """
+        Get the next device event.
+
+        ``timeout`` is a floating point number that specifies a time-out in
+        seconds.  If omitted or ``None``, wait until a device event is
+        available.
+
+        Return a :class:`asyncio.Future`, whose result is the next
+        :class:`~pyudev.Device`, or ``None`` if a timeout occurred.  Await it
+        in a coroutine::
+
+           device = await observer.next_event(timeout=5)
+        """
+        future = self._loop.create_future()
+        if self._devices:
+            future.set_result(self._devices.popleft())
+            self._update_reader()
+            return future
+        self._waiters.append(future)
+        if timeout is not None:
+            def _timeout():
+                if not future.done():
+                    future.set_result(None)
+            handle = self._loop.call_later(timeout, _timeout)
+            future.add_done_callback(lambda _: handle.cancel())
+        return future
+
+    def __aiter__(self):
+        """
+        Iterate asynchronously over device events with ``async for``.
+
+        The iteration is endless.
+        """
+        return self
+
+    def __anext__(self):
+        return self.next_event()
@@ -29,18 +29,26 @@
 from __future__ import (print_function, division, unicode_literals,
                         absolute_import)
 
+import os
+from fnmatch import fnmatchcase
+
+from subprocess import CalledProcessError
 try:
     from subprocess import check_output
 except ImportError:
     from pyudev._compat import check_output
 
-from pyudev.device import Device
-from pyudev._libudev import load_udev_library
+from pyudev.device import Device, DeviceNotFoundAtPathError
+from pyudev._sysfs import scan_devices
+from pyudev._libudev import load_udev_library, guess_udev_version
 from pyudev._util import (ensure_unicode_string, ensure_byte_string,
                           udev_list_iterate, property_value_to_bytes)
 
 
-__all__ = ['udev_version', 'Context', 'Enumerator']
+__all__ = ['udev_version', 'Context', 'Enumerator', 'DeviceTree']
+
+
+_udev_version = None
 
 
 def udev_version():
@@ -54,22 +62,46 @@ def udev_version():
     :data:`sys.version_info`).
 
     As libudev itself does not provide a function to query the version number,
-    this function calls the ``udevadm`` utilitiy, so be prepared to catch
-    :exc:`~exceptions.EnvironmentError` and
-    :exc:`~subprocess.CalledProcessError` if you call this function.
+    this function calls the ``udevadm`` utilitiy.  The version is only
+    queried once per process, subsequent calls return the same number.
+
+    If ``udevadm`` is not available (e.g. in containers), the version is
+    guessed from the functions provided by the udev library instead.  In this
+    case the returned number is the oldest udev release providing these
+    functions, which is good enough to check whether a feature is available,
+    but may be lower than the real version.
 
     Return the version number as single integer.  Raise
     :exc:`~exceptions.ValueError`, if the version number retrieved from udev
     could not be converted to an integer.  Raise
     :exc:`~exceptions.EnvironmentError`, if ``udevadm`` was not found, or could
-    not be executed.  Raise :exc:`subprocess.CalledProcessError`, if
-    ``udevadm`` returned a non-zero exit code.  On Python 2.7 or newer, the
-    ``output`` attribute of this exception is correctly set.
+    not be executed, and the version could not be guessed from the library.
+    Raise :exc:`subprocess.CalledProcessError`, if ``udevadm`` returned a
+    non-zero exit code, and the version could not be guessed from the
+    library.  On Python 2.7 or newer, the ``output`` attribute of this
+    exception is correctly set.
 
     .. versionadded:: 0.8
+
+    .. versionchanged:: 0.17
+       Cache the version, and guess it from the library, if ``udevadm`` is
+       not available.
     """
-    output = ensure_unicode_string(check_output(['udevadm', '--version']))
-    return int(output.strip())
+    global _udev_version # pylint: disable=global-statement
+    if _udev_version is None:
+        try:
+            output = ensure_unicode_string(
+                check_output(['udevadm', '--version']))
+            _udev_version = int(output.strip())
+        except (EnvironmentError, CalledProcessError) as error:
+            try:
+                version = guess_udev_version(load_udev_library())
+            except ImportError:
+                version = None
+            if version is None:
+                raise error
+            _udev_version = version
+    return _udev_version
 
 
 class Context(object):
@@ -200,23 +232,57 @@ class Enumerator(object):
     Once added, a filter cannot be removed anymore.  Create a new object
     instead.
 
+    Devices are scanned by one of the :attr:`ENGINES`.  The ``libudev``
+    engine (the default) lets libudev scan and filter the devices.  The
+    ``sysfs`` engine lists the device links in ``/sys/bus/*/devices``,
+    ``/sys/class`` and ``/sys/block``, and evaluates subsystem, device name
+    and parent filters on the directory structure alone.  Only if property,
+    attribute, tag or initialization filters are added, it creates a
+    :class:`Device` for each remaining device to evaluate these filters.  The
+    ``sysfs`` engine does not list modules, drivers and subsystems, and
+    yields devices sorted by their ``sysfs`` path.
+
     Instances of this class can directly be given as given ``udev_enumerate *``
     to functions wrapped through :mod:`ctypes`.
     """
 
-    def __init__(self, context):
+    #: The available engines to scan for devices
+    ENGINES = ('libudev', 'sysfs')
+
+    def __init__(self, context, engine='libudev'):
         """
         Create a new enumerator with the given ``context`` (a
         :class:`Context` instance).
 
+        ``engine`` is the name of the engine to scan for devices with, and
+        must be one of :attr:`ENGINES`.
+
         While you can create objects of this class directly, this is not
-        recommended.  Call :method:`Context.list_devices()` instead.
+        recommended.  Call :method:`Context.list_devices()` instead, unless
+        you need the ``sysfs`` engine.
+
+        Raise :exc:`~exceptions.ValueError`, if ``engine`` is unknown.
+
+        .. versionchanged:: 0.17
+           Add ``engine`` argument.
         """
         if not isinstance(context, Context):
             raise TypeError('Invalid context object')
         self.context = context
         self._as_parameter_ = context._libudev.udev_enumerate_new(context)
         self._libudev = context._libudev
+        if engine not in self.ENGINES:
+            raise ValueError('Invalid engine: {0!r}'.format(engine))
+        self.engine = engine
+        # all filters, to evaluate them in the sysfs engine
+        self._subsystems = []
+        self._nomatch_subsystems = []
+        self._sys_names = []
+        self._properties = []
+        self._attributes = []
+        self._tags = []
+        self._parents = []
+        self._is_initialized = False
 
     def __del__(self):
         self._libudev.udev_enumerate_unref(self)
@@ -280,6 +346,9 @@ def match_subsystem(self, subsystem, nomatch=False):
                  if not nomatch else
                  self._libudev.udev_enumerate_add_nomatch_subsystem)
         match(self, ensure_byte_string(subsystem))
+        subsystems = (self._subsystems if not nomatch else
+                      self._nomatch_subsystems)
+        subsystems.append(ensure_unicode_string(subsystem))
         return self
 
     def match_sys_name(self, sys_name):
@@ -294,6 +363,7 @@ def match_sys_name(self, sys_name):
         """
         self._libudev.udev_enumerate_add_match_sysname(
             self, ensure_byte_string(sys_name))
+        self._sys_names.append(ensure_unicode_string(sys_name))
         return self
 
     def match_property(self, property, value):
@@ -314,6 +384,9 @@ def match_property(self, property, value):
         """
         self._libudev.udev_enumerate_add_match_property(
             self, ensure_byte_string(property), property_value_to_bytes(value))
+        self._properties.append(
+            (ensure_unicode_string(property),
+             ensure_unicode_string(property_value_to_bytes(value))))
         return self
 
     def match_attribute(self, attribute, value, nomatch=False):
@@ -348,6 +421,9 @@ def match_attribute(self, attribute, value, nomatch=False):
                  self._libudev.udev_enumerate_add_nomatch_sysattr)
         match(self, ensure_byte_string(attribute),
               property_value_to_bytes(value))
+        self._attributes.append(
+            (ensure_unicode_string(attribute),
+             ensure_unicode_string(property_value_to_bytes(value)), nomatch))
         return self
 
     def match_tag(self, tag):
@@ -363,6 +439,7 @@ def match_tag(self, tag):
         .. versionadded:: 0.6
         """
         self._libudev.udev_enumerate_add_match_tag(self, ensure_byte_string(tag))
+        self._tags.append(ensure_unicode_string(tag))
         return self
 
     def match_is_initialized(self):
@@ -384,6 +461,7 @@ def match_is_initialized(self):
         .. versionadded:: 0.8
         """
         self._libudev.udev_enumerate_add_match_is_initialized(self)
+        self._is_initialized = True
         return self
 
     def match_parent(self, parent):
@@ -401,15 +479,300 @@ def match_parent(self, parent):
         .. versionadded:: 0.13
         """
         self._libudev.udev_enumerate_add_match_parent(self, parent)
+        self._parents.append(parent.sys_path)
         return self
 
-    def __iter__(self):
+    def _scan_sys_paths(self):
         """
-        Iterate over all matching devices.
+        Scan for matching devices.
 
-        Yield :class:`Device` objects.
+        Return a list of the ``sysfs`` paths of all matching devices as byte
+        strings.  The whole list is read in a single pass, before any device
+        is created.
         """
         self._libudev.udev_enumerate_scan_devices(self)
         entry = self._libudev.udev_enumerate_get_list_entry(self)
-        for name, _ in udev_list_iterate(self._libudev, entry):
+        return [name for name, _ in udev_list_iterate(self._libudev, entry)]
+
+    def _match_subsystem(self, subsystem):
+        """
+        Whether ``subsystem`` matches the subsystem filters.
+        """
+        if self._subsystems and not any(
+                fnmatchcase(subsystem, p) for p in self._subsystems):
+            return False
+        return not any(
+            fnmatchcase(subsystem, p) for p in self._nomatch_subsystems)
+
+    def _match_sys_name(self, sys_name):
+        """
+        Whether ``sys_name`` matches the device name filters.
+        """
+        return any(fnmatchcase(sys_name, p) for p in self._sys_names)
+
+    def _match_parent(self, sys_path):
+        """
+        Whether ``sys_path`` matches the parent filters.
+        """
+        return not self._parents or any(
+            sys_path == p or sys_path.startswith(p + os.sep)
+            for p in self._parents)
+
+    def _match_device(self, device):
+        """
+        Whether ``device`` matches the property, attribute, tag and
+        initialization filters.
+        """
+        if self._properties and not any(
+                fnmatchcase(name, name_pattern) and
+                fnmatchcase(value, value_pattern)
+                for name, value in device.items()
+                for name_pattern, value_pattern in self._properties):
+            return False
+        for attribute, pattern, nomatch in self._attributes:
+            value = device.attributes.get(attribute)
+            matches = value is not None and fnmatchcase(
+                ensure_unicode_string(value), pattern)
+            if matches == nomatch:
+                return False
+        if not all(tag in device.tags for tag in self._tags):
+            return False
+        if self._is_initialized and not device.is_initialized:
+            # devices without node or interface are never initialized
+            return not (device.device_number or 'IFINDEX' in device)
+        return True
+
+    def _scan_sysfs(self):
+        """
+        Scan ``sysfs`` for matching devices with the ``sysfs`` engine.
+
+        Return a list of ``(sys_path, device)`` pairs of all matching
+        devices.  ``sys_path`` is the ``sysfs`` path as unicode string.
+        ``device`` is the :class:`Device` object, if one was created to
+        evaluate the filters, or ``None`` otherwise.
+        """
+        match_subsystem = (self._match_subsystem
+                           if self._subsystems or self._nomatch_subsystems
+                           else None)
+        match_sys_name = self._match_sys_name if self._sys_names else None
+        sys_paths = [
+            sys_path for sys_path in scan_devices(
+                self.context.sys_path, match_subsystem, match_sys_name)
+            if self._match_parent(sys_path)]
+        if not (self._properties or self._attributes or self._tags or
+                self._is_initialized):
+            return [(sys_path, None) for sys_path in sys_paths]
+        devices = []
+        for sys_path in sys_paths:
+            try:
+                device = Device.from_sys_path(self.context, sys_path)
+            except DeviceNotFoundAtPathError:
+                # the device was removed while scanning
+                continue
+            if self._match_device(device):
+                devices.append((sys_path, device))
+        return devices
+
+    def sys_paths(self):
+        """
+        Return the ``sysfs`` paths of all matching devices.
+
+        Unlike iterating over this object, this method does not create any
+        :class:`Device` objects, and hence needs no additional libudev lookup
+        and no ``sysfs`` access per device.  Use this method if you only need
+        to know *which* devices match, or if you only want to create
+        :class:`Device` objects for some of them with
+        :meth:`Device.from_sys_path()`.
+
+        Return a list of unicode strings containing the ``sysfs`` paths of all
+        matching devices, including the ``sysfs`` mount point.
+
+        .. versionadded:: 0.17
+        """
+        if self.engine == 'sysfs':
+            return [sys_path for sys_path, _ in self._scan_sysfs()]
+        return [ensure_unicode_string(name) for name in self._scan_sys_paths()]
+
+    def __iter__(self):
+        """
+        Iterate over all matching devices.
+
+        The list of matching devices is scanned completely before the first
+        device is yielded.
+
+        Yield :class:`Device` objects.
+
+        .. versionchanged:: 0.17
+           Scan the whole list of matching devices before yielding the first
+           device.
+        """
+        if self.engine == 'sysfs':
+            for sys_path, device in self._scan_sysfs():
+                if device is None:
+                    device = Device.from_sys_path(self.context, sys_path)
+                yield device
+            return
+        for name in self._scan_sys_paths():
             yield Device.from_sys_path(self.context, name)
+
+
+class DeviceTree(object):
+    """
+    An index of the device hierarchy.
+
+    The index is built from a single enumeration of all devices, and maps
+    each device to its children.  Afterwards, the children and descendants
+    of a device can be queried in time proportional to the number of
+    returned devices, instead of enumerating all devices again for every
+    query like :attr:`Device.children` does:
+
+    >>> from pyudev import Context, Device, DeviceTree
+    >>> context = Context()
+    >>> tree = DeviceTree(context)
+    >>> sda = Device.from_name(context, 'block', 'sda')
+    >>> [d.sys_name for d in tree.children_of(sda)]
+    [u'sda1', u'sda2']
+
+    The parent of a device in this index is the closest ancestor directory
+    in ``sysfs``, which is a device itself.  This is the same relation as
+    used by :attr:`Device.parent`.  Such parents are contained in the index,
+    even if they are not enumerated by :meth:`Context.list_devices()`.
+
+    The index is a snapshot of the device hierarchy at the time it was
+    built, it does not change if devices are added or removed.  Call
+    :meth:`refresh()` to rebuild it.
+
+    All query methods accept either a :class:`Device` or the ``sysfs`` path
+    of a device as unicode string.  They raise :exc:`~exceptions.KeyError`,
+    if the device is not contained in this index.  The :class:`Device`
+    objects yielded by query methods are only created when they are
+    retrieved from the returned iterators, and may hence raise
+    :exc:`DeviceNotFoundAtPathError`, if a device was removed after the
+    index was built.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, context):
+        """
+        Create a new index of all devices of the given ``context`` (a
+        :class:`Context` instance).
+        """
+        self.context = context
+        self._children = {}
+        self._parents = {}
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rebuild this index from a new enumeration of all devices.
+        """
+        sys_paths = Enumerator(self.context).sys_paths()
+        children = dict((sys_path, []) for sys_path in sys_paths)
+        parents = {}
+        no_devices = set()
+        root = self.context.sys_path
+        unresolved = list(sys_paths)
+        while unresolved:
+            sys_path = unresolved.pop()
+            parent = os.path.dirname(sys_path)
+            while len(parent) > len(root) and parent not in children:
+                if parent not in no_devices:
+                    # like libudev, consider any directory with an uevent
+                    # file a device, even if it is not enumerated
+                    if os.path.exists(os.path.join(parent, 'uevent')):
+                        children[parent] = []
+                        unresolved.append(parent)
+                        break
+                    no_devices.add(parent)
+                parent = os.path.dirname(parent)
+            if parent in children:
+                parents[sys_path] = parent
+                children[parent].append(sys_path)
+        for child_paths in children.values():
+            child_paths.sort()
+        self._children = children
+        self._parents = parents
+
+    def __len__(self):
+        """
+        Return the number of devices in this index.
+        """
+        return len(self._children)
+
+    def __contains__(self, device):
+        """
+        Check whether ``device`` is contained in this index.
+        """
+        return getattr(device, 'sys_path', device) in self._children
+
+    def _lookup(self, device):
+        """
+        Get the ``sysfs`` path of ``device``.
+
+        Raise :exc:`~exceptions.KeyError`, if ``device`` is not contained in
+        this index.
+        """
+        sys_path = getattr(device, 'sys_path', device)
+        if sys_path not in self._children:
+            raise KeyError(sys_path)
+        return sys_path
+
+    def _iter_subtree(self, sys_path):
+        """
+        Yield ``sys_path`` and the ``sysfs`` paths of all its descendants in
+        depth-first order.
+        """
+        stack = [sys_path]
+        while stack:
+            sys_path = stack.pop()
+            yield sys_path
+            stack.extend(reversed(self._children[sys_path]))
+
+    def _devices(self, sys_paths):
+        """
+        Yield a :class:`Device` for each path in ``sys_paths``.
+        """
+        for sys_path in sys_paths:
+            yield Device.from_sys_path(self.context, sys_path)
+
+    def parent_of(self, device):
+        """
+        Get the parent of the given ``device``.
+
+        Return the parent :class:`Device`, or ``None``, if ``device`` has no
+        parent.
+        """
+        parent = self._parents.get(self._lookup(device))
+        if parent is None:
+            return None
+        return Device.from_sys_path(self.context, parent)
+
+    def children_of(self, device):
+        """
+        Get the direct children of the given ``device``.
+
+        Return an iterator yielding a :class:`Device` for each child.
+        """
+        return self._devices(list(self._children[self._lookup(device)]))
+
+    def descendants_of(self, device):
+        """
+        Get all descendants of the given ``device``.
+
+        Return an iterator yielding a :class:`Device` for each descendant in
+        depth-first order.  ``device`` itself is not included.
+        """
+        sys_paths = self._iter_subtree(self._lookup(device))
+        next(sys_paths)
+        return self._devices(sys_paths)
+
+    def subtree(self, device):
+        """
+        Get the subtree rooted at the given ``device``.
+
+        Return an iterator yielding ``device`` itself followed by all its
+        descendants in depth-first order as :class:`Device` objects.  This
+        yields the same devices as :meth:`Enumerator.match_parent()`.
+        """
+        return self._devices(self._iter_subtree(self._lookup(device)))
@@ -27,17 +27,23 @@
 __all__ = [
   'Attributes',
   'Device',
+  'DeviceSnapshot',
   'DeviceNotFoundAtPathError',
   'DeviceNotFoundByNameError',
   'DeviceNotFoundByNumberError',
   'DeviceNotFoundError',
   'DeviceNotFoundInEnvironmentError',
-  'Tags'
+  'Tags',
+  'read_attributes',
+  'read_properties'
 ]
 
 from ._device import Attributes
 from ._device import Device
 from ._device import Tags
+from ._bulk import read_attributes
+from ._database import read_properties
+from ._snapshot import DeviceSnapshot
 from ._errors import DeviceNotFoundAtPathError
 from ._errors import DeviceNotFoundByNameError
 from ._errors import DeviceNotFoundByNumberError
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.device._bulk
+    ===================
+
+    Reading attributes of many devices at once.
+
+    .. moduleauthor::  mulhern  <amulhern@redhat.com>
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import errno
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+from pyudev._util import ensure_unicode_string
+
+
+# libudev does not follow symlinks for attributes, so neither do we
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0) | \
+              getattr(os, 'O_CLOEXEC', 0)
+
+
+def _read_sysfs_file(filename):
+    """
+    Read the whole content of the sysfs file ``filename``.
+
+    Raise :exc:`~exceptions.EnvironmentError`, if the file cannot be read.
+    """
+    fd = os.open(filename, _OPEN_FLAGS)
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+
+def _read_sysfs_attributes(job):
+    """
+    Read attributes from the sysfs directory of a device.
+
+    ``job`` is a pair of the ``sysfs`` path of the device and a list of
+    attribute names, both as unicode strings.
+
+    Return a pair ``(values, fallback)``.  ``values`` is a dictionary mapping
+    the names of all attributes read to their values as byte strings.
+    ``fallback`` is a list of names of attributes, which could not be read
+    directly, and must be read through libudev instead.
+    """
+    sys_path, attributes = job
+    values = {}
+    fallback = []
+    for attribute in attributes:
+        try:
+            value = _read_sysfs_file(os.path.join(sys_path, attribute))
+        except EnvironmentError as error:
+            if error.errno not in (errno.ENOENT, errno.ENOTDIR):
+                # let libudev handle symlinks, directories and permissions
+                fallback.append(attribute)
+            continue
+        # strip trailing newlines, and cut the value at the first NUL like
+        # udev_device_get_sysattr_value() does
+        values[attribute] = value.rstrip(b'\n\r').split(b'\x00', 1)[0]
+    return values, fallback
+
+
+def read_attributes(devices, attributes, workers=None):
+    """
+    Read the given ``attributes`` of many ``devices`` at once.
+
+    ``devices`` is an iterable of :class:`Device` objects, e.g. an
+    :class:`Enumerator`.  ``attributes`` is an iterable of attribute names as
+    unicode or byte strings.  ``workers`` is the number of threads reading
+    attributes in parallel as integer.  If ``None``, use one thread per CPU.
+
+    The attribute files are read directly from ``sysfs`` in a pool of
+    threads.  Only attributes which cannot be read directly, e.g. symbolic
+    links like ``driver``, are read through libudev in the calling thread.
+    The values hence reflect the current content of ``sysfs``, and are not
+    taken from the cache of :class:`Attributes` or of libudev.
+
+    Return a dictionary mapping each :class:`Device` to a dictionary, which
+    maps the names of the attributes defined for this device as unicode
+    strings to their values as byte strings, like :class:`Attributes`.
+
+    .. versionadded:: 0.17
+    """
+    devices = list(devices)
+    attributes = [ensure_unicode_string(a) for a in attributes]
+    jobs = [(device.sys_path, attributes) for device in devices]
+    if workers is None:
+        workers = cpu_count()
+    workers = min(workers, len(jobs))
+    if workers > 1:
+        pool = ThreadPool(workers)
+        try:
+            results = pool.map(_read_sysfs_attributes, jobs,
+                               chunksize=max(1, len(jobs) // (workers * 4)))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_read_sysfs_attributes(job) for job in jobs]
+    device_values = {}
+    for device, (values, fallback) in zip(devices, results):
+        for attribute in fallback:
+            value = device.attributes.get(attribute)
+            if value is not None:
+                values[attribute] = value
+        device_values[device] = values
+    return device_values
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.device._database
+    =======================
+
+    Reading device properties directly from ``sysfs`` and the udev database.
+
+    .. moduleauthor::  mulhern  <amulhern@redhat.com>
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+
+from pyudev._util import ensure_unicode_string
+
+from ._bulk import _read_sysfs_file
+
+
+def _read_file(filename):
+    """
+    Read the whole content of ``filename``.
+
+    Return the content as byte string, or ``None``, if the file does not
+    exist or cannot be read.
+    """
+    try:
+        return _read_sysfs_file(filename)
+    except EnvironmentError:
+        return None
+
+
+def _parse_uevent(data, device_path):
+    """
+    Parse the content of the ``uevent`` file of a device.
+
+    ``data`` is the content as byte string.  ``device_path`` is the device
+    directory as unicode string, e.g. ``/dev``.
+
+    Return a dictionary mapping property names to values, both as unicode
+    strings.
+    """
+    properties = {}
+    for line in data.splitlines():
+        name, sep, value = line.partition(b'=')
+        if not sep:
+            continue
+        name = ensure_unicode_string(name)
+        value = ensure_unicode_string(value)
+        if name == 'DEVNAME':
+            # the kernel gives the name relative to the device directory
+            value = os.path.join(device_path, value)
+        properties[name] = value
+    return properties
+
+
+def _parse_database(data, device_path):
+    """
+    Parse a record of the udev database.
+
+    ``data`` is the content of the record as byte string.  ``device_path`` is
+    the device directory as unicode string, e.g. ``/dev``.
+
+    Return a dictionary mapping property names to values, both as unicode
+    strings.  Besides the properties stored in the record (``E:`` lines),
+    this dictionary contains the properties libudev derives from the record:
+    ``DEVLINKS`` (``S:`` lines), ``TAGS`` (``G:`` and ``Q:`` lines),
+    ``CURRENT_TAGS`` (``Q:`` lines) and ``USEC_INITIALIZED`` (``I:`` line).
+    """
+    properties = {}
+    links = []
+    tags = []
+    current_tags = []
+    for line in data.splitlines():
+        key, sep, value = line.partition(b':')
+        if not sep:
+            continue
+        value = ensure_unicode_string(value)
+        if key == b'E':
+            name, sep, value = value.partition('=')
+            if sep:
+                properties[name] = value
+        elif key == b'S':
+            links.append(os.path.join(device_path, value))
+        elif key == b'G':
+            if value not in tags:
+                tags.append(value)
+        elif key == b'Q':
+            if value not in tags:
+                tags.append(value)
+            if value not in current_tags:
+                current_tags.append(value)
+        elif key == b'I':
+            properties['USEC_INITIALIZED'] = value
+    if links:
+        properties['DEVLINKS'] = ' '.join(links)
+    if tags:
+        properties['TAGS'] = ':{0}:'.format(':'.join(tags))
+    if current_tags:
+        properties['CURRENT_TAGS'] = ':{0}:'.format(':'.join(current_tags))
+    return properties
+
+
+def _database_id(properties, sys_name):
+    """
+    Get the name of the udev database record of a device.
+
+    ``properties`` is a dictionary with the properties of the device read
+    from ``sysfs``.  ``sys_name`` is the name of the ``sysfs`` directory of
+    the device.
+
+    Return the name of the record as unicode string, or ``None``, if the
+    device has no subsystem, and thus no record.
+    """
+    subsystem = properties.get('SUBSYSTEM')
+    if not subsystem:
+        return None
+    major = properties.get('MAJOR')
+    if major is not None and major != '0':
+        return '{0}{1}:{2}'.format('b' if subsystem == 'block' else 'c',
+                                   major, properties.get('MINOR', '0'))
+    ifindex = properties.get('IFINDEX')
+    if ifindex is not None and ifindex != '0':
+        return 'n{0}'.format(ifindex)
+    return '+{0}:{1}'.format(subsystem, sys_name)
+
+
+def _read_device_properties(sys_path, sys_mount, device_path, database_path):
+    """
+    Read the properties of the device at ``sys_path`` from ``sysfs`` and the
+    udev database.
+
+    ``sys_mount`` is the ``sysfs`` mount point, ``device_path`` the device
+    directory, and ``database_path`` the directory of the udev database, all
+    as unicode strings.
+
+    Return a dictionary mapping property names to values, both as unicode
+    strings.
+    """
+    properties = {'DEVPATH': sys_path[len(sys_mount):]}
+    try:
+        properties['SUBSYSTEM'] = os.path.basename(
+            os.readlink(os.path.join(sys_path, 'subsystem')))
+    except EnvironmentError:
+        pass
+    data = _read_file(os.path.join(sys_path, 'uevent'))
+    if data is not None:
+        properties.update(_parse_uevent(data, device_path))
+    database_id = _database_id(properties, os.path.basename(sys_path))
+    if database_id is not None:
+        data = _read_file(os.path.join(database_path, database_id))
+        if data is not None:
+            properties.update(_parse_database(data, device_path))
+    return properties
+
+
+def read_properties(context, sys_paths=None):
+    """
+    Read the properties of many devices directly from ``sysfs`` and the udev
+    database.
+
+    ``context`` is the :class:`Context` to use.  ``sys_paths`` is an iterable
+    of the ``sysfs`` paths of the devices as unicode strings, e.g. from
+    :meth:`Enumerator.sys_paths()`.  If ``None``, read the properties of all
+    devices.
+
+    This function parses the ``uevent`` file of each device in ``sysfs``,
+    and its record in the udev database in ``/run/udev/data``.  It does not
+    create any :class:`Device` objects and does not call into libudev, so it
+    is much faster than reading the properties of each device through
+    :class:`Device`:
+
+    >>> from pyudev import Context, read_properties
+    >>> context = Context()
+    >>> properties = read_properties(context)
+    >>> properties['/sys/devices/virtual/mem/null']['DEVNAME']
+    '/dev/null'
+
+    The properties are the same as the properties of the corresponding
+    :class:`Device`, except that the order of the links in ``DEVLINKS``, and
+    of the tags in ``TAGS`` and ``CURRENT_TAGS`` may differ.
+
+    Return a dictionary mapping each ``sysfs`` path to a dictionary, which
+    maps property names to property values, both as unicode strings.
+
+    .. versionadded:: 0.17
+    """
+    if sys_paths is None:
+        sys_paths = context.list_devices().sys_paths()
+    sys_mount = context.sys_path
+    device_path = context.device_path
+    database_path = os.path.join(context.run_path, 'data')
+    return dict(
+        (sys_path, _read_device_properties(
+            sys_path, sys_mount, device_path, database_path))
+        for sys_path in sys_paths)
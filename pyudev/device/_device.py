@@ -36,13 +36,16 @@
 from collections import Mapping
 from datetime import timedelta
 
+from pyudev.device._bulk import _read_sysfs_attributes
 from pyudev.device._errors import DeviceNotFoundAtPathError
 from pyudev.device._errors import DeviceNotFoundByNameError
 from pyudev.device._errors import DeviceNotFoundByNumberError
 from pyudev.device._errors import DeviceNotFoundInEnvironmentError
+from pyudev.device._snapshot import DeviceSnapshot
 from pyudev._util import ensure_byte_string
 from pyudev._util import ensure_unicode_string
 from pyudev._util import get_device_type
+from pyudev._util import monotonic
 from pyudev._util import string_to_bool
 from pyudev._util import udev_list_iterate
 
@@ -283,6 +286,11 @@ def __init__(self, context, _device):
         self.context = context
         self._as_parameter_ = _device
         self._libudev = context._libudev
+        self._attribute_cache = None
+        # tags and device links of a libudev device never change, so decode
+        # them only once
+        self._tags = None
+        self._device_links = None
 
     def __del__(self):
         self._libudev.udev_device_unref(self)
@@ -321,7 +329,8 @@ def children(self):
 
            As the underlying library does not provide any means to directly
            query the children of a device, this property performs a linear
-           search through all devices.
+           search through all devices.  Use :class:`DeviceTree` to query the
+           children of many devices.
 
         Return an iterable yielding a :class:`Device` object for each direct
         child of this device.
@@ -608,10 +617,16 @@ def device_links(self):
            :meth:`Device.from_device_file()`. Hence do *not* rely on
            ``Device.from_device_file(context, link).device_path ==
            device.device_path`` from any ``link`` in ``device.device_links``.
+
+        .. versionchanged:: 0.17
+           The links are only read once per device object.
         """
-        devlinks = self._libudev.udev_device_get_devlinks_list_entry(self)
-        for name, _ in udev_list_iterate(self._libudev, devlinks):
-            yield ensure_unicode_string(name)
+        if self._device_links is None:
+            devlinks = self._libudev.udev_device_get_devlinks_list_entry(self)
+            self._device_links = tuple(
+                ensure_unicode_string(name)
+                for name, _ in udev_list_iterate(self._libudev, devlinks))
+        return iter(self._device_links)
 
     @property
     def action(self):
@@ -706,9 +721,39 @@ def tags(self):
 
         .. versionchanged:: 0.13
            Return a :class:`Tags` object now.
+
+        .. versionchanged:: 0.17
+           The tags are only read once per device object.
         """
         return Tags(self)
 
+    def _get_tags(self):
+        """
+        Get all tags of this device as tuple of unicode strings.
+        """
+        if self._tags is None:
+            tags = self._libudev.udev_device_get_tags_list_entry(self)
+            self._tags = tuple(
+                ensure_unicode_string(tag)
+                for tag, _ in udev_list_iterate(self._libudev, tags))
+        return self._tags
+
+    def snapshot(self):
+        """
+        Copy the data of this device into a :class:`DeviceSnapshot`.
+
+        All properties, tags and device links as well as the general
+        attributes of this device are read at once.  Afterwards the snapshot
+        provides them without any further call into libudev, which is
+        considerably faster if the same data is accessed repeatedly.  Unlike
+        :class:`Device` objects, snapshots can also be pickled.
+
+        Return a new :class:`DeviceSnapshot`.
+
+        .. versionadded:: 0.17
+        """
+        return DeviceSnapshot.from_device(self)
+
     def __iter__(self):
         """
         Iterate over the names of all properties defined for this device.
@@ -716,16 +761,62 @@ def __iter__(self):
         Return a generator yielding the names of all properties of this
         device as unicode strings.
         """
-        properties = self._libudev.udev_device_get_properties_list_entry(self)
-        for name, _ in udev_list_iterate(self._libudev, properties):
+        for name, _ in self._property_pairs():
             yield ensure_unicode_string(name)
 
     def __len__(self):
         """
         Return the amount of properties defined for this device as integer.
         """
+        return len(self._property_pairs())
+
+    def _property_pairs(self):
+        """
+        Read the names and values of all properties of this device in a
+        single pass.
+
+        Return a tuple of ``(name, value)`` pairs of byte strings.
+        """
         properties = self._libudev.udev_device_get_properties_list_entry(self)
-        return sum(1 for _ in udev_list_iterate(self._libudev, properties))
+        return self._libudev.list_entry_pairs(properties)
+
+    def properties_dict(self):
+        """
+        Get all properties of this device at once.
+
+        Names and values of all properties are read in a single pass, which
+        is considerably faster than looking up each property by its name.
+
+        Return a new dictionary mapping property names to property values,
+        both as unicode strings.
+
+        .. versionadded:: 0.17
+        """
+        return dict(
+            (ensure_unicode_string(name), ensure_unicode_string(value))
+            for name, value in self._property_pairs())
+
+    def items(self):
+        """
+        Get all properties of this device as ``(name, value)`` pairs.
+
+        Like ``dict.items()``, but read in a single pass (see
+        :meth:`properties_dict()`).
+
+        .. versionadded:: 0.17
+        """
+        return self.properties_dict().items()
+
+    def values(self):
+        """
+        Get the values of all properties of this device.
+
+        Like ``dict.values()``, but read in a single pass (see
+        :meth:`properties_dict()`).
+
+        .. versionadded:: 0.17
+        """
+        return self.properties_dict().values()
 
     def __getitem__(self, prop):
         """
@@ -819,6 +910,69 @@ def _is_attribute_file(filepath):
                 filename in ('dev', 'uevent') or
                 os.path.islink(filepath))
 
+
+class _AttributeCache(object):
+    """
+    Cached attribute names and values of a single device.
+
+    Entries older than ``ttl`` seconds are considered stale.  If ``ttl`` is
+    ``None``, entries never expire.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    #: Marker for attributes not in the cache
+    MISSING = object()
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._values = {}
+        self._names = None
+
+    def _is_fresh(self, timestamp):
+        return self.ttl is None or monotonic() - timestamp < self.ttl
+
+    def get_value(self, attribute):
+        """
+        Get the cached value of ``attribute`` (a byte string).
+
+        Return the value, which is ``None`` for non-existing attributes, or
+        :attr:`MISSING`, if the value is not cached or stale.
+        """
+        entry = self._values.get(attribute)
+        if entry is None or not self._is_fresh(entry[1]):
+            return self.MISSING
+        return entry[0]
+
+    def set_value(self, attribute, value):
+        self._values[attribute] = (value, monotonic())
+
+    def get_names(self):
+        """
+        Get the cached names of all attributes as tuple, or ``None``, if the
+        names are not cached or stale.
+        """
+        if self._names is None or not self._is_fresh(self._names[1]):
+            return None
+        return self._names[0]
+
+    def set_names(self, names):
+        self._names = (names, monotonic())
+
+    def invalidate(self, attributes=None):
+        """
+        Remove the given ``attributes`` (byte strings) from the cache.
+
+        If ``attributes`` is ``None``, clear the whole cache.
+        """
+        if attributes is None:
+            self._values.clear()
+            self._names = None
+        else:
+            for attribute in attributes:
+                self._values.pop(attribute, None)
+
+
 class Attributes(Mapping):
     """
     A mapping which holds udev attributes for :class:`Device` objects.
@@ -829,14 +983,31 @@ class Attributes(Mapping):
     (e.g. ``.keys()``, ``.items()``, ``in``) are available to access device
     attributes.
 
+    By default, every access calls into libudev, which reads each attribute
+    from sysfs only once for the lifetime of the underlying device.
+    Applications which read the same attributes of many devices repeatedly,
+    or which need current values, can enable a cache for each device with
+    :meth:`enable_cache()`.  The cache reads values directly from sysfs, and
+    reads them again once they expired or were invalidated.  The cache
+    belongs to the :class:`Device`, so it is shared by all
+    :class:`Attributes` objects of the same device:
+
+    >>> device.attributes.enable_cache(ttl=5)
+    >>> device.attributes.prefetch(['size', 'removable', 'queue/rotational'])
+    >>> device.attributes.asint('size')
+    976773168
+
     .. versionadded:: 0.5
+
+    .. versionchanged:: 0.17
+       Add an optional attribute cache.
     """
 
     def __init__(self, device):
         self.device = device
         self._libudev = device._libudev
 
-    def _get_attributes(self):
+    def _list_attributes(self):
         """
         Yields attributes of device.
         """
@@ -852,6 +1023,135 @@ def _get_attributes(self):
                 if _is_attribute_file(filepath):
                     yield filename
 
+    def _get_attributes(self):
+        """
+        Return an iterator over the names of all attributes of the device,
+        using the cache, if enabled.
+        """
+        cache = self.device._attribute_cache
+        if cache is None:
+            return self._list_attributes()
+        names = cache.get_names()
+        if names is None:
+            names = tuple(self._list_attributes())
+            cache.set_names(names)
+        return iter(names)
+
+    def _get_value(self, attribute):
+        """
+        Get the value of the given ``attribute``, using the cache, if
+        enabled.
+
+        Return the value as byte string, or ``None``, if the attribute does
+        not exist.
+        """
+        attribute = ensure_byte_string(attribute)
+        cache = self.device._attribute_cache
+        if cache is None:
+            return self._libudev.udev_device_get_sysattr_value(
+                self.device, attribute)
+        value = cache.get_value(attribute)
+        if value is cache.MISSING:
+            value = self._read_values([attribute])[attribute]
+            cache.set_value(attribute, value)
+        return value
+
+    def _read_values(self, attributes):
+        """
+        Read the given ``attributes`` (byte strings) directly from sysfs,
+        bypassing the values remembered by libudev.
+
+        Attributes which cannot be read directly, e.g. symbolic links like
+        ``driver``, are read through libudev.
+
+        Return a dictionary mapping each attribute to its value as byte
+        string, or to ``None``, if the attribute does not exist.
+        """
+        names = [ensure_unicode_string(a) for a in attributes]
+        values, fallback = _read_sysfs_attributes(
+            (self.device.sys_path, names))
+        result = {}
+        for attribute, name in zip(attributes, names):
+            if name in fallback:
+                result[attribute] = \
+                    self._libudev.udev_device_get_sysattr_value(
+                        self.device, attribute)
+            else:
+                result[attribute] = values.get(name)
+        return result
+
+    def enable_cache(self, ttl=None):
+        """
+        Cache attribute names and values of the device.
+
+        Once enabled, values and non-existence of attributes and the list of
+        attribute names are remembered for the lifetime of the
+        :class:`Device` object, or for ``ttl`` seconds, if ``ttl`` is given
+        as number.  If the cache is already enabled, only change its ``ttl``.
+
+        Values are read directly from sysfs, and read again, once they
+        expired or were removed with :meth:`invalidate()`, so that they
+        reflect the current content of sysfs.
+
+        .. note::
+
+           Attributes which cannot be read directly, e.g. symbolic links
+           like ``driver``, are still read through libudev, which remembers
+           their values for the lifetime of the underlying device.
+
+        .. versionadded:: 0.17
+        """
+        cache = self.device._attribute_cache
+        if cache is None:
+            self.device._attribute_cache = _AttributeCache(ttl)
+        else:
+            cache.ttl = ttl
+
+    def disable_cache(self):
+        """
+        Disable and clear the cache enabled with :meth:`enable_cache()`.
+
+        .. versionadded:: 0.17
+        """
+        self.device._attribute_cache = None
+
+    def invalidate(self, *attributes):
+        """
+        Remove the given ``attributes`` from the cache.
+
+        ``attributes`` are unicode or byte strings containing attribute
+        names.  If no attributes are given, clear the whole cache including
+        the list of attribute names.  Do nothing, if the cache is disabled.
+
+        .. versionadded:: 0.17
+        """
+        cache = self.device._attribute_cache
+        if cache is None:
+            return
+        if attributes:
+            cache.invalidate(ensure_byte_string(a) for a in attributes)
+        else:
+            cache.invalidate()
+
+    def prefetch(self, attributes):
+        """
+        Read the given ``attributes`` into the cache at once.
+
+        ``attributes`` is an iterable of unicode or byte strings containing
+        attribute names.  All attributes are read from sysfs in one pass,
+        without going through libudev (see :func:`read_attributes()`), and
+        replace cached values of these attributes.  Enable the cache without
+        ``ttl`` first, if it is disabled.
+
+        .. versionadded:: 0.17
+        """
+        if self.device._attribute_cache is None:
+            self.enable_cache()
+        cache = self.device._attribute_cache
+        attributes = [ensure_byte_string(a) for a in attributes]
+        for attribute, value in self._read_values(attributes).items():
+            cache.set_value(attribute, value)
+
     def __len__(self):
         """
         Return the amount of attributes defined.
@@ -867,9 +1167,7 @@ def __iter__(self):
         return self._get_attributes()
 
     def __contains__(self, attribute):
-        value = self._libudev.udev_device_get_sysattr_value(
-            self.device, ensure_byte_string(attribute))
-        return value is not None
+        return self._get_value(attribute) is not None
 
     def __getitem__(self, attribute):
         """
@@ -882,8 +1180,7 @@ def __getitem__(self, attribute):
         :exc:`~exceptions.KeyError`, if the given attribute is not defined
         for this device.
         """
-        value = self._libudev.udev_device_get_sysattr_value(
-            self.device, ensure_byte_string(attribute))
+        value = self._get_value(attribute)
         if value is None:
             raise KeyError(attribute)
         return value
@@ -956,11 +1253,12 @@ def _has_tag(self, tag):
             :param tag: unicode string with name of tag
             :rtype: bool
         """
-        if hasattr(self._libudev, 'udev_device_has_tag'):
+        if self.device._tags is None and \
+           hasattr(self._libudev, 'udev_device_has_tag'):
             return bool(self._libudev.udev_device_has_tag(
                 self.device, ensure_byte_string(tag)))
         else:
-            return any(t == tag for t in self)
+            return ensure_unicode_string(tag) in self.device._get_tags()
 
     @property
     def _libudev(self):
@@ -983,6 +1281,4 @@ def __iter__(self):
 
         Yield each tag as unicode string.
         """
-        tags = self._libudev.udev_device_get_tags_list_entry(self.device)
-        for tag, _ in udev_list_iterate(self._libudev, tags):
-            yield ensure_unicode_string(tag)
+        return iter(self.device._get_tags())
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.device._snapshot
+    =======================
+
+    Immutable snapshots of devices.
+
+    .. moduleauthor::  mulhern  <amulhern@redhat.com>
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from collections import Mapping
+
+from pyudev._util import string_to_bool
+
+
+class DeviceSnapshot(Mapping):
+    """
+    An immutable copy of the data of a :class:`Device`.
+
+    A snapshot holds the properties, the tags, the device links and the
+    general attributes of a device as plain Python objects, as they were at
+    the time the snapshot was taken.  It does not refer to the underlying
+    libudev device or to the :class:`Context` anymore, so accessing its data
+    does not call into libudev, and snapshots can be pickled and sent to
+    other processes.
+
+    Like :class:`Device` this class subclasses the ``Mapping`` ABC, providing
+    a read-only dictionary mapping property names to the corresponding
+    values.  It also provides the general attributes of :class:`Device`
+    (e.g. :attr:`~Device.sys_path`, :attr:`~Device.subsystem` or
+    :attr:`~Device.driver`) with the same names and types.  :attr:`tags` is a
+    :func:`frozenset` and :attr:`device_links` a :func:`tuple` of unicode
+    strings.
+
+    Snapshots compare equal to other snapshots, to :class:`Device` objects
+    and to strings based on :attr:`device_path`, and are hashable.
+
+    Create snapshots with :meth:`Device.snapshot()`.
+
+    .. versionadded:: 0.17
+    """
+
+    #: The general attributes of a device copied into a snapshot
+    ATTRIBUTES = ('sys_path', 'device_path', 'subsystem', 'sys_name',
+                  'sys_number', 'device_type', 'driver', 'device_node',
+                  'device_number', 'action', 'sequence_number')
+
+    __slots__ = ATTRIBUTES + ('tags', 'device_links', '_properties')
+
+    @classmethod
+    def from_device(cls, device):
+        """
+        Create a snapshot of the given ``device``.
+
+        ``device`` is the :class:`Device` to copy.
+
+        Return a new :class:`DeviceSnapshot`.
+        """
+        properties = device.properties_dict()
+        attributes = dict(
+            (name, getattr(device, name)) for name in cls.ATTRIBUTES)
+        attributes['tags'] = frozenset(device.tags)
+        attributes['device_links'] = tuple(device.device_links)
+        return cls(properties, attributes)
+
+    def __init__(self, properties, attributes):
+        """
+        Create a new snapshot.
+
+        ``properties`` is a mapping of property names to property values, both
+        as unicode strings.  ``attributes`` is a dictionary mapping the names
+        in :attr:`ATTRIBUTES` as well as ``'tags'`` and ``'device_links'`` to
+        their values.  Missing attributes are ``None``, missing tags and
+        device links are empty.
+        """
+        setattr_ = super(DeviceSnapshot, self).__setattr__
+        setattr_('_properties', dict(properties))
+        for name in self.ATTRIBUTES:
+            setattr_(name, attributes.get(name))
+        setattr_('tags', frozenset(attributes.get('tags', ())))
+        setattr_('device_links', tuple(attributes.get('device_links', ())))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('DeviceSnapshot is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('DeviceSnapshot is immutable')
+
+    def __reduce__(self):
+        attributes = dict(
+            (name, getattr(self, name)) for name in self.ATTRIBUTES)
+        attributes['tags'] = self.tags
+        attributes['device_links'] = self.device_links
+        return (self.__class__, (self._properties, attributes))
+
+    def __repr__(self):
+        return 'DeviceSnapshot({0.sys_path!r})'.format(self)
+
+    def __iter__(self):
+        """
+        Iterate over the names of all properties of this snapshot.
+        """
+        return iter(self._properties)
+
+    def __len__(self):
+        """
+        Return the amount of properties of this snapshot as integer.
+        """
+        return len(self._properties)
+
+    def __getitem__(self, prop):
+        """
+        Get the given property.
+
+        ``prop`` is a unicode string containing the name of the property.
+
+        Return the property value as unicode string, or raise a
+        :exc:`~exceptions.KeyError`, if the given property is not defined.
+        """
+        return self._properties[prop]
+
+    def __contains__(self, prop):
+        return prop in self._properties
+
+    def asint(self, prop):
+        """
+        Get the given property as integer.
+
+        See :meth:`Device.asint()`.
+        """
+        return int(self[prop])
+
+    def asbool(self, prop):
+        """
+        Get the given property as boolean.
+
+        See :meth:`Device.asbool()`.
+        """
+        return string_to_bool(self[prop])
+
+    def __hash__(self):
+        return hash(self.device_path)
+
+    def __eq__(self, other):
+        return self.device_path == getattr(other, 'device_path', other)
+
+    def __ne__(self, other):
+        return self.device_path != getattr(other, 'device_path', other)
+
+    def __gt__(self, other):
+        raise TypeError('Device not orderable')
+
+    def __lt__(self, other):
+        raise TypeError('Device not orderable')
+
+    def __le__(self, other):
+        raise TypeError('Device not orderable')
+
+    def __ge__(self, other):
+        raise TypeError('Device not orderable')
@@ -42,13 +42,19 @@
 import glib
 import gobject
 
+from pyudev.monitor import EventCoalescer, _timeout_in_milliseconds
+
 
 class _ObserverMixin(object):
     """Mixin to provide observer behavior to the old and the new API."""
 
-    def _setup_observer(self, monitor):
+    def _setup_observer(self, monitor, coalesce_window=None):
         self.monitor = monitor
         self.event_source = None
+        self._coalescer = None
+        self._flush_source = None
+        if coalesce_window:
+            self._coalescer = EventCoalescer(coalesce_window)
         self.enabled = True
 
     @property
@@ -70,14 +76,41 @@ def enabled(self, value):
                 self.monitor, glib.IO_IN, self._process_udev_event)
         elif not value and self.event_source is not None:
             glib.source_remove(self.event_source)
+            self.event_source = None
+            # discard events held back by the coalescer, too
+            if self._flush_source is not None:
+                glib.source_remove(self._flush_source)
+                self._flush_source = None
+            if self._coalescer is not None:
+                self._coalescer.flush()
 
     def _process_udev_event(self, source, condition):
         if condition == glib.IO_IN:
             device = self.monitor.poll(timeout=0)
             if device:
-                self._emit_event(device)
+                if self._coalescer is None:
+                    self._emit_event(device)
+                else:
+                    self._coalescer.add(device)
+                    self._schedule_flush()
         return True
 
+    def _schedule_flush(self):
+        """
+        Emit the coalesced events, once they are ready.
+        """
+        if self._flush_source is None and len(self._coalescer):
+            self._flush_source = glib.timeout_add(
+                _timeout_in_milliseconds(self._coalescer.timeout()),
+                self._flush_events)
+
+    def _flush_events(self):
+        self._flush_source = None
+        for device in self._coalescer.pop_ready():
+            self._emit_event(device)
+        self._schedule_flush()
+        return False
+
     def _emit_event(self, device):
         self.emit('device-event', device)
 
@@ -100,7 +133,14 @@ class MonitorObserver(gobject.GObject, _ObserverMixin):
     >>> observer.connect('device-event', device_event)
     >>> monitor.start()
 
+    If ``coalesce_window`` is given, bursts of events for the same device
+    are coalesced with an :class:`~pyudev.EventCoalescer` with this window,
+    and only the remaining events are emitted, after the window has passed.
+
     This class is a child of :class:`gobject.GObject`.
+
+    .. versionchanged:: 0.17
+       Add ``coalesce_window`` argument.
     """
 
     __gsignals__ = {
@@ -114,9 +154,9 @@ class MonitorObserver(gobject.GObject, _ObserverMixin):
                               (gobject.TYPE_PYOBJECT,)),
     }
 
-    def __init__(self, monitor):
+    def __init__(self, monitor, coalesce_window=None):
         gobject.GObject.__init__(self)
-        self._setup_observer(monitor)
+        self._setup_observer(monitor, coalesce_window)
 
 
 gobject.type_register(MonitorObserver)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.hwdb
+    ===========
+
+    Access to the hardware database of udev.
+
+    .. moduleauthor::  mulhern  <amulhern@redhat.com>
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6 lacks OrderedDict.  A plain dict still bounds the cache, but
+    # evicts arbitrary entries instead of the least recently used ones
+    OrderedDict = dict
+
+from pyudev._util import (ensure_byte_string, ensure_unicode_string,
+                          udev_list_iterate)
+
+
+__all__ = ['Hwdb', 'annotate_with_hwdb']
+
+
+class Hwdb(object):
+    """
+    The hardware database of udev.
+
+    The hardware database maps modalias strings of devices to properties
+    like the vendor or model names, which udev adds to devices in its
+    rules:
+
+    >>> from pyudev import Context, Hwdb
+    >>> context = Context()
+    >>> hwdb = Hwdb(context)
+    >>> hwdb.lookup('usb:v1D6Bp0002')
+    {'ID_VENDOR_FROM_DATABASE': 'Linux Foundation', ...}
+
+    The results of the most recent lookups are kept in a cache, because
+    enumerations usually contain many devices with the same modalias.  The
+    database itself does not change while a :class:`Hwdb` object exists, so
+    cached results never become stale.
+
+    Instances of this class can directly be given as ``udev_hwdb *`` to
+    functions wrapped through :mod:`ctypes`.
+
+    .. udevversion:: 196
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, context, cache_size=1024):
+        """
+        Open the hardware database.
+
+        ``context`` is the :class:`Context` to use.  ``cache_size`` is the
+        maximum number of lookup results to cache as integer.  If ``0``,
+        results are not cached.
+
+        Raise :exc:`~exceptions.EnvironmentError`, if the hardware database
+        could not be opened.
+        """
+        self._as_parameter_ = None
+        self.context = context
+        self._libudev = context._libudev
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        hwdb = self._libudev.udev_hwdb_new(context)
+        if not hwdb:
+            raise EnvironmentError('Could not open udev hwdb')
+        self._as_parameter_ = hwdb
+
+    def __del__(self):
+        if self._as_parameter_ is not None:
+            self._libudev.udev_hwdb_unref(self)
+
+    def _query(self, modalias):
+        """
+        Query the database for ``modalias`` (a byte string).
+
+        Return a dictionary mapping property names to values, both as unicode
+        strings.
+        """
+        entry = self._libudev.udev_hwdb_get_properties_list_entry(
+            self, modalias, 0)
+        return dict(
+            (ensure_unicode_string(name), ensure_unicode_string(value))
+            for name, value in udev_list_iterate(self._libudev, entry))
+
+    def _lookup_shared(self, modalias):
+        """
+        Like :meth:`lookup()`, but return the cached dictionary itself, which
+        must not be modified.
+        """
+        modalias = ensure_byte_string(modalias)
+        properties = self._cache.pop(modalias, None)
+        if properties is None:
+            properties = self._query(modalias)
+            if len(self._cache) >= self.cache_size > 0:
+                # the oldest entry comes first
+                del self._cache[next(iter(self._cache))]
+        if self.cache_size > 0:
+            # (re-)insert as most recently used entry
+            self._cache[modalias] = properties
+        return properties
+
+    def lookup(self, modalias):
+        """
+        Look up the properties for the given ``modalias``.
+
+        ``modalias`` is a unicode or byte string containing a modalias, e.g.
+        the value of the ``MODALIAS`` property of a :class:`Device`.
+
+        Return a new dictionary mapping property names to property values,
+        both as unicode strings.  The dictionary is empty, if the database
+        has no entries for ``modalias``.
+        """
+        return dict(self._lookup_shared(modalias))
+
+    def clear_cache(self):
+        """
+        Remove all cached lookup results.
+        """
+        self._cache.clear()
+
+
+def annotate_with_hwdb(devices, hwdb=None):
+    """
+    Look up the hardware database properties of all ``devices``.
+
+    ``devices`` is an iterable of :class:`Device` objects, e.g. an
+    :class:`Enumerator`, or of :class:`DeviceSnapshot` objects.  ``hwdb`` is
+    the :class:`Hwdb` to use.  If ``None``, a new :class:`Hwdb` is opened for
+    the :attr:`~Device.context` of the first device, which requires
+    ``devices`` to contain :class:`Device` objects.
+
+    The ``MODALIAS`` properties of all devices are collected first, and each
+    distinct modalias is looked up only once, no matter how many devices
+    share it:
+
+    >>> from pyudev import Context, annotate_with_hwdb
+    >>> context = Context()
+    >>> for device, properties in annotate_with_hwdb(context.list_devices()):
+    ...     print(device.sys_name, properties.get('ID_VENDOR_FROM_DATABASE'))
+
+    Return a list of ``(device, properties)`` pairs in the order of
+    ``devices``, where ``properties`` is a dictionary mapping property names
+    to values, both as unicode strings.  ``properties`` is empty for devices
+    without ``MODALIAS`` property, or without entries in the database.
+    Devices with the same modalias share the same dictionary, so do not
+    modify it.
+
+    Raise :exc:`~exceptions.EnvironmentError`, if ``hwdb`` is ``None``, and
+    the hardware database could not be opened.
+
+    .. udevversion:: 196
+
+    .. versionadded:: 0.17
+    """
+    devices_with_modalias = [(device, device.get('MODALIAS'))
+                             for device in devices]
+    if not devices_with_modalias:
+        return []
+    if hwdb is None:
+        hwdb = Hwdb(devices_with_modalias[0][0].context)
+    no_properties = {}
+    properties_by_modalias = {None: no_properties}
+    for _, modalias in devices_with_modalias:
+        if modalias not in properties_by_modalias:
+            properties_by_modalias[modalias] = \
+                hwdb.lookup(modalias) or no_properties
+    return [(device, properties_by_modalias[modalias])
+            for device, modalias in devices_with_modalias]
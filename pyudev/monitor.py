@@ -31,15 +31,76 @@
 
 import os
 import errno
-from threading import Thread
+import heapq
+import socket
+import struct
+import traceback
+from collections import deque, namedtuple
+from fnmatch import fnmatchcase
+from math import ceil
+from threading import Condition, Thread, current_thread
 from functools import partial
 
-from pyudev._util import ensure_byte_string
+from pyudev import _bpf
+from pyudev._util import ensure_byte_string, ensure_unicode_string
+from pyudev._util import monotonic
 from pyudev.core import Device
-from pyudev.os import Pipe, Poll, set_fd_status_flag
+from pyudev.device import DeviceNotFoundError, DeviceSnapshot
+from pyudev.os import DefaultPoll, Pipe, Poll, set_fd_status_flag
 
 
-__all__ = ['Monitor', 'MonitorObserver']
+__all__ = ['Monitor', 'MonitorFilter', 'MonitorObserver', 'MonitorStatistics',
+           'EventCoalescer', 'EventDispatcher']
+
+
+class MonitorStatistics(namedtuple('MonitorStatistics',
+                                   'received dropped gaps overflows '
+                                   'receive_buffer_size')):
+    """
+    Statistics about the events received by a :class:`Monitor`.
+
+    .. attribute:: received
+
+       The number of events received from the netlink socket, including
+       events rejected by :meth:`Monitor.filter_by_action()` and the like.
+
+    .. attribute:: dropped
+
+       The number of events lost, as far as detected from gaps in the
+       sequence numbers of received events.
+
+    .. attribute:: gaps
+
+       The number of gaps detected in the sequence numbers of received
+       events.
+
+    .. attribute:: overflows
+
+       The number of times the receive buffer of the netlink socket
+       overflowed.
+
+    .. attribute:: receive_buffer_size
+
+       The size of the receive buffer in bytes as chosen by
+       :meth:`Monitor.enable_adaptive_receive_buffer()`, or ``None``, if the
+       adaptive receive buffer is not enabled.
+
+    .. versionadded:: 0.17
+    """
+
+
+# socket options from <asm-generic/socket.h>
+SO_RCVBUFFORCE = 33
+SO_MEMINFO = 55
+
+# the limit of SO_RCVBUF for unprivileged processes
+_RMEM_MAX = '/proc/sys/net/core/rmem_max'
+
+# the SO_MEMINFO socket option is an array of 32 bit integers, whose length
+# depends on the kernel.  It starts with the allocated memory of the receive
+# queue and the size of the receive buffer
+_MEMINFO_SIZE = 9 * 4
+_MEMINFO_HEAD = struct.Struct(str('=2I'))
 
 
 class Monitor(object):
@@ -82,13 +143,66 @@ class Monitor(object):
        recent udev versions.
     """
 
+    #: The number of later events, after which a missing sequence number of
+    #: an event from udev is considered lost.  udev processes events in
+    #: parallel, so events may arrive out of order.
+    REORDER_WINDOW = 1024
+
+    #: The default maximum size of an adaptive receive buffer in bytes, as
+    #: used by ``systemd-udevd``
+    MAX_RECEIVE_BUFFER_SIZE = 128 * 1024 * 1024
+
+    #: The fill level of the receive buffer as fraction, at which an
+    #: adaptive receive buffer grows
+    RECEIVE_BUFFER_HIGH_WATERMARK = 0.5
+
     def __init__(self, context, monitor_p):
         self.context = context
         self._as_parameter_ = monitor_p
         self._libudev = context._libudev
         self._started = False
+        self._poller = None
+        self._wakeup_fds = set()
+        self._actions = set()
+        self._sys_names = []
+        self._property_filters = {}
+        self._source = None
+        self._filtered_by_kernel = False
+        self._loss_callback = None
+        self._received = 0
+        self._dropped = 0
+        self._gaps = 0
+        self._overflows = 0
+        self._last_sequence_number = None
+        self._missing = set()
+        self._missing_heap = []
+        self._match_subsystems = []
+        self._match_tags = []
+        self._known_devices = None
+        self._resync_needed = False
+        self._pending_events = deque()
+        self._socket = None
+        self._max_receive_buffer_size = None
+        self._receive_buffer_limited = False
+        self._receive_buffer_size = None
+
+    def _get_socket(self):
+        """
+        Get a socket object for the netlink socket of this monitor.
+
+        The socket object is created on first use, and then kept for the
+        lifetime of this monitor.
+        """
+        if self._socket is None:
+            self._socket = socket.fromfd(
+                self.fileno(), socket.AF_NETLINK, socket.SOCK_RAW)
+        return self._socket
 
     def __del__(self):
+        if self._poller is not None:
+            self._poller.close()
+        if self._socket is not None:
+            self._socket.close()
         self._libudev.udev_monitor_unref(self)
 
     @classmethod
@@ -121,7 +235,9 @@ def from_netlink(cls, context, source='udev'):
             context, ensure_byte_string(source))
         if not monitor:
             raise EnvironmentError('Could not create udev monitor')
-        return cls(context, monitor)
+        monitor = cls(context, monitor)
+        monitor._source = source
+        return monitor
 
     @property
     def started(self):
@@ -169,6 +285,10 @@ def filter_by(self, subsystem, device_type=None):
         self._libudev.udev_monitor_filter_add_match_subsystem_devtype(
             self, subsystem, device_type)
         self._libudev.udev_monitor_filter_update(self)
+        self._filtered_by_kernel = True
+        self._match_subsystems.append((
+            ensure_unicode_string(subsystem),
+            ensure_unicode_string(device_type) if device_type else None))
 
     def filter_by_tag(self, tag):
         """
@@ -192,11 +312,73 @@ def filter_by_tag(self, tag):
         self._libudev.udev_monitor_filter_add_match_tag(
             self, ensure_byte_string(tag))
         self._libudev.udev_monitor_filter_update(self)
+        self._filtered_by_kernel = True
+        self._match_tags.append(ensure_unicode_string(tag))
+
+    def filter_by_action(self, action):
+        """
+        Filter incoming events by the given ``action``.
+
+        ``action`` is a byte or unicode string with the name of an action,
+        e.g. ``'add'``.  Only events with one of the given actions pass the
+        filter.
+
+        Unlike :meth:`filter_by()`, this filter is executed in this process,
+        but on the raw event, before a :class:`Device` is created for it.
+        Events, which do not pass, are never returned by :meth:`poll()`, and
+        hence never reach the callback of a :class:`MonitorObserver`.
+        Filters of the same kind are combined with a logical OR, filters of
+        different kinds with a logical AND.
+
+        .. versionadded:: 0.17
+        """
+        self._actions.add(ensure_unicode_string(action))
+
+    def filter_by_property(self, name, value):
+        """
+        Filter incoming events by the property ``name``.
+
+        ``name`` is a byte or unicode string with the name of a property.
+        ``value`` is either a byte or unicode string, which the value of the
+        property must be equal to, or a compiled regular expression, which
+        must match the value of the property from its beginning.  Only
+        events for devices, which have the property with a matching value,
+        pass the filter.
+
+        Filters for the same property are combined with a logical OR,
+        filters for different properties with a logical AND.  Like
+        :meth:`filter_by_action()`, this filter is executed before a
+        :class:`Device` is created for an event.
+
+        .. versionadded:: 0.17
+        """
+        if not hasattr(value, 'match'):
+            value = ensure_unicode_string(value)
+        self._property_filters.setdefault(
+            ensure_byte_string(name), []).append(value)
+
+    def filter_by_sys_name(self, pattern):
+        """
+        Filter incoming events by the device name.
+
+        ``pattern`` is a byte or unicode string with a shell-style glob
+        pattern like in :meth:`Enumerator.match_sys_name()`.  Only events for
+        devices whose :attr:`~Device.sys_name` matches ``pattern`` pass the
+        filter.
+
+        Like :meth:`filter_by_action()`, this filter is executed before a
+        :class:`Device` is created for an event.
+
+        .. versionadded:: 0.17
+        """
+        self._sys_names.append(ensure_unicode_string(pattern))
 
     def remove_filter(self):
         """
-        Remove any filters installed with :meth:`filter_by()` or
-        :meth:`filter_by_tag()` from this monitor.
+        Remove any filters installed with :meth:`filter_by()`,
+        :meth:`filter_by_tag()`, :meth:`filter_by_action()`,
+        :meth:`filter_by_property()` or :meth:`filter_by_sys_name()` from
+        this monitor.
 
         .. warning::
 
@@ -209,9 +391,18 @@ def remove_filter(self):
         filters failed.
 
         .. versionadded:: 0.15
+
+        .. versionchanged:: 0.17
+           Also remove the filters executed in this process.
         """
+        self._actions.clear()
+        del self._sys_names[:]
+        self._property_filters.clear()
         self._libudev.udev_monitor_filter_remove(self)
         self._libudev.udev_monitor_filter_update(self)
+        self._filtered_by_kernel = False
+        del self._match_subsystems[:]
+        del self._match_tags[:]
 
     def enable_receiving(self):
         """
@@ -284,24 +475,497 @@ def set_receive_buffer_size(self, size):
         """
         self._libudev.udev_monitor_set_receive_buffer_size(self, size)
 
+    def enable_adaptive_receive_buffer(self, max_size=None):
+        """
+        Grow the receive buffer automatically, whenever it runs full.
+
+        ``max_size`` is the maximum size of the receive buffer in bytes as
+        integer, and defaults to :attr:`MAX_RECEIVE_BUFFER_SIZE`.
+
+        The monitor doubles the size of the receive buffer, if it overflows,
+        or if it is filled beyond :attr:`RECEIVE_BUFFER_HIGH_WATERMARK`,
+        when :meth:`poll()` wakes up.  The fill level is read with the
+        ``SO_MEMINFO`` socket option, if the kernel supports it (since Linux
+        4.12), otherwise the buffer only grows after overflows.  The buffer
+        never shrinks, so it stays as small as the load allows.
+
+        With the CAP_NET_ADMIN capability the buffer grows up to
+        ``max_size`` (see :meth:`set_receive_buffer_size()`).  Otherwise it
+        only grows up to the limit in ``/proc/sys/net/core/rmem_max``.  The
+        current size is available in :attr:`statistics`.
+
+        .. versionadded:: 0.17
+        """
+        if max_size is None:
+            max_size = self.MAX_RECEIVE_BUFFER_SIZE
+        self._max_receive_buffer_size = max_size
+        self._receive_buffer_limited = False
+        self._receive_buffer_size = self._get_socket().getsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+    def disable_adaptive_receive_buffer(self):
+        """
+        Stop growing the receive buffer automatically.
+
+        The receive buffer keeps its current size.
+
+        .. versionadded:: 0.17
+        """
+        self._max_receive_buffer_size = None
+        self._receive_buffer_limited = False
+        self._receive_buffer_size = None
+
+    def _receive_buffer_fill(self):
+        """
+        Get the fill level of the receive buffer.
+
+        Return the fill level as fraction, or ``None``, if the kernel does
+        not support ``SO_MEMINFO``.
+        """
+        try:
+            meminfo = self._get_socket().getsockopt(
+                socket.SOL_SOCKET, SO_MEMINFO, _MEMINFO_SIZE)
+        except EnvironmentError:
+            return None
+        if len(meminfo) < _MEMINFO_HEAD.size:
+            return None
+        allocated, size = _MEMINFO_HEAD.unpack_from(meminfo)
+        return allocated / size if size else None
+
+    def _grow_receive_buffer(self):
+        """
+        Double the size of the receive buffer, up to the maximum size of the
+        adaptive receive buffer.
+        """
+        if self._receive_buffer_limited:
+            return
+        sock = self._get_socket()
+        size = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        if size >= self._max_receive_buffer_size:
+            return
+        # the kernel doubles the requested size to account for overhead
+        requested = min(size, self._max_receive_buffer_size // 2)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, requested)
+        except EnvironmentError as error:
+            if error.errno != errno.EPERM:
+                raise
+            self._grow_receive_buffer_unprivileged(sock, size, requested)
+        self._receive_buffer_size = sock.getsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+    def _grow_receive_buffer_unprivileged(self, sock, size, requested):
+        """
+        Grow the receive buffer of ``sock`` from ``size`` with SO_RCVBUF.
+
+        The kernel caps SO_RCVBUF at ``rmem_max``, and replaces the current
+        size with the capped one, which may shrink a buffer grown with
+        SO_RCVBUFFORCE before.  Hence do not set the size, if it cannot
+        grow, and stop growing the buffer at this limit.
+        """
+        try:
+            with open(_RMEM_MAX) as source:
+                limit = int(source.read()) * 2
+        except (EnvironmentError, ValueError):
+            limit = None
+        if limit is not None and limit <= size:
+            self._receive_buffer_limited = True
+            return
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, requested)
+        new_size = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        if new_size < size:
+            # restore the size as far as possible
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size // 2)
+        if new_size <= size:
+            self._receive_buffer_limited = True
+
+    def _adapt_receive_buffer(self):
+        """
+        Grow an adaptive receive buffer, if it is filled beyond the high
+        watermark.
+        """
+        if self._max_receive_buffer_size is None:
+            return
+        fill = self._receive_buffer_fill()
+        if fill is not None and fill >= self.RECEIVE_BUFFER_HIGH_WATERMARK:
+            self._grow_receive_buffer()
+
+    def _get_poller(self):
+        """
+        Get the poll object used by :meth:`poll()`.
+
+        The poll object is created on first use, and then kept for the
+        lifetime of this monitor.
+        """
+        if self._poller is None:
+            poller = DefaultPoll.for_events((self, 'r'))
+            for fd in self._wakeup_fds:
+                poller.register(fd, 'r')
+            self._poller = poller
+        return self._poller
+
+    def add_wakeup_fd(self, fd):
+        """
+        Wake up :meth:`poll()` if ``fd`` becomes readable.
+
+        ``fd`` is a file descriptor or a file object.  If it becomes readable
+        while :meth:`poll()` waits for an event, :meth:`poll()` returns
+        ``None`` like on a timeout.  This allows to interrupt a blocking
+        :meth:`poll()` from another thread, e.g. by writing to a pipe.  The
+        caller is responsible to read pending data from ``fd``, otherwise
+        :meth:`poll()` returns immediately again.
+
+        Do nothing, if ``fd`` was already added.
+
+        .. versionadded:: 0.17
+        """
+        fd = fd if isinstance(fd, int) else fd.fileno()
+        if fd in self._wakeup_fds:
+            return
+        if self._poller is not None:
+            self._poller.register(fd, 'r')
+        self._wakeup_fds.add(fd)
+
+    def remove_wakeup_fd(self, fd):
+        """
+        Stop waking up :meth:`poll()` for ``fd``.
+
+        ``fd`` is a file descriptor or file object, which was previously
+        given to :meth:`add_wakeup_fd()`.  Do nothing, if ``fd`` was not
+        added.
+
+        .. versionadded:: 0.17
+        """
+        fd = fd if isinstance(fd, int) else fd.fileno()
+        if fd not in self._wakeup_fds:
+            return
+        if self._poller is not None:
+            self._poller.unregister(fd)
+        self._wakeup_fds.remove(fd)
+
+    @property
+    def statistics(self):
+        """
+        Statistics about the received events as :class:`MonitorStatistics`.
+
+        The monitor detects lost events from gaps in the sequence numbers of
+        received events, and from overflows of the receive buffer, which
+        the kernel reports as :data:`~errno.ENOBUFS`.  Events from udev may
+        arrive out of order, so a missing sequence number only counts as
+        lost after :attr:`REORDER_WINDOW` later events.
+
+        Filters installed with :meth:`filter_by()`, :meth:`filter_by_tag()`
+        or :meth:`MonitorFilter.attach()` drop events inside the kernel, and
+        thus leave gaps in the sequence numbers, too.  Hence gaps are not
+        detected while these filters are installed.  Filters executed in
+        this process do not affect gap detection.
+
+        .. versionadded:: 0.17
+        """
+        return MonitorStatistics(self._received, self._dropped, self._gaps,
+                                 self._overflows, self._receive_buffer_size)
+
+    def set_loss_callback(self, callback):
+        """
+        Set the ``callback`` to invoke when events were lost.
+
+        ``callback`` is a callable with the signature ``callback(reason,
+        count)``.  ``reason`` is ``'gap'``, if a gap in the sequence numbers
+        was detected, and ``count`` the number of lost events then.
+        ``reason`` is ``'overflow'``, if the receive buffer overflowed, and
+        ``count`` is ``None`` then, because the number of lost events is not
+        known until the next event arrives.  If ``callback`` is ``None``,
+        remove the current callback.
+
+        The callback is invoked from :meth:`poll()` in the receiving
+        thread, before the next event is returned.
+
+        .. seealso:: :attr:`statistics`
+        .. versionadded:: 0.17
+        """
+        self._loss_callback = callback
+
+    def _report_loss(self, reason, count):
+        if self._known_devices is not None:
+            self._resync_needed = True
+        if self._loss_callback is not None:
+            self._loss_callback(reason, count)
+
+    @property
+    def resync_enabled(self):
+        """
+        ``True``, if :meth:`enable_resync()` was called, ``False`` otherwise.
+
+        .. versionadded:: 0.17
+        """
+        return self._known_devices is not None
+
+    def enable_resync(self):
+        """
+        Resynchronise with the device database after events were lost.
+
+        In this mode, the monitor keeps a :class:`DeviceSnapshot` of every
+        device matching the filters installed with :meth:`filter_by()` and
+        :meth:`filter_by_tag()`, starting with a scan of all these devices
+        now, and updated from every received event.  Whenever events are
+        lost (see :attr:`statistics`), the monitor first receives all
+        pending events, and then calls :meth:`resync()`.  :meth:`poll()` then
+        returns synthetic events, which describe the difference between the
+        known and the current state of the devices, before any further real
+        event.
+
+        Filters attached with :meth:`MonitorFilter.attach()` are unknown to
+        the monitor, hence resynchronisation scans all devices matching
+        :meth:`filter_by()` and :meth:`filter_by_tag()` only.  The filters
+        executed in this process apply to synthetic events, too.
+
+        Taking a snapshot of each received device adds some overhead to
+        every event.  Enable this mode only if the monitor must not miss
+        any change of the devices.
+
+        .. versionadded:: 0.17
+        """
+        self._known_devices = self._scan_devices()
+
+    def disable_resync(self):
+        """
+        Stop resynchronising, and forget the known state of all devices.
+
+        .. versionadded:: 0.17
+        """
+        self._known_devices = None
+        self._resync_needed = False
+
+    def _matches_kernel_filters(self, device):
+        """
+        Whether ``device`` matches the filters installed with
+        :meth:`filter_by()` and :meth:`filter_by_tag()`.
+        """
+        if self._match_subsystems and not any(
+                device.subsystem == subsystem and
+                (device_type is None or device.device_type == device_type)
+                for subsystem, device_type in self._match_subsystems):
+            return False
+        return not self._match_tags or any(
+            tag in device.tags for tag in self._match_tags)
+
+    def _scan_devices(self):
+        """
+        Take a snapshot of every device matching the kernel filters.
+
+        Return a dictionary mapping ``sysfs`` paths to
+        :class:`DeviceSnapshot` objects.
+        """
+        subsystems = set(s for s, _ in self._match_subsystems) or [None]
+        devices = {}
+        for subsystem in subsystems:
+            enumerator = self.context.list_devices()
+            if subsystem is not None:
+                enumerator.match_subsystem(subsystem)
+            for sys_path in enumerator.sys_paths():
+                try:
+                    device = Device.from_sys_path(self.context, sys_path)
+                except DeviceNotFoundError:
+                    # the device vanished since the scan, and its remove
+                    # event is on the way
+                    continue
+                if self._matches_kernel_filters(device):
+                    devices[device.sys_path] = device.snapshot()
+        return devices
+
+    def _update_known_device(self, device):
+        """
+        Update the known state of devices with the event of ``device``.
+        """
+        if device.action == 'move' and 'DEVPATH_OLD' in device:
+            self._known_devices.pop(
+                self.context.sys_path + device['DEVPATH_OLD'], None)
+        if device.action == 'remove':
+            self._known_devices.pop(device.sys_path, None)
+        else:
+            self._known_devices[device.sys_path] = device.snapshot()
+
+    def resync(self):
+        """
+        Resynchronise with the device database now.
+
+        Scan all devices matching the filters like :meth:`enable_resync()`,
+        and queue a synthetic ``'remove'`` event for every known device,
+        which is gone, an ``'add'`` event for every new device, and a
+        ``'change'`` event for every device, whose properties or tags have
+        changed.  Synthetic events are :class:`DeviceSnapshot` objects,
+        whose :attr:`~Device.sequence_number` is ``None``.  They are returned
+        by :meth:`poll()` before any further real event.
+
+        Raise :exc:`~exceptions.ValueError`, if resynchronisation is not
+        enabled.
+
+        .. versionadded:: 0.17
+        """
+        if self._known_devices is None:
+            raise ValueError('Resynchronisation not enabled')
+        self._resync_needed = False
+        known = self._known_devices
+        current = self._scan_devices()
+        events = [_synthetic_event(known[sys_path], 'remove')
+                  for sys_path in sorted(known) if sys_path not in current]
+        for sys_path in sorted(current):
+            snapshot = current[sys_path]
+            if sys_path not in known:
+                events.append(_synthetic_event(snapshot, 'add'))
+            elif _snapshot_differs(known[sys_path], snapshot, self._source):
+                events.append(_synthetic_event(snapshot, 'change'))
+        self._known_devices = current
+        self._pending_events.extend(
+            event for event in events if self._snapshot_passes_filters(event))
+
+    def _expire_missing(self, threshold):
+        """
+        Forget all missing sequence numbers below ``threshold``.
+
+        Return the number of these sequence numbers, which are still
+        missing, and thus lost.
+        """
+        lost = 0
+        heap = self._missing_heap
+        while heap and heap[0] < threshold:
+            sequence_number = heapq.heappop(heap)
+            if sequence_number in self._missing:
+                self._missing.remove(sequence_number)
+                lost += 1
+        return lost
+
+    def _track_sequence_number(self, sequence_number):
+        """
+        Detect gaps before ``sequence_number``, the sequence number of the
+        event just received.
+        """
+        if not sequence_number or self._filtered_by_kernel:
+            return
+        last = self._last_sequence_number
+        if last is None or sequence_number <= last:
+            if last is None:
+                self._last_sequence_number = sequence_number
+            else:
+                # an event, which arrived out of order
+                self._missing.discard(sequence_number)
+            return
+        self._last_sequence_number = sequence_number
+        window = 0 if self._source == 'kernel' else self.REORDER_WINDOW
+        threshold = sequence_number - window
+        # sequence numbers before the window are lost right away
+        lost = max(threshold - last - 1, 0)
+        for missing in range(max(last + 1, threshold), sequence_number):
+            self._missing.add(missing)
+            heapq.heappush(self._missing_heap, missing)
+        lost += self._expire_missing(threshold)
+        if lost:
+            self._gaps += 1
+            self._dropped += lost
+            self._report_loss('gap', lost)
+
+    def _matches_filters(self, get_action, get_sys_name, get_property):
+        """
+        Whether an event passes the filters executed in this process.
+
+        ``get_action`` and ``get_sys_name`` are callables returning the
+        action and the device name of the event, and ``get_property`` a
+        callable returning the value of the property with the given name
+        as byte string.  All return values are byte or unicode strings, or
+        ``None``.  They are only called if the corresponding filters exist.
+        """
+        if self._actions:
+            action = get_action()
+            if (action is None or
+                    ensure_unicode_string(action) not in self._actions):
+                return False
+        if self._sys_names:
+            sys_name = ensure_unicode_string(get_sys_name())
+            if not any(fnmatchcase(sys_name, p) for p in self._sys_names):
+                return False
+        for name, values in self._property_filters.items():
+            value = get_property(name)
+            if value is None:
+                return False
+            value = ensure_unicode_string(value)
+            if not any(v.match(value) if hasattr(v, 'match') else v == value
+                       for v in values):
+                return False
+        return True
+
+    def _passes_filters(self, device_p):
+        """
+        Whether the raw device ``device_p`` passes the filters executed in
+        this process.
+        """
+        libudev = self._libudev
+        return self._matches_filters(
+            lambda: libudev.udev_device_get_action(device_p),
+            lambda: libudev.udev_device_get_sysname(device_p),
+            lambda name: libudev.udev_device_get_property_value(
+                device_p, name))
+
+    def _snapshot_passes_filters(self, snapshot):
+        """
+        Whether the synthetic event ``snapshot`` passes the filters executed
+        in this process.
+        """
+        return self._matches_filters(
+            lambda: snapshot.action, lambda: snapshot.sys_name,
+            lambda name: snapshot.get(ensure_unicode_string(name)))
+
     def _receive_device(self):
         """Receive a single device from the monitor.
 
+        Skip all events which do not pass the filters executed in this
+        process.  Return pending synthetic events first, and resynchronise
+        after all pending real events have been received, if necessary.
+
         Return the received :class:`Device`, or ``None`` if no device could be
         received.
 
         """
+        filtered = bool(self._actions or self._sys_names or
+                        self._property_filters)
         while True:
+            if self._pending_events:
+                return self._pending_events.popleft()
             try:
                 device_p = self._libudev.udev_monitor_receive_device(self)
-                return Device(self.context, device_p) if device_p else None
+                if not device_p:
+                    return None
+                self._received += 1
+                self._track_sequence_number(
+                    self._libudev.udev_device_get_seqnum(device_p))
+                if self._known_devices is not None:
+                    device = Device(self.context, device_p)
+                    self._update_known_device(device)
+                    if filtered and not self._passes_filters(device_p):
+                        continue
+                    return device
+                if filtered and not self._passes_filters(device_p):
+                    self._libudev.udev_device_unref(device_p)
+                    continue
+                return Device(self.context, device_p)
             except EnvironmentError as error:
                 if error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
                     # No data available
+                    if self._resync_needed:
+                        self.resync()
+                        if self._pending_events:
+                            continue
                     return None
                 elif error.errno == errno.EINTR:
                     # Try again if our system call was interrupted
                     continue
+                elif error.errno == errno.ENOBUFS:
+                    # The receive buffer overflowed and events were lost,
+                    # but the socket is usable again
+                    self._overflows += 1
+                    if self._max_receive_buffer_size is not None:
+                        self._grow_receive_buffer()
+                    self._report_loss('overflow', None)
+                    continue
                 else:
                     raise
 
@@ -348,15 +1012,89 @@ def poll(self, timeout=None):
               The sequence number of this event.
 
         .. versionadded:: 0.16
+
+        .. versionchanged:: 0.17
+           Return ``None`` if a file descriptor added with
+           :meth:`add_wakeup_fd()` becomes readable.
+
+        .. versionchanged:: 0.17
+           Keep waiting for the rest of ``timeout``, if no received event
+           passed the filters.
+
+        .. versionchanged:: 0.17
+           Return synthetic events first, if :meth:`enable_resync()` was
+           called.
         """
+        deadline = None
         if timeout is not None and timeout > 0:
-            # .poll() takes timeout in milliseconds
-            timeout = int(timeout * 1000)
+            deadline = monotonic() + timeout
         self.start()
-        if Poll.for_events((self, 'r')).poll(timeout):
-            return self._receive_device()
-        else:
-            return None
+        if self._pending_events or self._resync_needed:
+            device = self._receive_device()
+            if device is not None:
+                return device
+        fileno = self.fileno()
+        poller = self._get_poller()
+        while True:
+            if deadline is not None:
+                # .poll() takes timeout in milliseconds
+                timeout = int(max(deadline - monotonic(), 0) * 1000)
+            ready = set(fd for fd, _ in poller.poll(timeout))
+            if fileno not in ready:
+                return None
+            self._adapt_receive_buffer()
+            device = self._receive_device()
+            if device is not None or len(ready) > 1:
+                return device
+            if timeout == 0:
+                return None
+
+    def poll_many(self, timeout=None, max_count=None, max_latency=None):
+        """
+        Poll for a batch of device events.
+
+        This method waits for the first device event like :meth:`poll()`, and
+        then receives all further events, which are already pending, without
+        waiting again.  This is considerably faster than calling
+        :meth:`poll()` for each event, if many events arrive in a short
+        time, e.g. during ``udevadm trigger``::
+
+           while True:
+               for device in monitor.poll_many(max_count=100):
+                   print('{0.action} on {0.device_path}'.format(device))
+
+        ``timeout`` has the same meaning as in :meth:`poll()` and only applies
+        to the first event.  ``max_count`` is the maximum number of events to
+        return as integer.  ``max_latency`` is a floating point number that
+        specifies the time in seconds after the first event, after which no
+        further events are received.  If ``None``, the batch is not limited
+        in count or time respectively.
+
+        .. note::
+
+           This method implicitly calls :meth:`start()`.
+
+        Return a list of received :class:`Device` objects in the order of
+        arrival, which is empty if a timeout occurred.  Raise
+        :exc:`~exceptions.EnvironmentError` if event retrieval failed.
+
+        .. versionadded:: 0.17
+        """
+        device = self.poll(timeout)
+        if device is None:
+            return []
+        devices = [device]
+        deadline = None
+        if max_latency is not None:
+            deadline = monotonic() + max_latency
+        while max_count is None or len(devices) < max_count:
+            if deadline is not None and monotonic() >= deadline:
+                break
+            device = self._receive_device()
+            if device is None:
+                break
+            devices.append(device)
+        return devices
 
     def receive_device(self):
         """
@@ -425,6 +1163,559 @@ def __iter__(self):
                 yield device.action, device
 
 
+#: Properties, which differ between events and the device database
+_VOLATILE_PROPERTIES = frozenset(['ACTION', 'SEQNUM', 'SYNTH_UUID',
+                                  'DEVPATH_OLD'])
+
+
+def _snapshot_differs(old, new, source='udev'):
+    """
+    Whether the snapshots ``old`` and ``new`` describe different states of a
+    device.
+
+    If ``source`` is ``'kernel'``, ``old`` may come from an event sent by
+    the kernel, which lacks the tags and properties of the udev database, so
+    only the properties in ``old`` are compared.
+    """
+    if source == 'kernel':
+        names = set(old) - _VOLATILE_PROPERTIES
+    elif old.tags != new.tags:
+        return True
+    else:
+        names = (set(old) | set(new)) - _VOLATILE_PROPERTIES
+    return any(old.get(name) != new.get(name) for name in names)
+
+
+def _synthetic_event(snapshot, action):
+    """
+    Create a synthetic event with ``action`` from ``snapshot``.
+
+    Return a new :class:`DeviceSnapshot`.
+    """
+    properties = dict(snapshot)
+    properties['ACTION'] = action
+    properties.pop('SEQNUM', None)
+    attributes = dict(
+        (name, getattr(snapshot, name)) for name in DeviceSnapshot.ATTRIBUTES)
+    attributes.update(action=action, sequence_number=None,
+                      tags=snapshot.tags, device_links=snapshot.device_links)
+    return DeviceSnapshot(properties, attributes)
+
+
+class MonitorFilter(object):
+    """
+    A socket filter for device events, which is executed inside the kernel.
+
+    Like :meth:`Monitor.filter_by()` and :meth:`Monitor.filter_by_tag()`, a
+    socket filter drops unwanted events before they are copied to the
+    process, so the process is not even woken up for these events.  Unlike
+    these methods, this class also filters events by action:
+
+    >>> from pyudev import Context, Monitor, MonitorFilter
+    >>> context = Context()
+    >>> monitor = Monitor.from_netlink(context, source='kernel')
+    >>> MonitorFilter().match_action('add').attach(monitor)
+
+    All match methods return the filter itself, so calls can be chained.
+    Matches of the same kind are combined with a logical OR, matches of
+    different kinds with a logical AND.  Without any match, all events
+    pass.
+
+    The filter only sees the raw messages sent through the netlink socket,
+    so each match only applies to one kind of message:
+
+    - Events from udev carry hashes of the subsystem and the device type,
+      and a bloom filter of the tags in their header, so matches by
+      subsystem, device type and tag apply to these events, just like the
+      filters of libudev.  As hashes may collide, a few unwanted events may
+      still pass.
+    - Events from the kernel start with the action and the device path, so
+      matches by action apply to these events.
+
+    Other properties are hidden in the variable part of each message, which
+    socket filters cannot search.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self):
+        self._actions = []
+        self._subsystems = []
+        self._tags = []
+
+    def match_action(self, action):
+        """
+        Only pass events from the kernel with the given ``action``.
+
+        ``action`` is a byte or unicode string with the name of an action,
+        e.g. ``'add'``.
+
+        Return the filter itself.
+        """
+        self._actions.append(ensure_byte_string(action))
+        return self
+
+    def match_subsystem(self, subsystem, device_type=None):
+        """
+        Only pass events from udev for devices of the given ``subsystem``.
+
+        ``subsystem`` is a byte or unicode string with the name of a
+        subsystem.  If given, ``device_type`` is a byte or unicode string,
+        and only devices of this type in ``subsystem`` pass.
+
+        Return the filter itself.
+        """
+        if device_type is not None:
+            device_type = ensure_byte_string(device_type)
+        self._subsystems.append((ensure_byte_string(subsystem), device_type))
+        return self
+
+    def match_tag(self, tag):
+        """
+        Only pass events from udev for devices with the given ``tag``.
+
+        ``tag`` is a byte or unicode string with the name of a tag.
+
+        Return the filter itself.
+        """
+        self._tags.append(ensure_byte_string(tag))
+        return self
+
+    def compile(self):
+        """
+        Compile this filter into a classic BPF program.
+
+        Return a list of ``(code, jt, jf, k)`` tuples, one for each
+        instruction in the format of ``struct sock_filter``.  Raise
+        :exc:`~exceptions.ValueError`, if there are too many matches to
+        fit into a single program.
+        """
+        return _bpf.compile_filter(self._actions, self._subsystems,
+                                   self._tags)
+
+    def attach(self, monitor):
+        """
+        Attach this filter to ``monitor``.
+
+        ``monitor`` is a :class:`Monitor` or any other object with a
+        ``fileno()`` method, which returns the file descriptor of a netlink
+        socket, e.g. a :class:`~pyudev.netlink.NetlinkMonitor`.
+
+        A socket has only a single filter.  Hence this filter replaces the
+        filters installed with :meth:`Monitor.filter_by()` and
+        :meth:`Monitor.filter_by_tag()`, and these methods as well as
+        :meth:`Monitor.remove_filter()` replace this filter in turn.  Later
+        changes to this filter have no effect, until it is attached again.
+
+        Raise :exc:`~exceptions.ValueError`, if there are too many matches,
+        and :exc:`~exceptions.EnvironmentError`, if the filter could not be
+        attached.
+        """
+        _bpf.attach_filter(monitor.fileno(), self.compile())
+        if isinstance(monitor, Monitor):
+            monitor._filtered_by_kernel = True
+
+    @staticmethod
+    def detach(monitor):
+        """
+        Remove the socket filter from ``monitor``.
+
+        ``monitor`` is a :class:`Monitor` or any other object with a
+        ``fileno()`` method like in :meth:`attach()`.  Afterwards all events
+        pass, even those excluded with :meth:`Monitor.filter_by()` or
+        :meth:`Monitor.filter_by_tag()`.
+
+        Raise :exc:`~exceptions.EnvironmentError`, if the filter could not
+        be removed, e.g. because no filter was attached.
+        """
+        _bpf.detach_filter(monitor.fileno())
+        if isinstance(monitor, Monitor):
+            monitor._filtered_by_kernel = False
+
+
+class EventCoalescer(object):
+    """
+    Coalesce bursts of events for the same device.
+
+    Events are collected per :attr:`~Device.sys_path`, and held back for
+    :attr:`window` seconds after the first event for a device.  Within this
+    window,
+
+    - a ``'change'`` event replaces a directly preceding ``'change'``
+      event,
+    - a ``'remove'`` event cancels a preceding ``'add'`` event and all
+      events after it, and replaces all preceding ``'change'`` events
+      otherwise.
+
+    Hence a burst of events is reduced to the events describing the final
+    state of the device, which are released together, in the order of
+    arrival, once the window has passed:
+
+    >>> coalescer = EventCoalescer(0.5)
+    >>> for device in monitor.poll_many(timeout=coalescer.timeout()):
+    ...     coalescer.add(device)
+    >>> for device in coalescer.pop_ready():
+    ...     print('{0.action} on {0.device_path}'.format(device))
+
+    :class:`MonitorObserver`, :class:`pyudev.glib.MonitorObserver` and
+    :class:`pyudev.wx.MonitorObserver` coalesce events with this class, if
+    given a ``coalesce_window``.  The Qt observers do not support
+    coalescing.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, window):
+        """
+        Create a new coalescer.
+
+        ``window`` is the time in seconds to hold back the events for a
+        device as floating point number.
+        """
+        #: The time in seconds to hold back events for a device
+        self.window = window
+        # pending events by sys path, and the order of arrival of the
+        # devices as (sys_path, entry) pairs, which are stale, if the entry
+        # for the sys path was removed or replaced meanwhile.  This keeps
+        # the order without OrderedDict, which Python 2.6 lacks
+        self._pending = {}
+        self._order = deque()
+
+    def _first(self):
+        """
+        Get the sys path and entry of the first device with pending events.
+
+        Discard stale entries in the order of arrival on the way.  Return
+        ``None``, if there are no pending events.
+        """
+        while self._order:
+            sys_path, entry = self._order[0]
+            if self._pending.get(sys_path) is entry:
+                return sys_path, entry
+            self._order.popleft()
+        return None
+
+    def __len__(self):
+        """
+        Return the number of devices with pending events.
+        """
+        return len(self._pending)
+
+    def add(self, device, now=None):
+        """
+        Add the event of ``device``.
+
+        ``device`` is a :class:`Device` received from a :class:`Monitor`.
+        ``now`` is the current time in seconds of a monotonic clock, and
+        defaults to the current time.
+        """
+        if now is None:
+            now = monotonic()
+        pending = self._pending.get(device.sys_path)
+        if pending is None:
+            entry = (now + self.window, [device])
+            self._pending[device.sys_path] = entry
+            self._order.append((device.sys_path, entry))
+            return
+        events = pending[1]
+        action = device.action
+        if action == 'change' and events[-1].action == 'change':
+            events[-1] = device
+        elif action == 'remove':
+            adds = [i for i, e in enumerate(events) if e.action == 'add']
+            if adds:
+                del events[adds[-1]:]
+                if not events:
+                    del self._pending[device.sys_path]
+            else:
+                events[:] = [e for e in events if e.action != 'change']
+                events.append(device)
+        else:
+            events.append(device)
+
+    def timeout(self, now=None):
+        """
+        Get the time until the next events are ready.
+
+        Return the time in seconds as floating point number, which is ``0``
+        if events are ready now, or ``None``, if there are no pending
+        events.
+        """
+        first = self._first()
+        if first is None:
+            return None
+        if now is None:
+            now = monotonic()
+        deadline = first[1][0]
+        return max(deadline - now, 0)
+
+    def pop_ready(self, now=None):
+        """
+        Remove and return all events, whose window has passed at ``now``.
+
+        ``now`` defaults to the current time, like in :meth:`add()`.
+
+        Return a list of :class:`Device` objects in the order of arrival.
+        """
+        if now is None:
+            now = monotonic()
+        ready = []
+        while True:
+            first = self._first()
+            if first is None:
+                break
+            sys_path, (deadline, events) = first
+            if deadline > now:
+                break
+            del self._pending[sys_path]
+            self._order.popleft()
+            ready.extend(events)
+        return ready
+
+    def flush(self):
+        """
+        Remove and return all pending events, regardless of their window.
+
+        Return a list of :class:`Device` objects in the order of arrival.
+        """
+        ready = []
+        for sys_path, entry in self._order:
+            if self._pending.get(sys_path) is entry:
+                ready.extend(entry[1])
+        self._pending.clear()
+        self._order.clear()
+        return ready
+
+
+class _DispatchShard(object):
+    """
+    The queue and the worker thread of a shard of an
+    :class:`EventDispatcher`.
+    """
+
+    def __init__(self):
+        self.queue = deque()
+        self.condition = Condition()
+        self.dropped = 0
+        self.thread = None
+
+
+class EventDispatcher(object):
+    """
+    Dispatch device events to worker threads, preserving the order of the
+    events of each device.
+
+    Events are sharded by :attr:`~Device.sys_path` among :attr:`shards`
+    worker threads.  Each worker invokes the callback for the events of its
+    shard one after another, so the events of a device are handled in the
+    order of arrival, while events of different devices are handled in
+    parallel:
+
+    >>> dispatcher = EventDispatcher(shards=4)
+    >>> dispatcher.start(print_device_event)
+    >>> for device in iter(monitor.poll, None):
+    ...     dispatcher.dispatch(device)
+    >>> dispatcher.shutdown()
+
+    Each shard queues at most ``maxsize`` events.  If the queue of a shard
+    is full, :meth:`dispatch()` handles the new event according to the
+    ``overflow`` policy:
+
+    ``'block'``
+       Wait until the worker has taken an event from the queue.
+    ``'drop-oldest'``
+       Discard the oldest event in the queue.
+    ``'coalesce'``
+       Replace the last queued event of the same device, if both are
+       ``'change'`` events, and discard the oldest event in the queue
+       otherwise.
+
+    Discarded and replaced events are counted in :attr:`dropped`.
+
+    :class:`MonitorObserver` dispatches events with this class, if given a
+    ``dispatcher``.
+
+    .. versionadded:: 0.17
+    """
+
+    #: The supported overflow policies
+    OVERFLOW_POLICIES = frozenset(['block', 'drop-oldest', 'coalesce'])
+
+    def __init__(self, shards=4, executor=None, maxsize=None,
+                 overflow='block', snapshots=False):
+        """
+        Create a new dispatcher.
+
+        ``shards`` is the number of worker threads as integer.  ``executor``
+        is an optional executor like
+        :class:`concurrent.futures.ThreadPoolExecutor` or
+        :class:`concurrent.futures.ProcessPoolExecutor`.  If given, the
+        workers submit the callback to ``executor`` and wait for its result,
+        so at most ``shards`` events are handled at the same time.
+
+        ``maxsize`` is the maximum number of events to queue per shard as
+        integer.  If ``0`` or ``None`` the queues are unbounded.
+        ``overflow`` is one of :attr:`OVERFLOW_POLICIES`.
+
+        If ``snapshots`` is ``True``, :class:`Device` objects are replaced
+        with their :meth:`~Device.snapshot()` before being queued.  This is
+        required for a process pool, because :class:`Device` objects cannot
+        be pickled.  The callback must be picklable then, too.
+
+        Raise :exc:`~exceptions.ValueError`, if ``shards`` is less than
+        ``1``, or ``overflow`` is not a supported policy.
+        """
+        if shards < 1:
+            raise ValueError('Invalid number of shards: {0!r}'.format(shards))
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError('Invalid overflow policy: {0!r}'.format(overflow))
+        #: The number of worker threads
+        self.shards = shards
+        self.executor = executor
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.snapshots = snapshots
+        self._callback = None
+        self._shards = []
+        self._shutdown = False
+
+    def __len__(self):
+        """
+        Return the number of queued events.
+        """
+        return sum(len(shard.queue) for shard in self._shards)
+
+    @property
+    def dropped(self):
+        """
+        The number of events discarded or replaced, because a queue was
+        full.
+        """
+        return sum(shard.dropped for shard in self._shards)
+
+    def start(self, callback):
+        """
+        Start the worker threads.
+
+        ``callback`` is the callable to invoke on events, with the signature
+        ``callback(device)``.  Exceptions raised by ``callback`` are printed
+        to :data:`sys.stderr`, like uncaught exceptions in threads, and the
+        worker continues with the next event.
+
+        Raise :exc:`~exceptions.RuntimeError`, if this dispatcher was
+        already started.
+        """
+        if self._callback is not None:
+            raise RuntimeError('Dispatcher already started')
+        self._callback = callback
+        for index in range(self.shards):
+            shard = _DispatchShard()
+            shard.thread = Thread(target=self._work, args=(shard,),
+                                  name='pyudev-dispatcher-{0}'.format(index))
+            shard.thread.daemon = True
+            self._shards.append(shard)
+        for shard in self._shards:
+            shard.thread.start()
+
+    def dispatch(self, device):
+        """
+        Queue the event of ``device`` for the callback.
+
+        ``device`` is a :class:`Device` or :class:`DeviceSnapshot` received
+        from a :class:`Monitor`.
+
+        Raise :exc:`~exceptions.RuntimeError`, if this dispatcher is not
+        running.
+        """
+        if self._callback is None or self._shutdown:
+            raise RuntimeError('Dispatcher not running')
+        if self.snapshots and isinstance(device, Device):
+            device = device.snapshot()
+        shard = self._shards[hash(device.sys_path) % len(self._shards)]
+        with shard.condition:
+            queue = shard.queue
+            if self.maxsize and len(queue) >= self.maxsize:
+                if self.overflow == 'block':
+                    while len(queue) >= self.maxsize and not self._shutdown:
+                        shard.condition.wait()
+                elif self.overflow == 'coalesce' and self._coalesce(queue,
+                                                                    device):
+                    shard.dropped += 1
+                    return
+                else:
+                    queue.popleft()
+                    shard.dropped += 1
+            queue.append(device)
+            shard.condition.notify_all()
+
+    @staticmethod
+    def _coalesce(queue, device):
+        """
+        Replace the last event of the device of ``device`` in ``queue``, if
+        both are ``'change'`` events.
+
+        Return ``True``, if an event was replaced, ``False`` otherwise.
+        """
+        for index in range(len(queue) - 1, -1, -1):
+            if queue[index].sys_path == device.sys_path:
+                if queue[index].action == device.action == 'change':
+                    queue[index] = device
+                    return True
+                return False
+        return False
+
+    def _work(self, shard):
+        while True:
+            with shard.condition:
+                while not shard.queue and not self._shutdown:
+                    shard.condition.wait()
+                if not shard.queue:
+                    return
+                device = shard.queue.popleft()
+                shard.condition.notify_all()
+            try:
+                if self.executor is None:
+                    self._callback(device)
+                else:
+                    self.executor.submit(self._callback, device).result()
+            except Exception:
+                traceback.print_exc()
+
+    def _in_worker(self):
+        """
+        Whether the current thread is a worker thread of this dispatcher.
+        """
+        thread = current_thread()
+        return any(shard.thread is thread for shard in self._shards)
+
+    def shutdown(self, wait=True):
+        """
+        Stop the worker threads.
+
+        The workers still handle all queued events before they exit.  If
+        ``wait`` is ``True``, wait for the workers to exit, unless called
+        from a worker thread.  The ``executor`` is *not* shut down.
+        """
+        self._shutdown = True
+        for shard in self._shards:
+            with shard.condition:
+                shard.condition.notify_all()
+        if wait and not self._in_worker():
+            for shard in self._shards:
+                shard.thread.join()
+
+
+def _timeout_in_milliseconds(timeout):
+    """
+    Convert ``timeout`` in seconds into milliseconds for :meth:`Poll.poll()`.
+
+    Round up to not wake up too early, and keep ``None`` as is.
+    """
+    if timeout is None:
+        return None
+    return int(ceil(timeout * 1000))
+
+
 class MonitorObserver(Thread):
     """
     An asynchronous observer for device events.
@@ -481,20 +1772,42 @@ def __init__(self, monitor, event_handler=None, callback=None, *args,
            ``callback`` is invoked in the observer thread, hence the observer
            is blocked while callback executes.
 
-        ``args`` and ``kwargs`` are passed unchanged to the constructor of
-        :class:`~threading.Thread`.
+        If the keyword argument ``coalesce_window`` is given, bursts of
+        events for the same device are coalesced with an
+        :class:`EventCoalescer` with this window, and ``callback`` is only
+        invoked for the remaining events, after the window has passed.
+        Pending events are discarded, when the observer is stopped.
+
+        If the keyword argument ``resync`` is ``True``, the observer calls
+        :meth:`Monitor.enable_resync()` when started, so that ``callback``
+        also receives synthetic events for changes, which were lost.
+
+        If the keyword argument ``dispatcher`` is an
+        :class:`EventDispatcher`, the observer starts it with ``callback``
+        and hands all events to it, so that ``callback`` is invoked in the
+        worker threads of the dispatcher, and a slow ``callback`` does not
+        block the observer.  The dispatcher is shut down, when the observer
+        is stopped.
+
+        ``args`` and all other ``kwargs`` are passed unchanged to the
+        constructor of :class:`~threading.Thread`.
 
         .. deprecated:: 0.16
            The ``event_handler`` argument will be removed in 1.0. Use
            the ``callback`` argument instead.
         .. versionchanged:: 0.16
            Add ``callback`` argument.
+        .. versionchanged:: 0.17
+           Add ``coalesce_window``, ``resync`` and ``dispatcher`` arguments.
         """
         if callback is None and event_handler is None:
             raise ValueError('callback missing')
         elif callback is not None and event_handler is not None:
             raise ValueError('Use either callback or event handler')
 
+        coalesce_window = kwargs.pop('coalesce_window', None)
+        resync = kwargs.pop('resync', False)
+        dispatcher = kwargs.pop('dispatcher', None)
         Thread.__init__(self, *args, **kwargs)
         self.monitor = monitor
         # observer threads should not keep the interpreter alive
@@ -506,6 +1819,11 @@ def __init__(self, monitor, event_handler=None, callback=None, *args,
                           'Use Monitor.poll() instead.', DeprecationWarning)
             callback = lambda d: event_handler(d.action, d)
         self._callback = callback
+        self._coalescer = None
+        if coalesce_window:
+            self._coalescer = EventCoalescer(coalesce_window)
+        self._resync = resync
+        self._dispatcher = dispatcher
 
     def start(self):
         """Start the observer thread."""
@@ -515,21 +1833,52 @@ def start(self):
 
     def run(self):
         self.monitor.start()
+        if self._resync and not self.monitor.resync_enabled:
+            self.monitor.enable_resync()
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            emit = self._callback
+        else:
+            dispatcher.start(self._callback)
+            emit = dispatcher.dispatch
+        try:
+            self._observe(emit)
+        finally:
+            if dispatcher is not None:
+                dispatcher.shutdown()
+
+    def _observe(self, emit):
         notifier = Poll.for_events(
             (self.monitor, 'r'), (self._stop_event.source, 'r'))
+        coalescer = self._coalescer
         while True:
-            for fd, event in notifier.poll():
+            timeout = None
+            if coalescer is not None:
+                timeout = _timeout_in_milliseconds(coalescer.timeout())
+            for fd, event in notifier.poll(timeout):
                 if fd == self._stop_event.source.fileno():
                     # in case of a stop event, close our pipe side, and
                     # return from the thread
                     self._stop_event.source.close()
                     return
-                elif fd == self.monitor.fileno() and event == 'r':
-                    read_device = partial(self.monitor.poll, timeout=0)
-                    for device in iter(read_device, None):
-                        self._callback(device)
+                elif fd == self.monitor.fileno() and event in ('r', 'e'):
+                    read_devices = partial(self.monitor.poll_many, timeout=0)
+                    for devices in iter(read_devices, []):
+                        if coalescer is None:
+                            for device in devices:
+                                emit(device)
+                        else:
+                            for device in devices:
+                                coalescer.add(device)
+                            # deliver held back events while a burst of
+                            # events goes on
+                            for device in coalescer.pop_ready():
+                                emit(device)
                 else:
                     raise EnvironmentError('Observed monitor hung up')
+            if coalescer is not None:
+                for device in coalescer.pop_ready():
+                    emit(device)
 
     def send_stop(self):
         """
@@ -571,10 +1920,16 @@ def stop(self):
 
            The underlying :attr:`monitor` is *not* stopped.
 
+        With a ``dispatcher``, this method can also be called from the
+        worker threads of the dispatcher, but not from an ``executor`` of
+        the dispatcher.  Use :meth:`send_stop()` there.
+
         .. versionchanged:: 0.16
            This method can be called from the observer thread.
         """
         self.send_stop()
+        if self._dispatcher is not None and self._dispatcher._in_worker():
+            return
         try:
             self.join()
         except RuntimeError:
@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+"""
+    pyudev.netlink
+    ==============
+
+    Device event monitoring without libudev.
+
+    :class:`NetlinkMonitor` receives device events directly from the uevent
+    netlink socket, and hands them out as :class:`NetlinkEvent` objects,
+    which parse the event lazily.
+
+    This module requires :meth:`socket.socket.recvmsg_into`, which is
+    available since Python 3.3.
+
+    .. moduleauthor::  mulhern  <amulhern@redhat.com>
+    .. versionadded:: 0.17
+"""
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import errno
+import socket
+import struct
+from collections import Mapping
+
+from pyudev._util import ensure_byte_string, ensure_unicode_string
+from pyudev._util import monotonic
+from pyudev.os import DefaultPoll
+
+
+__all__ = ['NetlinkMonitor', 'NetlinkEvent']
+
+
+#: The netlink protocol of device events
+NETLINK_KOBJECT_UEVENT = 15
+
+#: The multicast groups of the event sources
+GROUPS = {'kernel': 1, 'udev': 2}
+
+#: The maximum size of an event, as in libudev
+MESSAGE_SIZE = 8192
+
+#: The header of events sent by udev (``struct udev_monitor_netlink_header``)
+HEADER = struct.Struct(str('=8s4xIII16x'))
+
+#: The prefix of events sent by udev
+HEADER_PREFIX = b'libudev\x00'
+
+#: The magic number in the header of events sent by udev, in network order
+HEADER_MAGIC = struct.pack(str('!I'), 0xfeedcafe)
+
+#: The offset of the magic number in the header
+HEADER_MAGIC_OFFSET = 8
+
+#: Credentials of the sender of an event (``struct ucred``)
+UCRED = struct.Struct(str('=iII'))
+
+
+class NetlinkEvent(Mapping):
+    """
+    A device event received by a :class:`NetlinkMonitor`.
+
+    This class is a read-only mapping of the properties of the event, just
+    like :class:`~pyudev.Device` is a mapping of device properties.  The
+    event keeps the received message as is, and only looks for the requested
+    property on each access.  The properties are split into a dictionary
+    only, if the event is iterated over, or if its length is requested.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, source, data, start, end, sys_mount='/sys'):
+        """
+        Create a new event.
+
+        ``source`` is the source of the event, either ``'udev'`` or
+        ``'kernel'``.  ``data`` is the received message as byte string, and
+        ``start`` and ``end`` the offsets of the properties within
+        ``data``.  ``sys_mount`` is the ``sysfs`` mount point as unicode
+        string.
+        """
+        self.source = source
+        self._data = data
+        self._start = start
+        self._end = end
+        self._sys_mount = sys_mount
+        self._properties = None
+
+    def __repr__(self):
+        return 'NetlinkEvent({0!r}, {1!r})'.format(
+            self.action, self.device_path)
+
+    def _lookup(self, property):
+        """
+        Find ``property`` in the received message without splitting all
+        properties.
+
+        Return the value as byte string, or ``None``, if ``property`` was not
+        found.
+        """
+        data = self._data
+        key = ensure_byte_string(property) + b'='
+        if data.startswith(key, self._start):
+            value_start = self._start + len(key)
+        else:
+            index = data.find(b'\x00' + key, self._start, self._end)
+            if index < 0:
+                return None
+            value_start = index + 1 + len(key)
+        value_end = data.find(b'\x00', value_start, self._end)
+        if value_end < 0:
+            value_end = self._end
+        return data[value_start:value_end]
+
+    def _get_properties(self):
+        """
+        Get all properties as dictionary mapping names to values, both as
+        unicode strings.
+        """
+        if self._properties is None:
+            properties = {}
+            for item in self._data[self._start:self._end].split(b'\x00'):
+                name, sep, value = item.partition(b'=')
+                if sep:
+                    properties[ensure_unicode_string(name)] = \
+                        ensure_unicode_string(value)
+            self._properties = properties
+        return self._properties
+
+    def __getitem__(self, property):
+        """
+        Get the given ``property`` of this event.
+
+        ``property`` is a unicode or byte string containing the name of the
+        property.
+
+        Return the property value as unicode string, or raise a
+        :exc:`~exceptions.KeyError`, if the event has no such property.
+        """
+        if self._properties is not None:
+            return self._properties[ensure_unicode_string(property)]
+        value = self._lookup(property)
+        if value is None:
+            raise KeyError(property)
+        return ensure_unicode_string(value)
+
+    def __contains__(self, property):
+        if self._properties is not None:
+            return ensure_unicode_string(property) in self._properties
+        return self._lookup(property) is not None
+
+    def __iter__(self):
+        """
+        Iterate over the names of all properties of this event.
+
+        Yield each name as unicode string.
+        """
+        return iter(self._get_properties())
+
+    def __len__(self):
+        """
+        Return the number of properties of this event as integer.
+        """
+        return len(self._get_properties())
+
+    @property
+    def action(self):
+        """
+        The action of this event as unicode string, e.g. ``'add'``.
+        """
+        return self.get('ACTION')
+
+    @property
+    def device_path(self):
+        """
+        The kernel device path of the device as unicode string, without the
+        ``sysfs`` mount point, like :attr:`pyudev.Device.device_path`.
+        """
+        return self.get('DEVPATH')
+
+    @property
+    def sys_path(self):
+        """
+        The absolute path of the device in ``sysfs`` as unicode string, like
+        :attr:`pyudev.Device.sys_path`.
+        """
+        device_path = self.device_path
+        if device_path is None:
+            return None
+        return self._sys_mount + device_path
+
+    @property
+    def subsystem(self):
+        """
+        The subsystem of the device as unicode string, or ``None``.
+        """
+        return self.get('SUBSYSTEM')
+
+    @property
+    def device_type(self):
+        """
+        The device type as unicode string, or ``None``.
+        """
+        return self.get('DEVTYPE')
+
+    @property
+    def sequence_number(self):
+        """
+        The sequence number of this event as integer, or ``0``, if the event
+        has no sequence number.
+        """
+        return int(self.get('SEQNUM', 0))
+
+
+def _parse_message(source, data, sys_mount, size=None):
+    """
+    Parse a message received from a uevent netlink socket.
+
+    ``source`` is the source the message was received from, ``data`` the
+    message as byte string or :func:`bytearray` and ``sys_mount`` the
+    ``sysfs`` mount point.  ``size`` is the size of the message in ``data``,
+    and defaults to the length of ``data``.
+
+    The message is validated in place, and only its properties are copied
+    out of ``data``, so that ``data`` can be reused for the next message.
+
+    Return a :class:`NetlinkEvent`, or ``None``, if the message is invalid.
+    """
+    if size is None:
+        size = len(data)
+    if data.startswith(HEADER_PREFIX, 0, size):
+        if size < HEADER.size:
+            return None
+        if not data.startswith(HEADER_MAGIC, HEADER_MAGIC_OFFSET):
+            return None
+        _, _, start, length = HEADER.unpack_from(data)
+        end = start + length
+        if start < HEADER.size or end > size:
+            return None
+    else:
+        # kernel events start with "ACTION@DEVPATH"
+        start = data.find(b'\x00', 0, size) + 1
+        if start <= 0 or data.find(b'@/', 0, start) < 0:
+            return None
+        end = size
+    properties = bytes(memoryview(data)[start:end])
+    return NetlinkEvent(source, properties, 0, len(properties), sys_mount)
+
+
+class NetlinkMonitor(object):
+    """
+    A device event monitor on a raw netlink socket.
+
+    This class provides the same means to receive events as
+    :class:`pyudev.Monitor`, but reads from the uevent netlink socket
+    itself instead of through libudev:
+
+    >>> from pyudev import Context
+    >>> from pyudev.netlink import NetlinkMonitor
+    >>> context = Context()
+    >>> monitor = NetlinkMonitor(context)
+    >>> for event in iter(monitor.poll, None):
+    ...     print('{0.action} on {0.device_path}'.format(event))
+
+    Each event is received into a preallocated buffer and validated in
+    place.  Only its properties are copied out of the buffer, once, and
+    parsed lazily, so receiving an event is much cheaper than receiving a
+    :class:`~pyudev.Device`.  Events are :class:`NetlinkEvent` objects,
+    which only provide the properties of the event.  Use
+    :meth:`pyudev.Device.from_sys_path()` with :attr:`NetlinkEvent.sys_path`
+    to get the device itself.
+
+    Like libudev, this monitor drops events which were not sent by the
+    kernel or by a process of the root user.
+
+    .. versionadded:: 0.17
+    """
+
+    def __init__(self, context, source='udev'):
+        """
+        Create a new monitor for the given ``source``.
+
+        ``context`` is the :class:`~pyudev.Context` to use.  ``source`` is
+        either ``'udev'`` (the default) or ``'kernel'`` (see
+        :meth:`pyudev.Monitor.from_netlink()`).
+
+        Raise :exc:`~exceptions.ValueError`, if an invalid source has been
+        specified.  Raise :exc:`~exceptions.EnvironmentError`, if the netlink
+        socket could not be created.
+        """
+        self._socket = None
+        self._poller = None
+        if source not in GROUPS:
+            raise ValueError('Invalid source: {0!r}. Must be one of "udev" '
+                             'or "kernel"'.format(source))
+        self.context = context
+        self.source = source
+        self._sys_mount = context.sys_path
+        self._started = False
+        self._socket = socket.socket(
+            socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC,
+            NETLINK_KOBJECT_UEVENT)
+        self._socket.setblocking(False)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_PASSCRED, 1)
+        self._buffer = bytearray(MESSAGE_SIZE)
+        self._view = memoryview(self._buffer)
+        self._ancillary_size = socket.CMSG_SPACE(UCRED.size)
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """
+        Close the netlink socket of this monitor.
+        """
+        if self._poller is not None:
+            self._poller.close()
+            self._poller = None
+        if self._socket is not None:
+            self._socket.close()
+
+    @property
+    def started(self):
+        """
+        ``True``, if this monitor was started, ``False`` otherwise. Readonly.
+        """
+        return self._started
+
+    def fileno(self):
+        """
+        Return the file descriptor of the netlink socket as integer.
+        """
+        return self._socket.fileno()
+
+    def start(self):
+        """
+        Start this monitor by joining the multicast group of its source.
+
+        Do nothing, if the monitor was already started.
+        """
+        if not self._started:
+            self._socket.bind((0, GROUPS[self.source]))
+            self._started = True
+
+    def set_receive_buffer_size(self, size):
+        """
+        Set the receive buffer ``size`` in bytes as integer.
+
+        Like :meth:`pyudev.Monitor.set_receive_buffer_size()` this requires
+        the CAP_NET_ADMIN capability.
+
+        Raise :exc:`~exceptions.EnvironmentError`, if the buffer size could
+        not be set.
+        """
+        self._socket.setsockopt(socket.SOL_SOCKET,
+                                getattr(socket, 'SO_RCVBUFFORCE', 33), size)
+
+    def _is_trusted(self, address, ancillary):
+        """
+        Whether a message from ``address`` with the ``ancillary`` data
+        was sent by a trusted sender.
+        """
+        pid, groups = address
+        if groups == 0:
+            # unicast message
+            return False
+        if groups == GROUPS['kernel'] and pid != 0:
+            # kernel events must come from the kernel
+            return False
+        for level, kind, data in ancillary:
+            if (level == socket.SOL_SOCKET and
+                    kind == socket.SCM_CREDENTIALS and
+                    len(data) >= UCRED.size):
+                _, uid, _ = UCRED.unpack_from(data)
+                return uid == 0
+        return False
+
+    def _receive_event(self):
+        """
+        Receive a single event from the socket.
+
+        Return the received :class:`NetlinkEvent`, or ``None``, if no event
+        is available.
+        """
+        while True:
+            try:
+                size, ancillary, flags, address = self._socket.recvmsg_into(
+                    [self._view], self._ancillary_size)
+            except EnvironmentError as error:
+                if error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return None
+                elif error.errno in (errno.EINTR, errno.ENOBUFS):
+                    # ENOBUFS means, that events were lost, but the socket
+                    # is usable again
+                    continue
+                else:
+                    raise
+            if flags & socket.MSG_TRUNC or not self._is_trusted(
+                    address, ancillary):
+                continue
+            event = _parse_message(self.source, self._buffer,
+                                   self._sys_mount, size)
+            if event is not None:
+                return event
+
+    def _get_poller(self):
+        if self._poller is None:
+            self._poller = DefaultPoll.for_events((self, 'r'))
+        return self._poller
+
+    def poll(self, timeout=None):
+        """
+        Poll for a device event.
+
+        ``timeout`` has the same meaning as in :meth:`pyudev.Monitor.poll()`.
+
+        .. note::
+
+           This method implicitly calls :meth:`start()`.
+
+        Return the received :class:`NetlinkEvent`, or ``None`` if a timeout
+        occurred.  Raise :exc:`~exceptions.EnvironmentError` if event
+        retrieval failed.
+        """
+        deadline = None
+        if timeout is not None and timeout > 0:
+            deadline = monotonic() + timeout
+        self.start()
+        poller = self._get_poller()
+        while True:
+            if deadline is not None:
+                # .poll() takes timeout in milliseconds
+                timeout = int(max(deadline - monotonic(), 0) * 1000)
+            if not poller.poll(timeout):
+                return None
+            event = self._receive_event()
+            # keep waiting, if the readable messages were all dropped
+            if event is not None or timeout == 0:
+                return event
+
+    def poll_many(self, timeout=None, max_count=None, max_latency=None):
+        """
+        Poll for a batch of device events.
+
+        The arguments have the same meaning as in
+        :meth:`pyudev.Monitor.poll_many()`.
+
+        Return a list of received :class:`NetlinkEvent` objects in the order
+        of arrival, which is empty if a timeout occurred.
+        """
+        event = self.poll(timeout)
+        if event is None:
+            return []
+        events = [event]
+        deadline = None
+        if max_latency is not None:
+            deadline = monotonic() + max_latency
+        while max_count is None or len(events) < max_count:
+            if deadline is not None and monotonic() >= deadline:
+                break
+            event = self._receive_event()
+            if event is None:
+                break
+            events.append(event)
+        return events
@@ -165,6 +165,10 @@ class Poll(object):
     def _has_event(events, event):
         return events & event != 0
 
+    @staticmethod
+    def _new_notifier():
+        return select.poll()
+
     @classmethod
     def for_events(cls, *events):
         """Listen for ``events``.
@@ -175,13 +179,10 @@ def for_events(cls, *events):
         for whether the channel is ready to be written to.
 
         """
-        notifier = select.poll()
+        poll = cls(cls._new_notifier())
         for fd, event in events:
-            mask = cls._EVENT_TO_MASK.get(event)
-            if not mask:
-                raise ValueError('Unknown event type: {0!r}'.format(event))
-            notifier.register(fd, mask)
-        return cls(notifier)
+            poll.register(fd, event)
+        return poll
 
     def __init__(self, notifier):
         """Create a poll object for the given ``notifier``.
@@ -192,6 +193,36 @@ def __init__(self, notifier):
         """
         self._notifier = notifier
 
+    def register(self, fd, event):
+        """Listen for ``event`` on ``fd``.
+
+        ``fd`` is a file descriptor or file object, and ``event`` either
+        ``'r'`` or ``'w'`` (see :meth:`for_events()`).
+
+        """
+        mask = self._EVENT_TO_MASK.get(event)
+        if not mask:
+            raise ValueError('Unknown event type: {0!r}'.format(event))
+        self._notifier.register(fd, mask)
+
+    def unregister(self, fd):
+        """Stop listening for events on ``fd``.
+
+        ``fd`` is a file descriptor or file object.  Raise
+        :exc:`~exceptions.KeyError`, if ``fd`` is not registered.
+
+        """
+        self._notifier.unregister(fd)
+
+    def close(self):
+        """Close this poll object.
+
+        :class:`select.poll` objects do not hold any resources, so this
+        method does nothing.
+
+        """
+        pass
+
     def poll(self, timeout=None):
         """Poll for events.
 
@@ -204,7 +235,13 @@ def poll(self, timeout=None):
         descriptor, and ``event`` a string indicating the event type.  If
         ``'r'``, there is data to read from ``fd``.  If ``'w'``, ``fd`` is
         writable without blocking now.  If ``'h'``, the file descriptor was
-        hung up (i.e. the remote side of a pipe was closed).
+        hung up (i.e. the remote side of a pipe was closed).  If ``'e'``, an
+        error is pending on ``fd`` (e.g. :data:`~errno.ENOBUFS` on a
+        netlink socket), which the next read from ``fd`` reports.
+
+        .. versionchanged:: 0.17
+           Report pending errors as ``'e'`` instead of raising
+           :exc:`~exceptions.IOError`.
 
         """
         # Return a list to allow clients to determine whether there are any
@@ -223,12 +260,48 @@ def _parse_events(self, events):
         for fd, event_mask in events:
             if self._has_event(event_mask, select.POLLNVAL):
                 raise IOError('File descriptor not open: {0!r}'.format(fd))
-            elif self._has_event(event_mask, select.POLLERR):
-                raise IOError('Error while polling fd: {0!r}'.format(fd))
 
+            if self._has_event(event_mask, select.POLLERR):
+                yield fd, 'e'
             if self._has_event(event_mask, select.POLLIN):
                 yield fd, 'r'
             if self._has_event(event_mask, select.POLLOUT):
                 yield fd, 'w'
             if self._has_event(event_mask, select.POLLHUP):
                 yield fd, 'h'
+
+
+class EPoll(Poll):
+    """A poll object using :class:`select.epoll`.
+
+    In contrast to :class:`Poll` the set of registered file descriptors is
+    kept by the kernel, which makes repeated polls with the same object
+    cheaper.  Use this class for long-lived poll objects, and :meth:`close()`
+    them when they are not needed anymore.
+
+    """
+
+    @staticmethod
+    def _new_notifier():
+        return select.epoll()
+
+    def poll(self, timeout=None):
+        """Poll for events.
+
+        See :meth:`Poll.poll()`.
+
+        """
+        # epoll takes the timeout in seconds, and -1 to wait infinitely
+        if timeout is None or timeout < 0:
+            timeout = -1
+        else:
+            timeout = timeout / 1000
+        return list(self._parse_events(self._notifier.poll(timeout)))
+
+    def close(self):
+        """Close the underlying epoll file descriptor."""
+        self._notifier.close()
+
+
+# The poll implementation to use for long-lived poll objects
+DefaultPoll = EPoll if hasattr(select, 'epoll') else Poll
@@ -61,14 +61,19 @@ class MonitorObserver(EvtHandler):
     >>> observer.Bind(EVT_DEVICE_EVENT, device_event)
     >>> monitor.start()
 
+    If ``coalesce_window`` is given, bursts of events for the same device
+    are coalesced with an :class:`~pyudev.EventCoalescer` with this window,
+    and only the remaining events are posted, after the window has passed.
+
     This class is a child of :class:`wx.EvtHandler`.
 
     .. versionadded:: 0.17
     """
 
-    def __init__(self, monitor):
+    def __init__(self, monitor, coalesce_window=None):
         EvtHandler.__init__(self)
         self.monitor = monitor
+        self.coalesce_window = coalesce_window
         self._observer_thread = None
         self.start()
 
@@ -99,7 +104,7 @@ def start(self):
             return
         self._observer_thread = pyudev.MonitorObserver(
             self.monitor, callback=self._emit_event,
-            name='wx-observer-thread')
+            name='wx-observer-thread', coalesce_window=self.coalesce_window)
         self._observer_thread.start()
 
     def stop(self):
@@ -36,6 +36,7 @@
 
 import sys
 import os
+from collections import deque
 from select import select
 
 
@@ -53,11 +54,16 @@ def __init__(self, device_to_emit):
         self._event_source, self._event_sink = os.pipe()
         self.device_to_emit = device_to_emit
         self.started = False
+        self._devices = deque()
 
-    def trigger_event(self):
+    def trigger_event(self, device=None):
         """
         Trigger an event on clients of this monitor.
+
+        Emit ``device``, if given, and :attr:`device_to_emit` otherwise.
         """
+        self._devices.append(
+            self.device_to_emit if device is None else device)
         os.write(self._event_sink, b'\x01')
 
     def fileno(self):
@@ -73,7 +79,17 @@ def poll(self, timeout=None):
         rlist, _, _ = select([self._event_source], [], [], timeout)
         if self._event_source in rlist:
             os.read(self._event_source, 1)
-            return self.device_to_emit
+            return self._devices.popleft()
+
+    def poll_many(self, timeout=None, max_count=None, max_latency=None):
+        device = self.poll(timeout)
+        devices = []
+        while device is not None:
+            devices.append(device)
+            if max_count is not None and len(devices) >= max_count:
+                break
+            device = self.poll(timeout=0)
+        return devices
 
     def close(self):
         """
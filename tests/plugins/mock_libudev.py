@@ -36,6 +36,8 @@
 
 import mock
 
+from pyudev._libudev import _list_entry_pairs
+
 
 Node = namedtuple('Node', 'name value next')
 
@@ -81,7 +83,7 @@ def libudev_list(libudev, function, items):
     """
     functions_to_patch = [function, 'udev_list_entry_get_next',
                           'udev_list_entry_get_name',
-                          'udev_list_entry_get_value']
+                          'udev_list_entry_get_value', 'list_entry_pairs']
     mocks = dict((f, mock.DEFAULT) for f in functions_to_patch)
     with mock.patch.multiple(libudev, **mocks):
         udev_list = LinkedList.from_iterable(items)
@@ -89,6 +91,8 @@ def libudev_list(libudev, function, items):
         libudev.udev_list_entry_get_name.side_effect = attrgetter('name')
         libudev.udev_list_entry_get_value.side_effect = attrgetter('value')
         libudev.udev_list_entry_get_next.side_effect = attrgetter('next')
+        libudev.list_entry_pairs.side_effect = \
+            lambda entry: _list_entry_pairs(libudev, entry)
         yield
 
 
@@ -19,6 +19,7 @@
 from __future__ import (print_function, division, unicode_literals,
                         absolute_import)
 
+import errno
 import random
 import syslog
 
@@ -26,6 +27,7 @@
 import mock
 
 from pyudev import udev_version
+from pyudev import _libudev
 
 
 def test_udev_version():
@@ -36,6 +38,43 @@ def test_udev_version():
     assert udev_version() > 150
 
 
+def test_udev_version_cached():
+    version = udev_version()
+    with mock.patch('pyudev.core.check_output') as check_output:
+        assert udev_version() == version
+        assert not check_output.called
+
+
+def test_udev_version_without_udevadm():
+    with mock.patch('pyudev.core._udev_version', None):
+        with mock.patch('pyudev.core.check_output') as check_output:
+            check_output.side_effect = OSError(errno.ENOENT, 'udevadm')
+            version = udev_version()
+            assert isinstance(version, int)
+            assert version > 150
+
+
+def test_udev_version_without_udevadm_and_library():
+    with mock.patch('pyudev.core._udev_version', None):
+        with mock.patch('pyudev.core.check_output') as check_output:
+            check_output.side_effect = OSError(errno.ENOENT, 'udevadm')
+            with mock.patch('pyudev.core.load_udev_library') as load:
+                load.side_effect = ImportError('No library named udev')
+                with pytest.raises(EnvironmentError):
+                    udev_version()
+
+
+def test_guess_udev_version():
+    libudev = mock.Mock(spec=['udev_device_has_tag', 'udev_get_sys_path'])
+    assert _libudev.guess_udev_version(libudev) == 172
+    libudev = mock.Mock(spec=['udev_device_has_tag'])
+    assert _libudev.guess_udev_version(libudev) == 183
+    libudev = mock.Mock(spec=['udev_hwdb_new', 'udev_device_has_tag'])
+    assert _libudev.guess_udev_version(libudev) == 196
+    libudev = mock.Mock(spec=['udev_get_sys_path'])
+    assert _libudev.guess_udev_version(libudev) is None
+
+
 class TestContext(object):
 
     def test_sys_path(self, context):
@@ -26,6 +26,7 @@
 import sys
 import gc
 import errno
+import pickle
 from itertools import count
 from datetime import timedelta
 
@@ -37,7 +38,9 @@
                     DeviceNotFoundByNameError,
                     DeviceNotFoundByNumberError,
                     DeviceNotFoundInEnvironmentError)
-from pyudev.device import Attributes, Tags
+from pyudev.device import Attributes, DeviceSnapshot, Tags
+from pyudev.device import read_attributes, read_properties
+from pyudev.device import _bulk
 
 
 with_device_data = pytest.mark.parametrize(
@@ -436,6 +439,48 @@ def test_iteration(self, device, device_data):
     def test_length(self, device, device_data):
         assert len(device) == len(device_data.properties)
 
+    @with_device_data
+    def test_properties_dict(self, device, device_data):
+        properties = device.properties_dict()
+        assert properties == dict((name, device[name]) for name in device)
+        for name, value in properties.items():
+            assert pytest.is_unicode_string(name)
+            assert pytest.is_unicode_string(value)
+        for property in device_data.properties:
+            assert properties[property] == device_data.properties[property]
+
+    @with_devices
+    def test_items_mock(self, device):
+        funcname = 'udev_device_get_properties_list_entry'
+        with pytest.libudev_list(device._libudev, funcname,
+                                 [(b'SPAM', b'eggs'), (b'FOO', b'bar')]):
+            funcname = 'udev_device_get_property_value'
+            with mock.patch.object(device._libudev, funcname) as get_value:
+                assert sorted(device.items()) == [('FOO', 'bar'),
+                                                  ('SPAM', 'eggs')]
+                assert sorted(device.values()) == ['bar', 'eggs']
+                assert not get_value.called
+            func = device._libudev.udev_device_get_properties_list_entry
+            assert func.call_count == 2
+
+    @with_devices
+    def test_length_mock(self, device):
+        funcname = 'udev_device_get_properties_list_entry'
+        with pytest.libudev_list(device._libudev, funcname,
+                                 [(b'SPAM', b'eggs'), (b'FOO', b'bar')]):
+            assert len(device) == 2
+            assert device._libudev.list_entry_pairs.call_count == 1
+
+    @with_devices
+    def test_links_cached(self, device):
+        funcname = 'udev_device_get_devlinks_list_entry'
+        with pytest.libudev_list(device._libudev, funcname,
+                                 [b'/dev/spam', b'/dev/eggs']):
+            assert list(device.device_links) == ['/dev/spam', '/dev/eggs']
+            assert list(device.device_links) == ['/dev/spam', '/dev/eggs']
+            func = device._libudev.udev_device_get_devlinks_list_entry
+            func.assert_called_once_with(device)
+
     @with_device_data
     def test_getitem(self, device, device_data):
         for property in device_data.properties:
@@ -515,6 +560,65 @@ def test_device_ordering(self, context, operator):
         assert str(exc_info.value) == 'Device not orderable'
 
 
+class TestDeviceSnapshot(object):
+
+    @with_device_data
+    def test_snapshot(self, device, device_data):
+        snapshot = device.snapshot()
+        assert isinstance(snapshot, DeviceSnapshot)
+        assert dict(snapshot) == device_data.properties
+        assert snapshot.sys_path == device_data.sys_path
+        assert snapshot.device_path == device_data.device_path
+        assert snapshot.device_node == device_data.device_node
+        assert snapshot.device_number == device_data.device_number
+        assert sorted(snapshot.device_links) == sorted(device_data.device_links)
+        assert snapshot.tags == frozenset(device_data.tags)
+
+    @with_devices
+    def test_snapshot_attributes(self, device):
+        snapshot = device.snapshot()
+        for name in DeviceSnapshot.ATTRIBUTES:
+            assert getattr(snapshot, name) == getattr(device, name)
+
+    @with_devices
+    def test_snapshot_no_libudev_calls(self, device):
+        snapshot = device.snapshot()
+        funcname = 'udev_device_get_property_value'
+        spec = lambda d, p: None
+        with mock.patch.object(device._libudev, funcname,
+                               autospec=spec) as func:
+            for property in snapshot:
+                assert snapshot[property] == snapshot.get(property)
+            assert not func.called
+
+    @with_devices
+    def test_snapshot_immutable(self, device):
+        snapshot = device.snapshot()
+        with pytest.raises(AttributeError):
+            snapshot.sys_path = 'spam'
+        with pytest.raises(AttributeError):
+            snapshot.spam = 'eggs'
+
+    @with_devices
+    def test_snapshot_pickle(self, device):
+        snapshot = device.snapshot()
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            copy = pickle.loads(pickle.dumps(snapshot, protocol))
+            assert copy == snapshot
+            assert dict(copy) == dict(snapshot)
+            assert copy.tags == snapshot.tags
+            assert copy.device_links == snapshot.device_links
+
+    @with_devices
+    def test_snapshot_equality(self, device):
+        snapshot = device.snapshot()
+        assert snapshot == device
+        assert device == snapshot
+        assert snapshot == device.device_path
+        assert hash(snapshot) == hash(device)
+        assert not (snapshot != device)
+
+
 class TestAttributes(object):
 
     @with_devices
@@ -593,6 +697,190 @@ def test_asbool(self, device, device_data):
                 message = 'Not a boolean value:'
                 assert str(exc_info.value).startswith(message)
 
+    @with_device_data
+    def test_cache(self, device, device_data):
+        device.attributes.enable_cache()
+        funcname = 'udev_device_get_sysattr_value'
+        for attribute, value in device_data.attributes.items():
+            device.attributes.prefetch([attribute])
+            with mock.patch.object(device._libudev, funcname) as func:
+                raw_value = value.encode(sys.getfilesystemencoding())
+                assert device.attributes[attribute] == raw_value
+                assert attribute in device.attributes
+                assert not func.called
+
+    @with_devices
+    def test_cache_nonexisting(self, device):
+        attributes = device.attributes
+        attributes.enable_cache()
+        assert 'a non-existing attribute' not in attributes
+        funcname = 'udev_device_get_sysattr_value'
+        with mock.patch.object(device._libudev, funcname) as func:
+            with pytest.raises(KeyError):
+                attributes['a non-existing attribute']
+            assert not func.called
+
+    @with_devices
+    def test_cache_shared(self, device):
+        device.attributes.prefetch(['spam'])
+        funcname = 'udev_device_get_sysattr_value'
+        with mock.patch.object(device._libudev, funcname) as func:
+            assert 'spam' not in device.attributes
+            assert not func.called
+
+    @with_devices
+    def test_cache_invalidate(self, device):
+        device.attributes.prefetch(['spam', 'eggs'])
+        with mock.patch.object(_bulk, '_read_sysfs_file') as read:
+            read.return_value = b'foo\n'
+            device.attributes.invalidate('spam')
+            assert device.attributes['spam'] == b'foo'
+            assert 'eggs' not in device.attributes
+            read.assert_called_once_with(
+                os.path.join(device.sys_path, 'spam'))
+            device.attributes.invalidate()
+            assert device.attributes['eggs'] == b'foo'
+            assert read.call_count == 2
+
+    @with_devices
+    def test_cache_ttl(self, device):
+        device.attributes.enable_cache(ttl=0)
+        with mock.patch.object(_bulk, '_read_sysfs_file') as read:
+            read.return_value = b'foo\n'
+            assert device.attributes['spam'] == b'foo'
+            read.return_value = b'bar\n'
+            assert device.attributes['spam'] == b'bar'
+            assert read.call_count == 2
+
+    @with_devices
+    def test_cache_reads_sysfs(self, device):
+        device.attributes.enable_cache()
+        funcname = 'udev_device_get_sysattr_value'
+        with mock.patch.object(device._libudev, funcname) as func:
+            with mock.patch.object(_bulk, '_read_sysfs_file') as read:
+                read.side_effect = [b'foo\n', b'bar\n']
+                device.attributes.prefetch(['spam', 'eggs'])
+                assert device.attributes['spam'] == b'foo'
+                assert device.attributes['eggs'] == b'bar'
+                # fresh values come from sysfs, not from libudev
+                assert not func.called
+
+    @with_devices
+    def test_cache_fallback(self, device):
+        device.attributes.enable_cache()
+        funcname = 'udev_device_get_sysattr_value'
+        with mock.patch.object(device._libudev, funcname) as func:
+            func.return_value = b'foo'
+            with mock.patch.object(_bulk, '_read_sysfs_file') as read:
+                read.side_effect = EnvironmentError(errno.ELOOP, 'Loop')
+                assert device.attributes['spam'] == b'foo'
+            func.assert_called_once_with(device, b'spam')
+
+    @pytest.mark.udev_version('>= 167')
+    @with_devices
+    def test_cache_names(self, device):
+        device.attributes.enable_cache()
+        names = list(device.attributes)
+        funcname = 'udev_device_get_sysattr_list_entry'
+        with mock.patch.object(device._libudev, funcname) as func:
+            assert list(device.attributes) == names
+            assert len(device.attributes) == len(names)
+            assert not func.called
+
+    @with_devices
+    def test_disable_cache(self, device):
+        device.attributes.prefetch(['spam'])
+        device.attributes.disable_cache()
+        funcname = 'udev_device_get_sysattr_value'
+        with mock.patch.object(device._libudev, funcname) as func:
+            func.return_value = b'foo'
+            assert device.attributes['spam'] == b'foo'
+            assert func.called
+
+
+class TestReadAttributes(object):
+
+    @pytest.mark.parametrize('workers', [1, 4])
+    def test_read_attributes(self, context, workers):
+        devices = list(context.list_devices(subsystem='pci')) or \
+            list(context.list_devices())[:50]
+        names = ['uevent', 'driver', 'subsystem', 'vendor', 'power',
+                 'a non-existing attribute']
+        values = read_attributes(devices, names, workers=workers)
+        assert set(values) == set(devices)
+        for device in devices:
+            expected = dict((name, device.attributes[name]) for name in names
+                            if name in device.attributes)
+            assert values[device] == expected
+
+    @with_devices
+    def test_read_attributes_fallback(self, device):
+        funcname = 'udev_device_get_sysattr_value'
+        with mock.patch.object(device._libudev, funcname) as func:
+            func.return_value = b'spam'
+            values = read_attributes([device], ['subsystem', 'uevent'])
+            func.assert_called_once_with(device, b'subsystem')
+            assert values[device]['subsystem'] == b'spam'
+            assert 'uevent' in values[device]
+
+
+def _normalize_properties(properties):
+    """
+    Normalize the order of links and tags in ``properties``.
+    """
+    properties = dict(properties)
+    if 'DEVLINKS' in properties:
+        properties['DEVLINKS'] = frozenset(properties['DEVLINKS'].split())
+    for name in ('TAGS', 'CURRENT_TAGS'):
+        if name in properties:
+            properties[name] = frozenset(properties[name].split(':'))
+    return properties
+
+
+class TestReadProperties(object):
+
+    def test_read_properties(self, context):
+        sys_paths = context.list_devices().sys_paths()
+        properties = read_properties(context)
+        assert set(properties) == set(sys_paths)
+        for sys_path in sys_paths:
+            device = Device.from_sys_path(context, sys_path)
+            assert (_normalize_properties(properties[sys_path]) ==
+                    _normalize_properties(device.properties_dict()))
+
+    @with_devices
+    def test_read_properties_sys_paths(self, context, device):
+        properties = read_properties(context, [device.sys_path])
+        assert list(properties) == [device.sys_path]
+        for name, value in properties[device.sys_path].items():
+            assert pytest.is_unicode_string(name)
+            assert pytest.is_unicode_string(value)
+
+    def test_read_properties_database(self, context, tmpdir):
+        try:
+            device = Device.from_sys_path(
+                context, '/sys/devices/virtual/mem/null')
+        except DeviceNotFoundAtPathError:
+            pytest.skip('device not found')
+        tmpdir.join('data', 'c1:3').write_binary(
+            b'S:spam\nS:disk/by-id/eggs\nL:0\nI:123456\nW:1\n'
+            b'E:ID_SPAM=eggs=ham\nE:DEVMODE=0600\nG:foo\nQ:bar\n',
+            ensure=True)
+        with mock.patch.object(type(context), 'run_path',
+                               new_callable=mock.PropertyMock) as run_path:
+            run_path.return_value = str(tmpdir)
+            properties = read_properties(context, [device.sys_path])
+        properties = properties[device.sys_path]
+        assert properties['DEVNAME'] == device['DEVNAME']
+        assert properties['DEVMODE'] == '0600'
+        assert properties['ID_SPAM'] == 'eggs=ham'
+        assert properties['USEC_INITIALIZED'] == '123456'
+        assert properties['DEVLINKS'] == '{0} {1}'.format(
+            os.path.join(context.device_path, 'spam'),
+            os.path.join(context.device_path, 'disk', 'by-id', 'eggs'))
+        assert properties['TAGS'] == ':foo:bar:'
+        assert properties['CURRENT_TAGS'] == ':bar:'
+
 
 class TestTags(object):
 
@@ -616,6 +904,21 @@ def test_iteration_mock(self, device):
             func = device._libudev.udev_device_get_tags_list_entry
             func.assert_called_once_with(device)
 
+    @with_devices
+    def test_cached_mock(self, device):
+        funcname = 'udev_device_get_tags_list_entry'
+        with pytest.libudev_list(device._libudev, funcname,
+                                 [b'spam', b'eggs']):
+            assert list(device.tags) == ['spam', 'eggs']
+            funcname = 'udev_device_has_tag'
+            with mock.patch.object(device._libudev, funcname) as has_tag:
+                assert 'eggs' in device.tags
+                assert 'foo' not in device.tags
+                assert list(device.tags) == ['spam', 'eggs']
+                assert not has_tag.called
+            func = device._libudev.udev_device_get_tags_list_entry
+            func.assert_called_once_with(device)
+
     @with_device_data
     def test_contains(self, device, device_data):
         if not device_data.tags:
@@ -22,7 +22,7 @@
 import pytest
 import mock
 
-from pyudev import Enumerator, Device
+from pyudev import Enumerator, Device, DeviceTree
 
 
 def pytest_funcarg__enumerator(request):
@@ -151,6 +151,78 @@ def test_match_is_initialized_mock(self, context):
             assert retval is enumerator
             func.assert_called_with(enumerator)
 
+    def test_sys_paths(self, context):
+        devices = context.list_devices().match_subsystem('input')
+        sys_paths = devices.sys_paths()
+        for sys_path in sys_paths:
+            assert pytest.is_unicode_string(sys_path)
+        assert sys_paths == [device.sys_path for device in devices]
+
+    def test_sys_paths_creates_no_devices(self, context):
+        enumerator = context.list_devices()
+        funcname = 'udev_device_new_from_syspath'
+        spec = lambda c, p: None
+        with mock.patch.object(enumerator._libudev, funcname,
+                               autospec=spec) as func:
+            assert enumerator.sys_paths()
+            assert not func.called
+
+    def test_invalid_engine(self, context):
+        with pytest.raises(ValueError) as excinfo:
+            Enumerator(context, engine='spam')
+        assert str(excinfo.value) == "Invalid engine: 'spam'"
+
+    SYSFS_MATCHES = [
+        {},
+        {'subsystem': 'net'},
+        {'subsystem': 'tty', 'sys_name': 'tty1*'},
+        {'sys_name': 'lo'},
+        {'DEVTYPE': 'partition'},
+        {'SUBSYSTEM': 'net'},
+    ]
+
+    @pytest.mark.parametrize('kwargs', SYSFS_MATCHES)
+    def test_sysfs_engine(self, context, kwargs):
+        libudev_devices = Enumerator(context).match(**kwargs).sys_paths()
+        devices = Enumerator(context, engine='sysfs').match(**kwargs)
+        sys_paths = devices.sys_paths()
+        assert sys_paths == sorted(sys_paths)
+        assert set(sys_paths) == set(libudev_devices)
+        assert [device.sys_path for device in devices] == sys_paths
+
+    def test_sysfs_engine_match_subsystem_nomatch(self, context):
+        devices = Enumerator(context, engine='sysfs').match_subsystem(
+            'net', nomatch=True)
+        expected = context.list_devices().match_subsystem(
+            'net', nomatch=True).sys_paths()
+        assert set(devices.sys_paths()) == set(expected)
+
+    def test_sysfs_engine_match_attribute(self, context):
+        devices = Enumerator(context, engine='sysfs').match_attribute(
+            'ro', False)
+        expected = context.list_devices().match_attribute(
+            'ro', False).sys_paths()
+        assert set(devices.sys_paths()) == set(expected)
+
+    @pytest.mark.udev_version('>= 172')
+    def test_sysfs_engine_match_parent(self, context):
+        parent = next(iter(context.list_devices(subsystem='pci')), None)
+        if parent is None:
+            pytest.skip('no PCI devices')
+        devices = Enumerator(context, engine='sysfs').match_parent(parent)
+        expected = context.list_devices().match_parent(parent).sys_paths()
+        assert set(devices.sys_paths()) == set(expected)
+
+    def test_sysfs_engine_creates_no_devices(self, context):
+        enumerator = Enumerator(context, engine='sysfs')
+        enumerator.match_subsystem('net').match_sys_name('*')
+        funcname = 'udev_device_new_from_syspath'
+        spec = lambda c, p: None
+        with mock.patch.object(enumerator._libudev, funcname,
+                               autospec=spec) as func:
+            enumerator.sys_paths()
+            assert not func.called
+
     def test_combined_matches_of_same_type(self, context):
         """
         Test for behaviour as observed in #1
@@ -214,6 +286,56 @@ def test_match_passthrough_property(self, enumerator):
             assert ('eggs', mock.sentinel.eggs) in posargs
 
 
+class TestDeviceTree(object):
+
+    def pytest_funcarg__tree(self, request):
+        return DeviceTree(request.getfuncargvalue('context'))
+
+    def pytest_funcarg__device(self, request):
+        context = request.getfuncargvalue('context')
+        return next(iter(context.list_devices(subsystem='pci')), None) or \
+            next(iter(context.list_devices()))
+
+    def test_contains(self, context, tree):
+        sys_paths = context.list_devices().sys_paths()
+        assert len(tree) >= len(sys_paths)
+        for sys_path in sys_paths:
+            assert sys_path in tree
+        assert '/sys/no/such/device' not in tree
+
+    def test_parent_of(self, context, tree):
+        for device in context.list_devices():
+            assert tree.parent_of(device) == device.parent
+
+    def test_children_of(self, tree, device):
+        for child in tree.children_of(device):
+            assert child.parent == device
+
+    def test_subtree(self, context, tree, device):
+        subtree = [d.sys_path for d in tree.subtree(device)]
+        assert subtree[0] == device.sys_path
+        assert len(subtree) == len(set(subtree))
+        expected = context.list_devices().match_parent(device).sys_paths()
+        assert sorted(subtree) == sorted(expected)
+
+    def test_descendants_of(self, tree, device):
+        descendants = list(tree.descendants_of(device))
+        assert device not in descendants
+        assert descendants == list(tree.subtree(device))[1:]
+
+    def test_lookup_missing(self, tree):
+        with pytest.raises(KeyError):
+            tree.children_of('/sys/no/such/device')
+
+    def test_refresh_enumerates_once(self, context, tree):
+        with mock.patch.object(Enumerator, 'sys_paths',
+                               autospec=True) as sys_paths:
+            sys_paths.return_value = []
+            tree.refresh()
+            assert sys_paths.call_count == 1
+        assert len(tree) == 0
+
+
 class TestContext(object):
 
     @pytest.mark.match
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import pytest
+import mock
+
+from pyudev import Hwdb, annotate_with_hwdb
+
+
+pytestmark = pytest.mark.udev_version('>= 196')
+
+
+def pytest_funcarg__hwdb(request):
+    """
+    Return a :class:`Hwdb`, whose underlying ``udev_hwdb`` object is mocked,
+    so that it is available even if the system has no hardware database.
+    """
+    context = request.getfuncargvalue('context')
+    functions = dict((f, mock.DEFAULT) for f in
+                     ['udev_hwdb_new', 'udev_hwdb_unref'])
+    patcher = mock.patch.multiple(context._libudev, **functions)
+    patcher.start()
+    hwdb = Hwdb(context, cache_size=2)
+
+    def release():
+        # do not pass the mocked object to the real udev_hwdb_unref()
+        hwdb._as_parameter_ = None
+        patcher.stop()
+    request.addfinalizer(release)
+    return hwdb
+
+
+PROPERTIES = [(b'ID_VENDOR_FROM_DATABASE', b'Linux Foundation'),
+              (b'ID_MODEL_FROM_DATABASE', b'2.0 root hub')]
+
+
+class TestHwdb(object):
+
+    def test_new(self, context):
+        try:
+            hwdb = Hwdb(context)
+        except EnvironmentError:
+            pytest.skip('hwdb not available')
+        assert hwdb.lookup('there is no such modalias') == {}
+
+    def test_new_error(self, context):
+        with mock.patch.object(context._libudev, 'udev_hwdb_new') as new:
+            new.return_value = None
+            with pytest.raises(EnvironmentError):
+                Hwdb(context)
+
+    def test_lookup(self, hwdb):
+        funcname = 'udev_hwdb_get_properties_list_entry'
+        with pytest.libudev_list(hwdb._libudev, funcname, PROPERTIES):
+            properties = hwdb.lookup('usb:v1D6Bp0002')
+            assert properties == {
+                'ID_VENDOR_FROM_DATABASE': 'Linux Foundation',
+                'ID_MODEL_FROM_DATABASE': '2.0 root hub'}
+            for name, value in properties.items():
+                assert pytest.is_unicode_string(name)
+                assert pytest.is_unicode_string(value)
+            func = getattr(hwdb._libudev, funcname)
+            func.assert_called_once_with(hwdb, b'usb:v1D6Bp0002', 0)
+
+    def test_lookup_cached(self, hwdb):
+        funcname = 'udev_hwdb_get_properties_list_entry'
+        with pytest.libudev_list(hwdb._libudev, funcname, PROPERTIES):
+            properties = hwdb.lookup('usb:v1D6Bp0002')
+            # results are copies
+            properties.clear()
+            assert hwdb.lookup(b'usb:v1D6Bp0002')
+            assert getattr(hwdb._libudev, funcname).call_count == 1
+            hwdb.clear_cache()
+            hwdb.lookup('usb:v1D6Bp0002')
+            assert getattr(hwdb._libudev, funcname).call_count == 2
+
+    def test_lookup_evicts_least_recently_used(self, hwdb):
+        funcname = 'udev_hwdb_get_properties_list_entry'
+        with pytest.libudev_list(hwdb._libudev, funcname, PROPERTIES):
+            func = getattr(hwdb._libudev, funcname)
+            hwdb.lookup('spam')
+            hwdb.lookup('eggs')
+            hwdb.lookup('spam')
+            hwdb.lookup('ham')
+            assert func.call_count == 3
+            # "eggs" was evicted, "spam" is still cached
+            hwdb.lookup('spam')
+            assert func.call_count == 3
+            hwdb.lookup('eggs')
+            assert func.call_count == 4
+
+    def test_lookup_without_cache(self, hwdb):
+        hwdb.cache_size = 0
+        funcname = 'udev_hwdb_get_properties_list_entry'
+        with pytest.libudev_list(hwdb._libudev, funcname, PROPERTIES):
+            hwdb.lookup('spam')
+            hwdb.lookup('spam')
+            assert getattr(hwdb._libudev, funcname).call_count == 2
+
+
+class TestAnnotateWithHwdb(object):
+
+    def test_annotate(self, context, hwdb):
+        devices = list(context.list_devices())
+        modaliases = set(d['MODALIAS'] for d in devices if 'MODALIAS' in d)
+        if not modaliases:
+            pytest.skip('no device with modalias')
+        funcname = 'udev_hwdb_get_properties_list_entry'
+        with pytest.libudev_list(hwdb._libudev, funcname, PROPERTIES):
+            hwdb.cache_size = 0
+            annotated = annotate_with_hwdb(devices, hwdb)
+            # each modalias is looked up exactly once
+            func = getattr(hwdb._libudev, funcname)
+            assert func.call_count == len(modaliases)
+        assert [device for device, _ in annotated] == devices
+        for device, properties in annotated:
+            if 'MODALIAS' in device:
+                assert properties['ID_MODEL_FROM_DATABASE'] == '2.0 root hub'
+            else:
+                assert properties == {}
+
+    def test_annotate_shares_properties(self, context, hwdb):
+        devices = [d for d in context.list_devices() if 'MODALIAS' in d]
+        if not devices:
+            pytest.skip('no device with modalias')
+        funcname = 'udev_hwdb_get_properties_list_entry'
+        with pytest.libudev_list(hwdb._libudev, funcname, PROPERTIES):
+            annotated = annotate_with_hwdb(devices * 2, hwdb)
+        first, second = annotated[0][1], annotated[len(devices)][1]
+        assert first is second
+
+    def test_annotate_empty(self):
+        assert annotate_with_hwdb([]) == []
+
@@ -19,10 +19,13 @@
 from __future__ import (print_function, division, unicode_literals,
                         absolute_import)
 
+import os
 import re
 import ctypes
+from ctypes.util import find_library
 
 import pytest
+import mock
 
 from pyudev import _libudev
 
@@ -158,3 +161,134 @@ def test_error_checker(function, libudev_function):
         assert function.errcheck == _libudev.ERROR_CHECKERS[name]
     else:
         pytest.skip('{0} has no error checker'.format(name))
+
+
+def test_load_udev_library_cached(libudev):
+    assert _libudev.load_udev_library() is libudev
+
+
+def test_load_udev_library_from_environment():
+    library_name = find_library('udev')
+    if not library_name:
+        pytest.skip('udev not available')
+    environ = {_libudev.LIBRARY_VARIABLE: library_name}
+    with mock.patch.object(_libudev, '_libudev', None):
+        with mock.patch.dict(os.environ, environ):
+            with mock.patch.object(_libudev, 'find_library') as find:
+                libudev = _libudev.load_udev_library()
+                assert libudev._name == library_name
+                assert not find.called
+
+
+def test_load_udev_library_from_environment_not_found():
+    environ = {_libudev.LIBRARY_VARIABLE: 'there_is_no_such_library.so'}
+    with mock.patch.object(_libudev, '_libudev', None):
+        with mock.patch.dict(os.environ, environ):
+            with pytest.raises(ImportError):
+                _libudev.load_udev_library()
+
+
+def test_load_udev_library_backend_ctypes():
+    environ = {_libudev.BACKEND_VARIABLE: 'ctypes'}
+    with mock.patch.object(_libudev, '_libudev', None):
+        with mock.patch.dict(os.environ, environ):
+            try:
+                libudev = _libudev.load_udev_library()
+            except ImportError:
+                pytest.skip('udev not available')
+            assert isinstance(libudev, ctypes.CDLL)
+
+
+def test_load_udev_library_backend_unknown():
+    environ = {_libudev.BACKEND_VARIABLE: 'there_is_no_such_backend'}
+    with mock.patch.object(_libudev, '_libudev', None):
+        with mock.patch.dict(os.environ, environ):
+            with pytest.raises(ImportError):
+                _libudev.load_udev_library()
+
+
+def test_list_entry_pairs(libudev):
+    udev = libudev.udev_new()
+    try:
+        enumerate = libudev.udev_enumerate_new(udev)
+        try:
+            libudev.udev_enumerate_scan_devices(enumerate)
+            entry = libudev.udev_enumerate_get_list_entry(enumerate)
+            pairs = libudev.list_entry_pairs(entry)
+            assert isinstance(pairs, tuple)
+            assert pairs
+            expected = []
+            while entry:
+                expected.append((libudev.udev_list_entry_get_name(entry),
+                                 libudev.udev_list_entry_get_value(entry)))
+                entry = libudev.udev_list_entry_get_next(entry)
+            assert pairs == tuple(expected)
+        finally:
+            libudev.udev_enumerate_unref(enumerate)
+    finally:
+        libudev.udev_unref(udev)
+
+
+def pytest_funcarg__cffi_libudev(request):
+    pytest.importorskip('cffi')
+    environ = {_libudev.BACKEND_VARIABLE: 'cffi'}
+    with mock.patch.object(_libudev, '_libudev', None):
+        with mock.patch.dict(os.environ, environ):
+            try:
+                return _libudev.load_udev_library()
+            except ImportError:
+                pytest.skip('udev not available')
+
+
+def test_cffi_backend(cffi_libudev):
+    from pyudev import Context, Device
+    with mock.patch.object(_libudev, '_libudev', cffi_libudev):
+        context = Context()
+    assert context._libudev is cffi_libudev
+    for sys_path in context.list_devices().sys_paths():
+        device = Device.from_sys_path(context, sys_path)
+        assert device.sys_path == sys_path
+        assert device.parent is None or device.parent.sys_path
+        assert device.properties_dict() == dict(
+            (name, device[name]) for name in device)
+        assert list(device.device_links) == [
+            name.decode('utf-8') for name, _ in cffi_libudev.list_entry_pairs(
+                cffi_libudev.udev_device_get_devlinks_list_entry(device))]
+
+
+def test_cffi_backend_error_checker(cffi_libudev):
+    device = mock.Mock(_as_parameter_=None)
+    with pytest.raises(ValueError):
+        cffi_libudev.udev_device_set_sysattr_value(device, b'spam', b'eggs')
+
+
+def test_cffi_backend_function_without_signature(libudev, cffi_libudev):
+    for funcname, _ in _libudev.FUNCTION_VERSIONS:
+        assert hasattr(cffi_libudev, funcname) == hasattr(libudev, funcname)
+
+
+def test_cffi_wrap_function():
+    _cffi = pytest.importorskip('pyudev._cffi')
+    ffi = mock.Mock(NULL=object(), string=lambda result: result + b'!')
+    function = mock.Mock(return_value=b'spam')
+    argtypes = [ctypes.POINTER(_libudev.udev_device), ctypes.c_char_p,
+                ctypes.c_int]
+    wrapper = _cffi._wrap_function(ffi, 'udev_spam', function, argtypes,
+                                   ctypes.c_char_p, None)
+    assert wrapper.__name__ == 'udev_spam'
+    device = mock.Mock(_as_parameter_=mock.sentinel.device)
+    assert wrapper(device, b'eggs', 42) == b'spam!'
+    function.assert_called_with(mock.sentinel.device, b'eggs', 42)
+    assert wrapper(None, None, 42) == b'spam!'
+    function.assert_called_with(ffi.NULL, ffi.NULL, 42)
+    function.return_value = None
+    assert wrapper(mock.sentinel.device, b'eggs', 42) is None
+    function.assert_called_with(mock.sentinel.device, b'eggs', 42)
+
+
+def test_cffi_wrap_function_without_conversion():
+    _cffi = pytest.importorskip('pyudev._cffi')
+    function = mock.Mock()
+    assert _cffi._wrap_function(mock.Mock(), 'udev_spam', function,
+                                [ctypes.c_int], ctypes.c_int,
+                                None) is function
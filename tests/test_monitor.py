@@ -19,7 +19,13 @@
 from __future__ import (print_function, division, unicode_literals,
                         absolute_import)
 
+import os
+import re
 import errno
+import socket
+import struct
+import time
+import threading
 from datetime import datetime, timedelta
 from contextlib import contextmanager
 from select import select
@@ -27,10 +33,20 @@
 import pytest
 import mock
 
+import pyudev.monitor
+
 from pyudev import Device
 from pyudev import DeviceNotFoundAtPathError
+from pyudev import DeviceSnapshot
+from pyudev import Enumerator
+from pyudev import EventCoalescer
+from pyudev import EventDispatcher
 from pyudev import Monitor
+from pyudev import MonitorFilter
 from pyudev import MonitorObserver
+from pyudev import _bpf
+
+from plugins.fake_monitor import FakeMonitor
 
 # many tests just consist of some monkey patching to test, that the Monitor
 # class actually calls out to udev, correctly passing arguments and handling
@@ -62,6 +78,51 @@ def patch_filter_by(type):
             yield add_match, filter_update
 
 
+def udev_message(subsystem, device_type=None, tags=()):
+    properties = (b'ACTION=add\x00DEVPATH=/devices/virtual/mem/null\x00'
+                  b'SEQNUM=1\x00SUBSYSTEM=' + subsystem + b'\x00')
+    bloom = 0
+    for tag in tags:
+        bloom |= _bpf.string_bloom64(tag)
+    header = struct.pack(
+        str('!8sIIIIIIII'), b'libudev\x00', 0xfeedcafe, 40, 40,
+        len(properties), _bpf.string_hash32(subsystem),
+        _bpf.string_hash32(device_type) if device_type else 0,
+        bloom >> 32, bloom & 0xffffffff)
+    # libudev sends the header sizes in host byte order
+    header = header[:12] + struct.pack(str('=III'), 40, 40,
+                                       len(properties)) + header[24:]
+    return header + properties
+
+
+def run_filter(instructions, message):
+    """
+    Run a classic BPF program on ``message`` like the kernel does.
+    """
+    accumulator = 0
+    index = 0
+    while True:
+        code, jt, jf, k = instructions[index]
+        index += 1
+        if code & 0x07 == _bpf.BPF_RET:
+            return k
+        elif code & 0x07 == _bpf.BPF_LD:
+            size = {_bpf.BPF_W: 4, _bpf.BPF_H: 2, _bpf.BPF_B: 1}[code & 0x18]
+            if k + size > len(message):
+                return _bpf.REJECT
+            accumulator = int(struct.unpack(
+                str('!' + {4: 'I', 2: 'H', 1: 'B'}[size]),
+                message[k:k + size])[0])
+        elif code == _bpf.BPF_ALU | _bpf.BPF_AND | _bpf.BPF_K:
+            accumulator &= k
+        elif code == _bpf.BPF_JMP | _bpf.BPF_JA:
+            index += k
+        elif code == _bpf.BPF_JMP | _bpf.BPF_JEQ | _bpf.BPF_K:
+            index += jt if accumulator == k else jf
+        else:
+            raise ValueError(code)
+
+
 class TestMonitor(object):
 
     def test_from_netlink_invalid_source(self, context):
@@ -197,6 +258,413 @@ def test_remove_filter_mock(self, monitor):
                 remove.assert_called_once_with(monitor)
                 update.assert_called_once_with(monitor)
 
+    @contextmanager
+    def patch_receive(self, monitor, events):
+        """
+        Let ``monitor`` receive raw ``events``, each a dictionary of
+        properties, followed by ``EAGAIN``.
+        """
+        events = list(events)
+
+        def receive_device(_):
+            if not events:
+                raise EnvironmentError(errno.EAGAIN, 'Try again')
+            event = events.pop(0)
+            if isinstance(event, Exception):
+                raise event
+            return event
+
+        def get_property_value(event, name):
+            value = event.get(name.decode('ascii'))
+            return value.encode('ascii') if value is not None else None
+
+        libudev = mock.Mock(name='libudev')
+        libudev.udev_monitor_receive_device.side_effect = receive_device
+        libudev.udev_device_get_property_value.side_effect = get_property_value
+        libudev.udev_device_get_action.side_effect = \
+            lambda e: get_property_value(e, b'ACTION')
+        libudev.udev_device_get_sysname.side_effect = \
+            lambda e: get_property_value(e, b'SYSNAME')
+        libudev.udev_device_get_seqnum.side_effect = \
+            lambda e: int(e.get('SEQNUM', 0))
+        with mock.patch.object(monitor, '_libudev', libudev):
+            with mock.patch('pyudev.monitor.Device') as device:
+                device.side_effect = lambda context, event: event
+                yield libudev
+
+    def receive_all(self, monitor):
+        devices = []
+        while True:
+            device = monitor._receive_device()
+            if device is None:
+                return devices
+            devices.append(device)
+
+    EVENTS = [
+        {'ACTION': 'add', 'SYSNAME': 'sda', 'DEVTYPE': 'disk'},
+        {'ACTION': 'change', 'SYSNAME': 'sda1', 'DEVTYPE': 'partition'},
+        {'ACTION': 'remove', 'SYSNAME': 'eth0'},
+    ]
+
+    @pytest.mark.parametrize('filters,expected', [
+        ([], [0, 1, 2]),
+        ([('action', 'add')], [0]),
+        ([('action', 'add'), ('action', b'remove')], [0, 2]),
+        ([('sys_name', 'sd*')], [0, 1]),
+        ([('sys_name', 'sd?'), ('sys_name', 'eth*')], [0, 2]),
+        ([('property', ('DEVTYPE', 'disk'))], [0]),
+        ([('property', ('DEVTYPE', re.compile('dis|part')))], [0, 1]),
+        ([('property', ('DEVTYPE', re.compile('isk')))], []),
+        ([('property', (b'DEVTYPE', 'disk')),
+          ('property', ('DEVTYPE', 'partition'))], [0, 1]),
+        ([('property', ('DEVTYPE', 'disk')),
+          ('property', ('SYSNAME', 'sda1'))], []),
+        ([('action', 'change'), ('sys_name', 'sd*')], [1]),
+        ([('action', 'change'), ('sys_name', 'eth*')], []),
+    ])
+    def test_filter_userspace_mock(self, monitor, filters, expected):
+        for kind, argument in filters:
+            method = getattr(monitor, 'filter_by_' + kind)
+            if kind == 'property':
+                method(*argument)
+            else:
+                method(argument)
+        with self.patch_receive(monitor, self.EVENTS) as libudev:
+            devices = self.receive_all(monitor)
+            assert devices == [self.EVENTS[i] for i in expected]
+            rejected = [e for e in self.EVENTS if e not in devices]
+            assert libudev.udev_device_unref.call_args_list == [
+                mock.call(e) for e in rejected]
+
+    def test_remove_filter_userspace_mock(self, monitor):
+        monitor.filter_by_action('add')
+        monitor.filter_by_sys_name('sd*')
+        monitor.filter_by_property('DEVTYPE', 'disk')
+        with self.patch_receive(monitor, self.EVENTS) as libudev:
+            monitor.remove_filter()
+            libudev.udev_monitor_filter_remove.assert_called_once_with(monitor)
+            assert self.receive_all(monitor) == self.EVENTS
+
+    def sequence(self, *sequence_numbers):
+        return [{'ACTION': 'change', 'SEQNUM': str(n)}
+                for n in sequence_numbers]
+
+    def test_statistics_gap(self, monitor):
+        monitor._source = 'kernel'
+        callback = mock.Mock()
+        monitor.set_loss_callback(callback)
+        monitor.filter_by_action('add')
+        with self.patch_receive(monitor, self.sequence(1, 2, 5, 6, 10)):
+            assert self.receive_all(monitor) == []
+        assert monitor.statistics[:4] == (5, 5, 2, 0)
+        assert monitor.statistics.dropped == 5
+        assert callback.call_args_list == [mock.call('gap', 2),
+                                           mock.call('gap', 3)]
+
+    def test_statistics_reordered(self, monitor):
+        monitor.REORDER_WINDOW = 3
+        with self.patch_receive(monitor, self.sequence(1, 3, 2, 5, 6, 4, 8)):
+            self.receive_all(monitor)
+        assert monitor.statistics[:4] == (7, 0, 0, 0)
+        # 7 is beyond the window now, but 9 to 11 are not
+        with self.patch_receive(monitor, self.sequence(12, 11, 10)):
+            self.receive_all(monitor)
+        assert monitor.statistics[:4] == (10, 1, 1, 0)
+        # 9 and 13 to 16 are lost
+        with self.patch_receive(monitor, self.sequence(20)):
+            self.receive_all(monitor)
+        assert monitor.statistics[:4] == (11, 6, 2, 0)
+
+    def test_statistics_kernel_filter(self, monitor):
+        funcname = 'udev_monitor_filter_add_match_tag'
+        with mock.patch.object(monitor._libudev, funcname):
+            funcname = 'udev_monitor_filter_update'
+            with mock.patch.object(monitor._libudev, funcname):
+                monitor.filter_by_tag('spam')
+        with self.patch_receive(monitor, self.sequence(1, 2000)):
+            self.receive_all(monitor)
+            assert monitor.statistics[:4] == (2, 0, 0, 0)
+            monitor.remove_filter()
+        with mock.patch.object(_bpf, 'attach_filter'):
+            MonitorFilter().attach(monitor)
+        with self.patch_receive(monitor, self.sequence(3000)):
+            self.receive_all(monitor)
+            assert monitor.statistics[:4] == (3, 0, 0, 0)
+
+    def test_statistics_overflow(self, monitor):
+        callback = mock.Mock()
+        monitor.set_loss_callback(callback)
+        events = [EnvironmentError(errno.ENOBUFS, 'No buffer space')]
+        events.extend(self.sequence(1))
+        with self.patch_receive(monitor, events):
+            assert self.receive_all(monitor) == events[1:]
+        assert monitor.statistics[:4] == (1, 0, 0, 1)
+        callback.assert_called_once_with('overflow', None)
+        monitor.set_loss_callback(None)
+        with self.patch_receive(monitor, events[:1]):
+            assert self.receive_all(monitor) == []
+        assert monitor.statistics.overflows == 2
+
+    def test_statistics_overflow_real(self, monitor):
+        monitor.start()
+        sender = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, 15)
+        try:
+            try:
+                monitor.set_receive_buffer_size(1)
+                for _ in range(100):
+                    sender.sendto(udev_message(b'mem'), (0, 2))
+            except EnvironmentError:
+                pytest.skip('not allowed to overflow the monitor')
+            assert monitor.poll_many(timeout=1)
+            assert monitor.statistics.overflows == 1
+        finally:
+            sender.close()
+
+    def test_adaptive_receive_buffer(self, monitor):
+        assert monitor.statistics.receive_buffer_size is None
+        monitor.set_receive_buffer_size(4096)
+        monitor.enable_adaptive_receive_buffer(max_size=32768)
+        size = monitor.statistics.receive_buffer_size
+        assert size == monitor._get_socket().getsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF)
+        monitor._grow_receive_buffer()
+        assert monitor.statistics.receive_buffer_size > size
+        for _ in range(5):
+            monitor._grow_receive_buffer()
+        assert monitor.statistics.receive_buffer_size == 32768
+        monitor.disable_adaptive_receive_buffer()
+        assert monitor.statistics.receive_buffer_size is None
+
+    def test_adaptive_receive_buffer_unprivileged(self, monitor):
+        monitor.enable_adaptive_receive_buffer()
+        sock = mock.Mock()
+        sock.getsockopt.return_value = 4096
+        sock.setsockopt.side_effect = [
+            EnvironmentError(errno.EPERM, 'Operation not permitted'), None]
+        with mock.patch.object(monitor, '_get_socket', return_value=sock):
+            monitor._grow_receive_buffer()
+        assert sock.setsockopt.call_args_list == [
+            mock.call(socket.SOL_SOCKET, pyudev.monitor.SO_RCVBUFFORCE, 4096),
+            mock.call(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)]
+
+    def test_adaptive_receive_buffer_unprivileged_limit(self, monitor,
+                                                        tmpdir):
+        rmem_max = tmpdir.join('rmem_max')
+        rmem_max.write('2048\n')
+        monitor.enable_adaptive_receive_buffer()
+        sock = mock.Mock()
+        sock.getsockopt.return_value = 8192
+        sock.setsockopt.side_effect = EnvironmentError(
+            errno.EPERM, 'Operation not permitted')
+        with mock.patch.object(pyudev.monitor, '_RMEM_MAX', str(rmem_max)):
+            with mock.patch.object(monitor, '_get_socket', return_value=sock):
+                monitor._grow_receive_buffer()
+                # SO_RCVBUF would shrink the buffer to 4096 bytes
+                assert sock.setsockopt.call_count == 1
+                monitor._grow_receive_buffer()
+                assert sock.setsockopt.call_count == 1
+        assert monitor.statistics.receive_buffer_size == 8192
+
+    def test_adaptive_receive_buffer_unprivileged_shrunk(self, monitor):
+        monitor.enable_adaptive_receive_buffer()
+        sock = mock.Mock()
+        sock.getsockopt.side_effect = [8192, 4096, 8192]
+        sock.setsockopt.side_effect = [
+            EnvironmentError(errno.EPERM, 'Operation not permitted'),
+            None, None]
+        with mock.patch.object(pyudev.monitor, '_RMEM_MAX', '/nonexisting'):
+            with mock.patch.object(monitor, '_get_socket', return_value=sock):
+                monitor._grow_receive_buffer()
+                monitor._grow_receive_buffer()
+        assert sock.setsockopt.call_args_list == [
+            mock.call(socket.SOL_SOCKET, pyudev.monitor.SO_RCVBUFFORCE, 8192),
+            mock.call(socket.SOL_SOCKET, socket.SO_RCVBUF, 8192),
+            mock.call(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)]
+        assert monitor.statistics.receive_buffer_size == 8192
+
+    @pytest.mark.parametrize('allocated,grows,length', [
+        (1024, False, 9), (3072, True, 9), (3072, True, 8), (3072, False, 1)])
+    def test_adaptive_receive_buffer_fill(self, monitor, allocated, grows,
+                                          length):
+        monitor._adapt_receive_buffer()
+        monitor.enable_adaptive_receive_buffer()
+        # older kernels return a shorter array
+        meminfo = struct.pack(str('=9I'), allocated, 4096,
+                              *([0] * 7))[:length * 4]
+        sock = mock.Mock()
+        sock.getsockopt.return_value = meminfo
+        with mock.patch.object(monitor, '_get_socket', return_value=sock):
+            with mock.patch.object(monitor, '_grow_receive_buffer') as grow:
+                monitor._adapt_receive_buffer()
+                assert grow.called == grows
+                sock.getsockopt.side_effect = EnvironmentError(
+                    errno.ENOPROTOOPT, 'Protocol not available')
+                monitor._adapt_receive_buffer()
+                assert grow.call_count == int(grows)
+
+    def test_adaptive_receive_buffer_overflow(self, monitor):
+        monitor.enable_adaptive_receive_buffer()
+        events = [EnvironmentError(errno.ENOBUFS, 'No buffer space')]
+        with mock.patch.object(monitor, '_grow_receive_buffer') as grow:
+            with self.patch_receive(monitor, events):
+                assert self.receive_all(monitor) == []
+        grow.assert_called_once_with()
+
+    def snapshot(self, sys_name, tags=(), **properties):
+        sys_path = '/sys/devices/virtual/spam/' + sys_name
+        properties['DEVPATH'] = sys_path[4:]
+        return DeviceSnapshot(properties, dict(
+            sys_path=sys_path, device_path=sys_path[4:], sys_name=sys_name,
+            sequence_number=42, tags=tags))
+
+    def test_resync_disabled(self, monitor):
+        assert not monitor.resync_enabled
+        with pytest.raises(ValueError):
+            monitor.resync()
+        monitor._report_loss('overflow', None)
+        assert not monitor._resync_needed
+
+    def test_resync_mock(self, monitor):
+        a = self.snapshot('a')
+        b = self.snapshot('b', SPAM='eggs')
+        changed_b = self.snapshot('b', SPAM='ham')
+        c = self.snapshot('c')
+        states = [{a.sys_path: a, b.sys_path: b},
+                  {b.sys_path: changed_b, c.sys_path: c}]
+        with mock.patch.object(monitor, '_scan_devices') as scan_devices:
+            scan_devices.side_effect = states
+            monitor.enable_resync()
+            assert monitor.resync_enabled
+            monitor.resync()
+        events = [monitor.poll(timeout=0) for _ in range(3)]
+        assert [(e.action, e.sys_name) for e in events] == [
+            ('remove', 'a'), ('change', 'b'), ('add', 'c')]
+        for event in events:
+            assert event['ACTION'] == event.action
+            assert event.sequence_number is None
+        assert events[1]['SPAM'] == 'ham'
+        assert monitor.poll(timeout=0) is None
+        assert monitor._known_devices == states[1]
+
+    def test_resync_tags(self, monitor):
+        old = self.snapshot('a', SEQNUM='1', ACTION='add')
+        new = self.snapshot('a', tags=['seat'])
+        with mock.patch.object(monitor, '_scan_devices') as scan_devices:
+            scan_devices.side_effect = [{old.sys_path: old}] * 2
+            monitor.enable_resync()
+            monitor.resync()
+            assert monitor.poll(timeout=0) is None
+            # the kernel knows nothing about tags and the udev database
+            monitor._source = 'kernel'
+            scan_devices.side_effect = [{new.sys_path: new}]
+            monitor.resync()
+            assert monitor.poll(timeout=0) is None
+            monitor._source = 'udev'
+            scan_devices.side_effect = [{old.sys_path: old}]
+            monitor.resync()
+            assert monitor.poll(timeout=0).action == 'change'
+
+    def test_resync_filters(self, monitor):
+        monitor.filter_by_action('add')
+        monitor.filter_by_sys_name('b*')
+        states = [{}, dict((s.sys_path, s) for s in
+                           [self.snapshot('a'), self.snapshot('ba')])]
+        with mock.patch.object(monitor, '_scan_devices') as scan_devices:
+            scan_devices.side_effect = states
+            monitor.enable_resync()
+            monitor.resync()
+        device = monitor.poll(timeout=0)
+        assert (device.action, device.sys_name) == ('add', 'ba')
+        assert monitor.poll(timeout=0) is None
+
+    def test_resync_after_loss(self, monitor):
+        a = self.snapshot('a')
+        with mock.patch.object(monitor, '_scan_devices') as scan_devices:
+            scan_devices.side_effect = [{}, {a.sys_path: a}]
+            monitor.enable_resync()
+            monitor._report_loss('overflow', None)
+            assert monitor._resync_needed
+            assert monitor.poll(timeout=0) == a
+            assert not monitor._resync_needed
+            monitor.disable_resync()
+            assert not monitor.resync_enabled
+
+    def test_update_known_device(self, monitor):
+        a = self.snapshot('a')
+        with mock.patch.object(monitor, '_scan_devices') as scan_devices:
+            scan_devices.return_value = {a.sys_path: a}
+            monitor.enable_resync()
+        moved = mock.MagicMock(action='move', sys_path='/sys/devices/b')
+        moved.__contains__.return_value = True
+        moved.__getitem__.return_value = a.device_path
+        monitor._update_known_device(moved)
+        assert monitor._known_devices == {
+            '/sys/devices/b': moved.snapshot.return_value}
+        removed = mock.Mock(action='remove', sys_path='/sys/devices/b')
+        monitor._update_known_device(removed)
+        assert monitor._known_devices == {}
+
+    def test_scan_devices(self, context, monitor):
+        funcname = 'udev_monitor_filter_add_match_subsystem_devtype'
+        with mock.patch.object(monitor._libudev, funcname):
+            funcname = 'udev_monitor_filter_update'
+            with mock.patch.object(monitor._libudev, funcname):
+                monitor.filter_by('mem')
+                monitor.filter_by('spam', 'eggs')
+        devices = monitor._scan_devices()
+        expected = context.list_devices(subsystem='mem')
+        assert sorted(devices) == sorted(d.sys_path for d in expected)
+        for snapshot in devices.values():
+            assert isinstance(snapshot, DeviceSnapshot)
+
+    def test_scan_devices_vanished(self, context, monitor):
+        null = Device.from_path(context, '/devices/virtual/mem/null')
+        gone = os.path.join(context.sys_path, 'devices/virtual/mem/gone')
+        with mock.patch.object(Enumerator, 'sys_paths') as sys_paths:
+            sys_paths.return_value = [null.sys_path, gone]
+            assert list(monitor._scan_devices()) == [null.sys_path]
+            monitor.enable_resync()
+            # the vanished device neither breaks resync, nor is it reported
+            monitor.resync()
+            assert list(monitor._known_devices) == [null.sys_path]
+
+    def test_resync_ignores_renames(self):
+        old = self.snapshot('a', SPAM='eggs')
+        renamed = self.snapshot('a', SPAM='eggs',
+                                DEVPATH_OLD='/devices/virtual/spam/b')
+        assert not pyudev.monitor._snapshot_differs(old, renamed)
+        assert not pyudev.monitor._snapshot_differs(renamed, old)
+
+    def test_poll_waits_after_filtered_event(self, monitor):
+        device = mock.sentinel.device
+        with mock.patch.object(monitor, '_receive_device') as receive:
+            with mock.patch.object(monitor, '_get_poller') as get_poller:
+                get_poller.return_value.poll.return_value = [
+                    (monitor.fileno(), 'r')]
+                receive.side_effect = [None, None, device]
+                assert monitor.poll(timeout=1) is device
+                assert receive.call_count == 3
+                receive.side_effect = [None]
+                assert monitor.poll(timeout=0) is None
+                get_poller.return_value.poll.assert_called_with(0)
+
+    def test_filter_by_action(self, monitor):
+        monitor.filter_by_action('change')
+        monitor.start()
+        sender = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, 15)
+        try:
+            try:
+                sender.sendto(udev_message(b'mem'), (0, 2))
+            except EnvironmentError:
+                pytest.skip('not allowed to send device events')
+            assert monitor.poll(timeout=0.1) is None
+            monitor.filter_by_action('add')
+            sender.sendto(udev_message(b'mem'), (0, 2))
+            device = monitor.poll(timeout=1)
+            assert device.action == 'add'
+        finally:
+            sender.close()
+
     def test_start_netlink_kernel_source(self, context):
         monitor = Monitor.from_netlink(context, source='kernel')
         assert not monitor.started
@@ -277,6 +745,74 @@ def test_receive_device(self, monitor):
             assert event[0] == 'spam'
             assert event[1] is device
 
+    def test_poll_reuses_poller(self, monitor):
+        assert monitor.poll(timeout=0) is None
+        poller = monitor._poller
+        assert poller is not None
+        assert monitor.poll(timeout=0) is None
+        assert monitor._poller is poller
+
+    def test_poll_wakeup_fd(self, monitor):
+        source, sink = os.pipe()
+        try:
+            monitor.add_wakeup_fd(source)
+            # the pipe must wake up a poll without timeout
+            os.write(sink, b'\x01')
+            assert monitor.poll() is None
+            os.read(source, 1)
+            monitor.remove_wakeup_fd(source)
+            os.write(sink, b'\x01')
+            assert monitor.poll(timeout=0) is None
+            assert source not in monitor._wakeup_fds
+        finally:
+            os.close(source)
+            os.close(sink)
+
+    def test_add_wakeup_fd_before_poll(self, monitor):
+        source, sink = os.pipe()
+        try:
+            monitor.add_wakeup_fd(source)
+            monitor.add_wakeup_fd(source)
+            assert monitor._poller is None
+            os.write(sink, b'\x01')
+            assert monitor.poll() is None
+        finally:
+            monitor.remove_wakeup_fd(source)
+            os.close(source)
+            os.close(sink)
+
+    def test_poll_many_timeout(self, monitor):
+        assert monitor.poll_many(timeout=0) == []
+
+    def test_poll_many_mock(self, monitor):
+        devices = [mock.sentinel.device1, mock.sentinel.device2]
+        with mock.patch.object(monitor, 'poll') as poll:
+            with mock.patch.object(monitor, '_receive_device') as receive:
+                poll.return_value = mock.sentinel.device0
+                receive.side_effect = devices + [None]
+                assert monitor.poll_many(timeout=mock.sentinel.timeout) == [
+                    mock.sentinel.device0] + devices
+                poll.assert_called_once_with(mock.sentinel.timeout)
+                assert receive.call_count == 3
+
+    def test_poll_many_max_count(self, monitor):
+        with mock.patch.object(monitor, 'poll') as poll:
+            with mock.patch.object(monitor, '_receive_device') as receive:
+                poll.return_value = mock.sentinel.device
+                receive.return_value = mock.sentinel.device
+                devices = monitor.poll_many(max_count=3)
+                assert devices == [mock.sentinel.device] * 3
+                assert receive.call_count == 2
+
+    def test_poll_many_max_latency(self, monitor):
+        with mock.patch.object(monitor, 'poll') as poll:
+            with mock.patch.object(monitor, '_receive_device') as receive:
+                poll.return_value = mock.sentinel.device
+                receive.return_value = mock.sentinel.device
+                devices = monitor.poll_many(max_latency=0)
+                assert devices == [mock.sentinel.device]
+                assert not receive.called
+
     @pytest.mark.privileged
     @pytest.mark.not_on_travis
     def test_iter(self, monitor):
@@ -302,6 +838,326 @@ def test_iter(self, monitor):
         iterator.close()
 
 
+class TestMonitorFilter(object):
+
+    def test_match_returns_filter(self):
+        monitor_filter = MonitorFilter()
+        assert monitor_filter.match_action('add') is monitor_filter
+        assert monitor_filter.match_subsystem('block') is monitor_filter
+        assert monitor_filter.match_tag('systemd') is monitor_filter
+
+    def test_string_hash32(self):
+        assert _bpf.string_hash32(b'') == 0
+        assert _bpf.string_hash32('block') == _bpf.string_hash32(b'block')
+        assert _bpf.string_hash32(b'block') != _bpf.string_hash32(b'blocks')
+        assert bin(_bpf.string_bloom64('seat')).count('1') <= 4
+
+    def test_no_matches(self):
+        instructions = MonitorFilter().compile()
+        for message in (udev_message(b'block'), b'add@/devices/spam\x00'):
+            assert run_filter(instructions, message) == _bpf.ACCEPT
+
+    @pytest.mark.parametrize('subsystem,device_type,accepted', [
+        (b'block', b'disk', True),
+        (b'block', b'partition', False),
+        (b'mem', None, True),
+        (b'net', None, False),
+    ])
+    def test_match_subsystem(self, subsystem, device_type, accepted):
+        monitor_filter = MonitorFilter()
+        monitor_filter.match_subsystem('block', 'disk').match_subsystem('mem')
+        result = run_filter(monitor_filter.compile(),
+                            udev_message(subsystem, device_type))
+        assert result == (_bpf.ACCEPT if accepted else _bpf.REJECT)
+
+    @pytest.mark.parametrize('tags,accepted', [
+        ((b'seat', b'uaccess'), True),
+        ((b'systemd',), True),
+        ((b'uaccess',), False),
+        ((), False),
+    ])
+    def test_match_tag(self, tags, accepted):
+        monitor_filter = MonitorFilter().match_tag('seat').match_tag('systemd')
+        result = run_filter(monitor_filter.compile(),
+                            udev_message(b'block', tags=tags))
+        assert result == (_bpf.ACCEPT if accepted else _bpf.REJECT)
+
+    def test_match_tag_and_subsystem(self):
+        monitor_filter = MonitorFilter().match_tag('seat')
+        monitor_filter.match_subsystem('block')
+        instructions = monitor_filter.compile()
+        assert run_filter(instructions, udev_message(
+            b'block', tags=[b'seat'])) == _bpf.ACCEPT
+        assert run_filter(instructions, udev_message(
+            b'net', tags=[b'seat'])) == _bpf.REJECT
+        assert run_filter(instructions, udev_message(
+            b'block')) == _bpf.REJECT
+
+    @pytest.mark.parametrize('message,accepted', [
+        (b'add@/devices/spam\x00', True),
+        (b'remove@/devices/spam\x00', True),
+        (b'change@/devices/spam\x00', False),
+        (b'addition@/devices/spam\x00', False),
+        (b'ad', False),
+    ])
+    def test_match_action(self, message, accepted):
+        monitor_filter = MonitorFilter().match_action('add')
+        monitor_filter.match_action('remove').match_subsystem('block')
+        result = run_filter(monitor_filter.compile(), message)
+        assert result == (_bpf.ACCEPT if accepted else _bpf.REJECT)
+        # actions do not apply to events from udev
+        assert run_filter(monitor_filter.compile(),
+                          udev_message(b'block')) == _bpf.ACCEPT
+
+    def test_unknown_magic(self):
+        message = udev_message(b'net')
+        message = message[:8] + b'spam' + message[12:]
+        instructions = MonitorFilter().match_subsystem('block').compile()
+        assert run_filter(instructions, message) == _bpf.ACCEPT
+
+    def test_too_many_matches(self):
+        monitor_filter = MonitorFilter()
+        for index in range(200):
+            monitor_filter.match_subsystem('spam{0}'.format(index))
+        with pytest.raises(ValueError):
+            monitor_filter.compile()
+
+    def test_attach_mock(self, monitor):
+        monitor_filter = MonitorFilter().match_subsystem('block')
+        with mock.patch.object(_bpf, 'attach_filter') as attach_filter:
+            monitor_filter.attach(monitor)
+            attach_filter.assert_called_with(monitor.fileno(),
+                                             monitor_filter.compile())
+
+    def test_attach(self, monitor):
+        # the hashes must match those of libudev, so let libudev filter
+        # a message built with our hashes first
+        monitor.filter_by('mem')
+        monitor.start()
+        sender = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, 15)
+        try:
+            try:
+                sender.sendto(udev_message(b'mem'), (0, 2))
+            except EnvironmentError:
+                pytest.skip('not allowed to send device events')
+            assert monitor.poll(timeout=1) is not None
+            MonitorFilter().match_subsystem('net').attach(monitor)
+            sender.sendto(udev_message(b'mem'), (0, 2))
+            assert monitor.poll(timeout=0.1) is None
+            MonitorFilter.detach(monitor)
+            sender.sendto(udev_message(b'mem'), (0, 2))
+            assert monitor.poll(timeout=1) is not None
+        finally:
+            sender.close()
+
+
+def fake_event(action, sys_path='/sys/devices/spam'):
+    return mock.Mock(name=action, action=action, sys_path=sys_path)
+
+
+class TestEventCoalescer(object):
+
+    def coalesce(self, *actions):
+        coalescer = EventCoalescer(1)
+        events = [fake_event(action) for action in actions]
+        for event in events:
+            coalescer.add(event, now=0)
+        assert coalescer.pop_ready(now=0.5) == []
+        return events, coalescer.pop_ready(now=1)
+
+    def test_change(self):
+        events, ready = self.coalesce('change', 'change', 'change')
+        assert ready == events[-1:]
+
+    def test_add_change(self):
+        events, ready = self.coalesce('add', 'change', 'change')
+        assert ready == [events[0], events[2]]
+
+    def test_add_remove(self):
+        events, ready = self.coalesce('add', 'change', 'remove')
+        assert ready == []
+
+    def test_remove_add(self):
+        events, ready = self.coalesce('remove', 'add')
+        assert ready == events
+
+    def test_remove_add_remove(self):
+        events, ready = self.coalesce('remove', 'add', 'change', 'remove')
+        assert ready == events[:1]
+
+    def test_change_remove(self):
+        events, ready = self.coalesce('change', 'move', 'change', 'remove')
+        assert ready == [events[1], events[3]]
+
+    def test_window(self):
+        coalescer = EventCoalescer(1)
+        assert coalescer.timeout() is None
+        first = fake_event('change', '/sys/devices/spam')
+        second = fake_event('change', '/sys/devices/eggs')
+        coalescer.add(first, now=0)
+        coalescer.add(second, now=0.5)
+        assert len(coalescer) == 2
+        assert coalescer.timeout(now=0.25) == 0.75
+        assert coalescer.pop_ready(now=1) == [first]
+        assert coalescer.timeout(now=1) == 0.5
+        # the window starts with the first event of a device
+        third = fake_event('change', '/sys/devices/spam')
+        coalescer.add(third, now=1)
+        assert coalescer.pop_ready(now=1.5) == [second]
+        assert coalescer.timeout(now=3) == 0
+        assert coalescer.flush() == [third]
+        assert len(coalescer) == 0
+
+    def test_order_after_cancel(self):
+        coalescer = EventCoalescer(1)
+        add = fake_event('add', '/sys/devices/spam')
+        other = fake_event('change', '/sys/devices/eggs')
+        coalescer.add(add, now=0)
+        coalescer.add(other, now=0.25)
+        coalescer.add(fake_event('remove', '/sys/devices/spam'), now=0.5)
+        assert len(coalescer) == 1
+        assert coalescer.timeout(now=0.5) == 0.75
+        # the device is pending again, but after the other device now
+        readd = fake_event('add', '/sys/devices/spam')
+        coalescer.add(readd, now=0.75)
+        assert coalescer.pop_ready(now=1.5) == [other]
+        assert coalescer.flush() == [readd]
+
+
+class TestEventDispatcher(object):
+
+    def setup(self):
+        self.events = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def callback(self, device):
+        self.events.append(device)
+
+    def blocking_callback(self, device):
+        self.started.set()
+        self.release.wait(5)
+        self.events.append(device)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            EventDispatcher(shards=0)
+        with pytest.raises(ValueError):
+            EventDispatcher(overflow='spam')
+
+    def test_not_running(self):
+        dispatcher = EventDispatcher()
+        with pytest.raises(RuntimeError):
+            dispatcher.dispatch(fake_event('add'))
+        dispatcher.start(self.callback)
+        with pytest.raises(RuntimeError):
+            dispatcher.start(self.callback)
+        dispatcher.shutdown()
+        with pytest.raises(RuntimeError):
+            dispatcher.dispatch(fake_event('add'))
+
+    def test_order_per_device(self):
+        events = []
+        for index in range(50):
+            for sys_path in ('/sys/devices/spam', '/sys/devices/eggs'):
+                events.append(fake_event('change', sys_path=sys_path))
+        dispatcher = EventDispatcher(shards=3)
+        dispatcher.start(self.callback)
+        for event in events:
+            dispatcher.dispatch(event)
+        dispatcher.shutdown()
+        assert len(dispatcher) == 0
+        assert sorted(self.events, key=id) == sorted(events, key=id)
+        for sys_path in ('/sys/devices/spam', '/sys/devices/eggs'):
+            assert ([e for e in self.events if e.sys_path == sys_path] ==
+                    [e for e in events if e.sys_path == sys_path])
+
+    def fill(self, overflow, *events):
+        dispatcher = EventDispatcher(shards=1, maxsize=2, overflow=overflow)
+        dispatcher.start(self.blocking_callback)
+        dispatcher.dispatch(events[0])
+        assert self.started.wait(5)
+        for event in events[1:]:
+            dispatcher.dispatch(event)
+        self.release.set()
+        dispatcher.shutdown()
+        return dispatcher
+
+    def test_overflow_drop_oldest(self):
+        events = [fake_event('add', sys_path='/sys/devices/{0}'.format(i))
+                  for i in range(4)]
+        dispatcher = self.fill('drop-oldest', *events)
+        assert self.events == [events[0], events[2], events[3]]
+        assert dispatcher.dropped == 1
+
+    def test_overflow_coalesce(self):
+        first = fake_event('add', sys_path='/sys/devices/eggs')
+        change = fake_event('change')
+        add = fake_event('add', sys_path='/sys/devices/ham')
+        second_change = fake_event('change')
+        other_add = fake_event('add', sys_path='/sys/devices/foo')
+        dispatcher = self.fill('coalesce', first, change, add, second_change,
+                               other_add)
+        assert self.events == [first, add, other_add]
+        assert dispatcher.dropped == 2
+
+    def test_overflow_block(self):
+        events = [fake_event('add', sys_path='/sys/devices/{0}'.format(i))
+                  for i in range(4)]
+        dispatcher = EventDispatcher(shards=1, maxsize=2)
+        dispatcher.start(self.blocking_callback)
+        for event in events[:3]:
+            dispatcher.dispatch(event)
+        assert self.started.wait(5)
+        sender = threading.Thread(target=dispatcher.dispatch,
+                                  args=(events[3],))
+        sender.start()
+        sender.join(0.2)
+        assert sender.is_alive()
+        self.release.set()
+        sender.join(5)
+        dispatcher.shutdown()
+        assert self.events == events
+        assert dispatcher.dropped == 0
+
+    def test_executor(self):
+        executor = mock.Mock()
+
+        def submit(function, device):
+            future = mock.Mock()
+            future.result.return_value = function(device)
+            return future
+
+        executor.submit.side_effect = submit
+        event = fake_event('add')
+        dispatcher = EventDispatcher(shards=2, executor=executor)
+        dispatcher.start(self.callback)
+        dispatcher.dispatch(event)
+        dispatcher.shutdown()
+        executor.submit.assert_called_once_with(self.callback, event)
+        assert self.events == [event]
+
+    def test_snapshots(self, context):
+        device = Device.from_path(context, '/devices/virtual/mem/null')
+        dispatcher = EventDispatcher(snapshots=True)
+        dispatcher.start(self.callback)
+        dispatcher.dispatch(device)
+        dispatcher.shutdown()
+        assert isinstance(self.events[0], DeviceSnapshot)
+        assert self.events[0].sys_path == device.sys_path
+
+    def test_callback_error(self, capsys):
+        events = [fake_event('add'), fake_event('remove')]
+        callback = mock.Mock(side_effect=[ValueError('spam'), None])
+        dispatcher = EventDispatcher(shards=1)
+        dispatcher.start(callback)
+        for event in events:
+            dispatcher.dispatch(event)
+        dispatcher.shutdown()
+        assert callback.call_args_list == [mock.call(e) for e in events]
+        assert 'ValueError: spam' in capsys.readouterr()[1]
+
+
 class TestMonitorObserver(object):
 
     def callback(self, device):
@@ -341,6 +1197,97 @@ def test_deprecated_handler(self, fake_monitor, fake_monitor_device):
         assert not observer.is_alive()
         assert self.events == [(None, fake_monitor_device)] * 2
 
+    def test_coalesce(self):
+        device = fake_event('change')
+        monitor = FakeMonitor(device)
+        try:
+            self.observer = MonitorObserver(
+                monitor, callback=self.callback, coalesce_window=0.2)
+            assert self.observer._coalescer.window == 0.2
+            self.observer.start()
+            for _ in range(3):
+                monitor.trigger_event()
+            time.sleep(0.5)
+            self.observer.stop()
+            assert self.events == [device]
+        finally:
+            monitor.close()
+
+    def test_coalesce_sustained_burst(self):
+        # every batch brings an event for another device and takes 0.1
+        # seconds, so events must be delivered while the burst goes on
+        clock = [0]
+        batches = []
+
+        def poll_many(timeout=None):
+            if len(batches) >= 20:
+                return []
+            clock[0] += 0.1
+            sys_path = '/sys/devices/{0}'.format(len(batches))
+            batches.append([fake_event('add', sys_path)])
+            if len(batches) == 20:
+                self.observer.send_stop()
+            return batches[-1]
+
+        monitor = FakeMonitor(None)
+        try:
+            with mock.patch.object(monitor, 'poll_many', poll_many):
+                with mock.patch('pyudev.monitor.monotonic',
+                                lambda: clock[0]):
+                    self.observer = MonitorObserver(
+                        monitor, coalesce_window=0.2,
+                        callback=lambda d: self.events.append(
+                            (len(batches), d)))
+                    self.observer.start()
+                    monitor.trigger_event()
+                    self.observer.join(2)
+            assert not self.observer.is_alive()
+            assert self.events[0] == (3, batches[0][0])
+            assert [device for _, device in self.events[:2]] == [
+                batch[0] for batch in batches[:2]]
+        finally:
+            monitor.close()
+
+    def test_dispatcher(self):
+        device = fake_event('add')
+        monitor = FakeMonitor(device)
+        try:
+            dispatcher = EventDispatcher(shards=2)
+            self.observer = MonitorObserver(
+                monitor, callback=self.events.append, dispatcher=dispatcher)
+            self.observer.start()
+            for _ in range(3):
+                monitor.trigger_event()
+            time.sleep(0.2)
+            self.observer.stop()
+            assert self.events == [device] * 3
+            assert self.observer._dispatcher._shutdown
+            assert not any(shard.thread.is_alive()
+                           for shard in dispatcher._shards)
+        finally:
+            monitor.close()
+
+    def test_stop_from_dispatcher(self):
+        monitor = FakeMonitor(fake_event('add'))
+        try:
+            self.observer = MonitorObserver(
+                monitor, callback=lambda device: self.observer.stop(),
+                dispatcher=EventDispatcher(shards=1))
+            self.observer.start()
+            monitor.trigger_event()
+            self.observer.join(2)
+            assert not self.observer.is_alive()
+        finally:
+            monitor.close()
+
+    def test_resync(self, monitor):
+        with mock.patch.object(monitor, 'enable_resync') as enable_resync:
+            self.observer = MonitorObserver(
+                monitor, callback=self.callback, resync=True)
+            self.observer.start()
+            self.observer.stop()
+            enable_resync.assert_called_once_with()
+
     def test_fake(self, fake_monitor, fake_monitor_device):
         observer = self.make_observer(fake_monitor)
         observer.start()
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2015 mulhern <amulhern@redhat.com>
+
+# This library is free software; you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation; either version 2.1 of the License, or (at your
+# option) any later version.
+
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License
+# for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+
+
+from __future__ import (print_function, division, unicode_literals,
+                        absolute_import)
+
+import errno
+import socket
+import struct
+
+import pytest
+import mock
+
+netlink = pytest.importorskip('pyudev.netlink')
+
+
+PROPERTIES = (b'ACTION=add\x00DEVPATH=/devices/virtual/mem/null\x00'
+              b'SUBSYSTEM=mem\x00SEQNUM=42\x00ID_SPAM=eggs=ham\x00')
+
+
+def udev_message(properties=PROPERTIES, magic=0xfeedcafe):
+    header = struct.pack(str('=8sIIIIIIII'), netlink.HEADER_PREFIX,
+                         socket.htonl(magic), 40, 40, len(properties),
+                         0, 0, 0, 0)
+    return header + properties
+
+
+def kernel_message(properties=PROPERTIES):
+    return b'add@/devices/virtual/mem/null\x00' + properties
+
+
+def pytest_funcarg__monitor(request):
+    context = request.getfuncargvalue('context')
+    try:
+        monitor = netlink.NetlinkMonitor(context)
+    except EnvironmentError:
+        pytest.skip('netlink not available')
+    request.addfinalizer(monitor.close)
+    return monitor
+
+
+class TestNetlinkEvent(object):
+
+    @pytest.mark.parametrize('message', [udev_message(), kernel_message()],
+                             ids=['udev', 'kernel'])
+    def test_parse_message(self, message):
+        event = netlink._parse_message('udev', message, '/sys')
+        assert event.source == 'udev'
+        assert event.action == 'add'
+        assert event.device_path == '/devices/virtual/mem/null'
+        assert event.sys_path == '/sys/devices/virtual/mem/null'
+        assert event.subsystem == 'mem'
+        assert event.device_type is None
+        assert event.sequence_number == 42
+        assert event['ID_SPAM'] == 'eggs=ham'
+        assert dict(event) == {'ACTION': 'add',
+                               'DEVPATH': '/devices/virtual/mem/null',
+                               'SUBSYSTEM': 'mem', 'SEQNUM': '42',
+                               'ID_SPAM': 'eggs=ham'}
+
+    @pytest.mark.parametrize('message', [
+        udev_message(magic=0xdeadbeef),
+        udev_message()[:30],
+        udev_message()[:-10],
+        b'spam\x00ACTION=add\x00'
+    ], ids=['magic', 'header', 'properties', 'kernel'])
+    def test_parse_invalid_message(self, message):
+        assert netlink._parse_message('udev', message, '/sys') is None
+
+    @pytest.mark.parametrize('message', [udev_message(), kernel_message()],
+                             ids=['udev', 'kernel'])
+    def test_parse_buffer(self, message):
+        buffer = bytearray(netlink.MESSAGE_SIZE)
+        buffer[:len(message)] = message
+        event = netlink._parse_message('udev', buffer, '/sys', len(message))
+        # only the properties are copied out of the buffer
+        assert event._data == PROPERTIES
+        buffer[:len(message)] = b'\x00' * len(message)
+        assert event['ID_SPAM'] == 'eggs=ham'
+        # stale data in the buffer after the message is ignored
+        buffer[:len(message)] = message
+        event = netlink._parse_message('udev', buffer, '/sys',
+                                       len(message) - 10)
+        if message.startswith(netlink.HEADER_PREFIX):
+            assert event is None
+        else:
+            assert event._data == PROPERTIES[:-10]
+
+    def test_lookup_is_lazy(self):
+        event = netlink._parse_message('udev', udev_message(), '/sys')
+        assert event['ACTION'] == 'add'
+        assert 'SPAM' not in event
+        # only split the properties when necessary
+        assert event._properties is None
+        assert len(event) == 5
+        assert event._properties is not None
+        assert event['SEQNUM'] == '42'
+
+    def test_lookup_whole_name(self):
+        event = netlink._parse_message(
+            'udev', udev_message(b'SPAM_ACTION=eggs\x00ACTION=add\x00'),
+            '/sys')
+        assert event['ACTION'] == 'add'
+        assert 'SPAM' not in event
+        with pytest.raises(KeyError):
+            event['SPAM']
+
+
+class TestNetlinkMonitor(object):
+
+    def test_invalid_source(self, context):
+        with pytest.raises(ValueError):
+            netlink.NetlinkMonitor(context, source='spam')
+
+    def test_start(self, monitor):
+        assert not monitor.started
+        monitor.start()
+        assert monitor.started
+        assert monitor._socket.getsockname()[1] == netlink.GROUPS['udev']
+
+    def test_poll_timeout(self, monitor):
+        assert monitor.poll(timeout=0) is None
+        assert monitor.poll_many(timeout=0) == []
+
+    def test_poll(self, monitor):
+        monitor.start()
+        sender = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW,
+                               netlink.NETLINK_KOBJECT_UEVENT)
+        try:
+            try:
+                for _ in range(3):
+                    sender.sendto(udev_message(), (0, netlink.GROUPS['udev']))
+            except EnvironmentError:
+                pytest.skip('not allowed to send device events')
+            events = monitor.poll_many(timeout=1)
+            assert len(events) == 3
+            for event in events:
+                assert event.action == 'add'
+                assert event.sequence_number == 42
+            assert monitor.poll(timeout=0) is None
+        finally:
+            sender.close()
+
+    def test_poll_dropped_messages(self, monitor):
+        event = netlink._parse_message('udev', udev_message(), '/sys')
+        poller = mock.Mock()
+        poller.poll.return_value = [(monitor.fileno(), 'r')]
+        with mock.patch.object(monitor, '_get_poller', return_value=poller):
+            with mock.patch.object(monitor, '_receive_event') as receive:
+                # all readable messages were dropped at first
+                receive.side_effect = [None, None, event]
+                assert monitor.poll() is event
+                receive.side_effect = None
+                receive.return_value = None
+                assert monitor.poll(timeout=0.1) is None
+                assert monitor.poll(timeout=0) is None
+
+    @pytest.mark.parametrize('address,uid,trusted', [
+        ((1234, 2), 0, True),
+        ((1234, 2), 1000, False),
+        ((0, 1), 0, True),
+        ((1234, 1), 0, False),
+        ((1234, 0), 0, False),
+    ])
+    def test_is_trusted(self, monitor, address, uid, trusted):
+        credentials = netlink.UCRED.pack(address[0], uid, 0)
+        ancillary = [(socket.SOL_SOCKET, socket.SCM_CREDENTIALS, credentials)]
+        assert monitor._is_trusted(address, ancillary) == trusted
+        assert not monitor._is_trusted(address, [])
+
+    def test_receive_untrusted(self, monitor):
+        messages = [udev_message()]
+
+        def recvmsg_into(buffers, ancillary_size):
+            if not messages:
+                raise socket.error(errno.EAGAIN, 'Try again')
+            message = messages.pop()
+            buffers[0][:len(message)] = message
+            # a unicast message without credentials
+            return len(message), [], 0, (1234, 0)
+
+        with mock.patch.object(monitor, '_socket') as sock:
+            sock.recvmsg_into.side_effect = recvmsg_into
+            assert monitor._receive_event() is None
+            assert sock.recvmsg_into.call_count == 2
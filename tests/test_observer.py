@@ -124,6 +124,32 @@ def test_events_real(self, context, monitor):
         self.start_event_loop(pytest.unload_dummy)
         event_callback.assert_called_with(device)
 
+    def check_coalesce(self, fake_monitor):
+        """
+        Check that an observer with a ``coalesce_window`` only emits the
+        events remaining after coalescing.
+        """
+        self.create_event_loop(self_stop_timeout=5000)
+        self.create_observer(fake_monitor, coalesce_window=0.2)
+        event_callback = mock.Mock(
+            side_effect=lambda *args: self.stop_event_loop())
+        self.connect_signal(event_callback)
+        spam = '/sys/devices/spam'
+        eggs = '/sys/devices/eggs'
+        events = [mock.Mock(action=action, sys_path=sys_path)
+                  for action, sys_path in [
+                      ('add', spam), ('change', spam), ('remove', spam),
+                      ('change', eggs), ('change', eggs)]]
+
+        def trigger_events():
+            for event in events:
+                fake_monitor.trigger_event(event)
+
+        self.start_event_loop(trigger_events)
+        # the add, change and remove of spam cancel each other out, and the
+        # second change of eggs replaces the first one
+        assert event_callback.call_args_list == [mock.call(events[-1])]
+
 
 class QtObserverTestBase(ObserverTestBase):
 
@@ -174,9 +200,9 @@ def teardown(self):
         for source in self.event_sources:
             self.glib.source_remove(source)
 
-    def create_observer(self, monitor):
+    def create_observer(self, monitor, coalesce_window=None):
         from pyudev.glib import MonitorObserver
-        self.observer = MonitorObserver(monitor)
+        self.observer = MonitorObserver(monitor, coalesce_window)
 
     def connect_signal(self, callback):
         # drop the sender argument from glib signal connections
@@ -201,6 +227,78 @@ def stop_event_loop(self):
         self.mainloop.quit()
         return False
 
+    def test_coalesce(self, fake_monitor):
+        self.check_coalesce(fake_monitor)
+
+    def test_disable_coalesce(self, fake_monitor):
+        self.create_event_loop(self_stop_timeout=500)
+        self.create_observer(fake_monitor, coalesce_window=0.2)
+        event_callback = mock.Mock()
+        self.connect_signal(event_callback)
+        held_back = []
+
+        def disable():
+            held_back.append(len(self.observer._coalescer))
+            self.observer.enabled = False
+            return False
+
+        def trigger_event():
+            fake_monitor.trigger_event()
+            self.event_sources.append(self.glib.timeout_add(50, disable))
+
+        self.start_event_loop(trigger_event)
+        assert held_back == [1]
+        assert not self.observer.enabled
+        # held back events are discarded, too
+        assert not event_callback.called
+
+
+class TestAsyncioObserver(ObserverTestBase):
+
+    def setup(self):
+        self.asyncio = pytest.importorskip('asyncio')
+        self.loop = self.asyncio.new_event_loop()
+
+    def teardown(self):
+        self.loop.close()
+
+    def create_observer(self, monitor):
+        from pyudev.asyncio import MonitorObserver
+        self.observer = MonitorObserver(monitor, loop=self.loop)
+
+    def connect_signal(self, callback):
+        def _forward(future):
+            callback(future.result())
+            self.observer.next_event().add_done_callback(_forward)
+        self.observer.next_event().add_done_callback(_forward)
+
+    def create_event_loop(self, self_stop_timeout=5000):
+        self.loop.call_later(self_stop_timeout / 1000, self.stop_event_loop)
+
+    def start_event_loop(self, start_callback):
+        self.loop.call_soon(start_callback)
+        self.loop.run_forever()
+
+    def stop_event_loop(self):
+        self.loop.stop()
+
+    def test_next_event_timeout(self, fake_monitor):
+        self.prepare_test(fake_monitor)
+        future = self.observer.next_event(timeout=0)
+        assert self.loop.run_until_complete(future) is None
+
+    def test_backpressure(self, fake_monitor, fake_monitor_device):
+        self.prepare_test(fake_monitor)
+        self.observer.maxsize = 1
+        fake_monitor.trigger_event()
+        fake_monitor.trigger_event()
+        self.loop.run_until_complete(self.asyncio.sleep(0.1))
+        # the observer must stop reading once the queue is full
+        assert list(self.observer._devices) == [fake_monitor_device]
+        assert fake_monitor.poll(timeout=0) == fake_monitor_device
+        future = self.observer.next_event()
+        assert self.loop.run_until_complete(future) == fake_monitor_device
+
 
 @pytest.mark.skipif(str('"DISPLAY" not in os.environ'),
                     reason='Display required for wxPython')
@@ -209,9 +307,9 @@ class TestWxObserver(ObserverTestBase):
     def setup(self):
         self.wx = pytest.importorskip('wx')
 
-    def create_observer(self, monitor):
+    def create_observer(self, monitor, coalesce_window=None):
         from pyudev import wx
-        self.observer = wx.MonitorObserver(monitor)
+        self.observer = wx.MonitorObserver(monitor, coalesce_window)
 
     def connect_signal(self, callback):
         from pyudev.wx import EVT_DEVICE_EVENT
@@ -236,3 +334,6 @@ def start_event_loop(self, start_callback):
 
     def stop_event_loop(self):
         self.app.Exit()
+
+    def test_coalesce(self, fake_monitor):
+        self.check_coalesce(fake_monitor)